@@ -0,0 +1,305 @@
+"""
+The code that runs every time a feed is opened or refreshed: parsing JSON and RSS
+listings, building the list rows and pushing them into the list view (drawn headless).
+Reports time, posts per second and the memory each step allocates, for listings of a
+few sizes plus one with long selftexts. Run from the repo root with the package
+installed:
+
+    python benchmarks/bench_hot_paths.py [--sizes 25,100,1000] [--repeat 5]
+    python benchmarks/bench_hot_paths.py --save before.json
+    python benchmarks/bench_hot_paths.py --compare before.json [--threshold 0.1]
+
+--compare exits non-zero if any case got slower than the threshold, so it can gate a
+change. --fixtures reads payloads (json_<n>.json, rss_<n>.xml, json_long_<n>.json,
+rss_long_<n>.xml) from a directory instead of generating them. fixtures.py --out writes
+the generated set there, real listings saved under the same names work too.
+"""
+
+import argparse
+import asyncio
+import gc
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+import tracemalloc
+from dataclasses import asdict
+from dataclasses import dataclass
+from typing import Any
+from typing import Callable
+from typing import List
+from typing import Optional
+
+from fixtures import json_listing
+from fixtures import rss_listing
+
+from reddit_cli.common import Feed
+from reddit_cli.common import PostRowData
+from reddit_cli.common import RedditPost
+from reddit_cli.feed_handlers import JSONHandler
+from reddit_cli.feed_handlers import RSSHandler
+
+FEED_URL = "https://www.reddit.com/r/all/.json"
+
+
+@dataclass
+class CaseResult:
+    name: str
+    posts: int
+    median_ms: float
+    posts_per_s: float
+    # Biggest the traced heap got during one run, and what that run left allocated
+    peak_kib: float
+    retained_kib: float
+
+
+def load_payload(
+    kind: str, size: int, long_selftext: bool, fixtures_dir: Optional[str]
+) -> str:
+    if fixtures_dir is not None:
+        extension = "json" if kind == "json" else "xml"
+        name = f"{kind}{'_long' if long_selftext else ''}_{size}.{extension}"
+        path = os.path.join(fixtures_dir, name)
+        if os.path.exists(path):
+            with open(path, encoding="utf-8") as f:
+                return f.read()
+    build = json_listing if kind == "json" else rss_listing
+    return build(size, long_selftext=long_selftext)
+
+
+def measure(name: str, posts: int, run: Callable[[], Any], repeat: int) -> CaseResult:
+    # Untraced runs for the timings, tracemalloc slows allocation heavy code right down
+    run()
+    times = []
+    for _ in range(repeat):
+        gc.collect()
+        start = time.perf_counter()
+        run()
+        times.append(time.perf_counter() - start)
+
+    gc.collect()
+    tracemalloc.start()
+    result = run()
+    retained, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+
+    median = statistics.median(times)
+    return CaseResult(
+        name,
+        posts,
+        median * 1000,
+        posts / median if median else 0.0,
+        peak / 1024,
+        retained / 1024,
+    )
+
+
+def parse_cases(
+    sizes: List[int], repeat: int, fixtures_dir: Optional[str]
+) -> List[CaseResult]:
+    results = []
+    handlers = {
+        "json": JSONHandler(FEED_URL, force_reload=True),
+        "rss": RSSHandler(FEED_URL.replace(".json", ".rss"), force_reload=True),
+    }
+    variants = [(size, False) for size in sizes] + [(min(sizes[-1], 100), True)]
+    for kind, handler in handlers.items():
+        for size, long_selftext in variants:
+            handler.raw_feed = load_payload(kind, size, long_selftext, fixtures_dir)
+            label = f"{kind}_parse/{size}{' long' if long_selftext else ''}"
+            results.append(measure(label, size, handler._parse_feed, repeat))
+    return results
+
+
+async def render_cases(
+    sizes: List[int], repeat: int, fixtures_dir: Optional[str]
+) -> List[CaseResult]:
+    # Imported here so the parse cases can run without textual's import cost in the way
+    from textual.app import App
+
+    from reddit_cli.states.post_list_state import PostListState
+    from reddit_cli.states.state_stack import StateStack
+    from reddit_cli.style import THEMES
+
+    class BenchApp(App[None]):
+        def __init__(self) -> None:
+            super().__init__(css_path=THEMES["default"])
+            self.stack = StateStack(self)
+
+    results = []
+    app = BenchApp()
+    async with app.run_test(size=(120, 40)) as pilot:
+        handler = JSONHandler(FEED_URL, force_reload=True)
+        for size in sizes:
+            handler.raw_feed = load_payload("json", size, False, fixtures_dir)
+            posts: List[RedditPost] = handler._parse_feed()
+            # Mounted directly rather than pushed, pushing would start a fetch
+            state = PostListState(app.stack, Feed("bench", FEED_URL))
+            await app.mount(state)
+            await pilot.pause()
+
+            results.append(
+                measure(
+                    f"display_items/{size}",
+                    size,
+                    lambda: state._generate_display_items(posts),
+                    repeat,
+                )
+            )
+            rows = state._generate_display_items(posts)
+            # A refresh usually brings a handful of new posts in at the top and pushes
+            # the rest down
+            refreshed = [
+                PostRowData("📰", "bench", f"new post {i}", f"t3_new{i}")
+                for i in range(5)
+            ] + rows[:-5]
+
+            def populate_fresh() -> None:
+                assert state.list_view is not None
+                state.list_view.set_rows([])
+                state.iterable_items = rows
+                state._populate_listview()
+
+            def populate_refresh() -> None:
+                assert state.list_view is not None
+                state.list_view.set_rows(rows)
+                state.iterable_items = refreshed
+                state._populate_listview()
+
+            results.append(measure(f"populate/{size}", size, populate_fresh, repeat))
+            results.append(
+                measure(f"populate_refresh/{size}", size, populate_refresh, repeat)
+            )
+
+            # Populate plus the frame it causes, timed on the loop since the paint
+            # happens there
+            paints = []
+            for _ in range(repeat):
+                populate_fresh()
+                start = time.perf_counter()
+                state.refresh()
+                await pilot.pause()
+                paints.append(time.perf_counter() - start)
+            median = statistics.median(paints)
+            results.append(
+                CaseResult(
+                    f"paint/{size}", size, median * 1000, size / median, 0.0, 0.0
+                )
+            )
+            await state.remove()
+    return results
+
+
+def _commit() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def compare(results: List[CaseResult], baseline_path: str, threshold: float) -> bool:
+    """
+    Print the change against a saved run, True if nothing got slower than the
+    threshold allows
+    """
+    with open(baseline_path, encoding="utf-8") as f:
+        baseline = {case["name"]: case for case in json.load(f)["results"]}
+    ok = True
+    print(f"\nAgainst {baseline_path}:")
+    for result in results:
+        before = baseline.get(result.name)
+        if before is None:
+            continue
+        change = (
+            result.median_ms / before["median_ms"] - 1 if before["median_ms"] else 0.0
+        )
+        flag = ""
+        if change > threshold:
+            flag = "  SLOWER"
+            ok = False
+        elif change < -threshold:
+            flag = "  faster"
+        print(
+            f"  {result.name:<24} {before['median_ms']:9.3f} -> "
+            f"{result.median_ms:9.3f} ms  ({change * 100:+.0f}%){flag}"
+        )
+    return ok
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument(
+        "--sizes", default="25,100,1000", help="comma separated listing sizes"
+    )
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument(
+        "--fixtures",
+        help="directory of recorded payloads to use instead of generated ones",
+    )
+    parser.add_argument(
+        "--no-render",
+        action="store_true",
+        help="skip the cases that need a headless app",
+    )
+    parser.add_argument(
+        "--save", metavar="PATH", help="write the results as json for a later --compare"
+    )
+    parser.add_argument(
+        "--compare", metavar="PATH", help="compare against results saved with --save"
+    )
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=0.1,
+        help="fraction slower that counts as a regression",
+    )
+    args = parser.parse_args()
+
+    sizes = sorted(int(size) for size in args.sizes.split(","))
+    results = parse_cases(sizes, args.repeat, args.fixtures)
+    if not args.no_render:
+        results += asyncio.run(render_cases(sizes, args.repeat, args.fixtures))
+
+    print(
+        f"{'case':<24} {'median ms':>10} {'posts/s':>12} "
+        f"{'peak KiB':>10} {'kept KiB':>10}"
+    )
+    for result in results:
+        print(
+            f"{result.name:<24} {result.median_ms:10.3f} {result.posts_per_s:12.0f} "
+            f"{result.peak_kib:10.1f} {result.retained_kib:10.1f}"
+        )
+
+    if args.save:
+        meta = {
+            "commit": _commit(),
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+            "repeat": args.repeat,
+            "fixtures": args.fixtures,
+        }
+        with open(args.save, "w", encoding="utf-8") as f:
+            json.dump(
+                {"meta": meta, "results": [asdict(result) for result in results]},
+                f,
+                indent=2,
+            )
+        print(f"\nSaved to {args.save}")
+
+    if args.compare and not compare(results, args.compare, args.threshold):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
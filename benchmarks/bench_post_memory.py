@@ -0,0 +1,91 @@
+"""
+Memory held per RedditPost, against the plain dataclass it used to be.
+Run from the repo root with the package installed:
+
+    python benchmarks/bench_post_memory.py [--posts 5000]
+"""
+
+import argparse
+import gc
+import json
+import tracemalloc
+from dataclasses import dataclass
+from dataclasses import field
+from typing import Any
+from typing import Callable
+from typing import Dict
+from typing import List
+from typing import Optional
+
+from fixtures import json_listing
+
+from reddit_cli.feed_handlers import JSONHandler
+
+
+@dataclass
+class LegacyRedditPost:
+    """RedditPost as it was before it was slotted"""
+
+    title: str
+    post_url: str
+    subreddit: str
+    content_raw: str
+    content_clean: str
+    external_url: Optional[str] = None
+    image_url: Optional[str] = None
+    meta: Dict[str, Any] = field(default_factory=dict)
+
+
+def legacy_from_data(data: Dict[str, Any]) -> LegacyRedditPost:
+    return LegacyRedditPost(
+        title=data["title"],
+        post_url="https://www.reddit.com" + data["permalink"],
+        content_raw=data["selftext_html"],
+        content_clean=data["selftext"],
+        subreddit=data["subreddit"],
+        external_url=data.get("url_overridden_by_dest"),
+        image_url=(
+            data.get("url_overridden_by_dest")
+            if data.get("is_reddit_media_domain")
+            else None
+        ),
+        meta={"name": data.get("name")},
+    )
+
+
+def measure(build: Callable[[Dict[str, Any]], object], payload: str) -> float:
+    """Bytes per post still held once the listing has been parsed and thrown away"""
+    gc.collect()
+    tracemalloc.start()
+    children: List[Dict[str, Any]] = [
+        child["data"] for child in json.loads(payload)["data"]["children"]
+    ]
+    posts = [build(child) for child in children]
+    del children
+    gc.collect()
+    retained, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return retained / len(posts)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--posts", type=int, default=5000)
+    args = parser.parse_args()
+
+    handler = JSONHandler("https://www.reddit.com/r/all/.json")
+    for long_selftext in (False, True):
+        payload = json_listing(args.posts, long_selftext=long_selftext)
+        legacy = measure(legacy_from_data, payload)
+        compact = measure(handler._post_from_data, payload)
+        label = "long selftexts" if long_selftext else "typical posts"
+        print(f"{args.posts} {label}:")
+        print(f"  dataclass:   {legacy:8.0f} bytes/post")
+        print(
+            f"  RedditPost:  {compact:8.0f} bytes/post  "
+            f"({(1 - compact / legacy) * 100:.0f}% less)"
+        )
+
+
+if __name__ == "__main__":
+    main()
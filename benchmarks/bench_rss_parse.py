@@ -0,0 +1,91 @@
+"""
+Per-entry cost of RSS content parsing, the old three-parse approach against the single
+pass.
+Run from the repo root with the package installed (pip install -e .[fast] to time lxml):
+
+    python benchmarks/bench_rss_parse.py [--entries 100] [--repeat 5]
+"""
+
+import argparse
+import importlib.util
+import re
+import statistics
+import textwrap
+import time
+from functools import partial
+from typing import Callable
+from typing import List
+from typing import Optional
+
+import feedparser
+from bs4 import BeautifulSoup
+from fixtures import rss_listing
+
+from reddit_cli.feed_handlers import HTML_PARSER
+from reddit_cli.feed_handlers import parse_entry_content
+
+
+def legacy_parse(content: str) -> tuple[str, Optional[str], Optional[str]]:
+    """What RSSHandler used to do, a separate html.parser tree for each field"""
+    soup = BeautifulSoup(content, "html.parser")
+    text = soup.get_text(separator="\n\n").split("submitted by")[0]
+    text = textwrap.dedent(text)
+    text = re.sub(
+        r"\n{3,}", "\n\n", "\n".join(line.rstrip() for line in text.splitlines())
+    ).strip()
+
+    soup = BeautifulSoup(content, "html.parser")
+    link_tag = soup.find("a", string="[link]")
+    external_url = str(link_tag["href"]) if link_tag else None
+    if external_url and "reddit.com" in external_url:
+        external_url = None
+
+    soup = BeautifulSoup(content, "html.parser")
+    img = soup.find("img")
+    image_url = str(img["src"]) if img and img.get("src") else None
+    return text, external_url, image_url
+
+
+def time_per_entry(
+    fn: Callable[[str], object], contents: List[str], repeat: int
+) -> float:
+    runs = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for content in contents:
+            fn(content)
+        runs.append((time.perf_counter() - start) / len(contents))
+    return statistics.median(runs)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--entries", type=int, default=100)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    feed = feedparser.parse(rss_listing(args.entries))
+    contents = [entry.content[0].value for entry in feed.entries]
+
+    # Same answers either way
+    assert [legacy_parse(c) for c in contents] == [
+        parse_entry_content(c) for c in contents
+    ]
+
+    legacy = time_per_entry(legacy_parse, contents, args.repeat)
+    print(f"{len(contents)} entries, default backend: {HTML_PARSER}")
+    print(f"  {'three parses, html.parser':<28} {legacy * 1e6:8.1f} us/entry")
+    lxml = importlib.util.find_spec("lxml") is not None
+    backends = ["html.parser"] + (["lxml"] if lxml else [])
+    for backend in backends:
+        single = time_per_entry(
+            partial(parse_entry_content, parser=backend), contents, args.repeat
+        )
+        print(
+            f"  {'single pass, ' + backend:<28} {single * 1e6:8.1f} us/entry  "
+            f"({legacy / single:.2f}x)"
+        )
+
+
+if __name__ == "__main__":
+    main()
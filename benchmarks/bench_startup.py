@@ -0,0 +1,149 @@
+"""
+Cold start cost: how long `import reddit_cli.app` takes and how long until the feed list
+is drawn. Every run is a fresh interpreter so nothing is already imported. Run from the
+repo root:
+
+    python benchmarks/bench_startup.py [--runs 7] [--top 15] [--src other/checkout/src]
+
+--src points at another checkout's src dir (a git worktree of an older commit, say) for
+a before/after.
+"""
+
+import argparse
+import os
+import re
+import statistics
+import subprocess
+import sys
+import time
+from typing import Dict
+from typing import List
+from typing import Tuple
+
+REPO_SRC = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src"
+)
+
+IMPORTTIME_LINE = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)")
+
+# Drawn headless, prints once the first state has been mounted and the screen has
+# settled
+FIRST_FRAME_SCRIPT = """
+import asyncio
+from reddit_cli.app import RedditCLIApp
+
+async def main():
+    app = RedditCLIApp()
+    async with app.run_test() as pilot:
+        await pilot.pause()
+        print("ready", flush=True)
+
+asyncio.run(main())
+"""
+
+
+def _env(src: str) -> Dict[str, str]:
+    env = dict(os.environ)
+    env["PYTHONPATH"] = src + os.pathsep + env.get("PYTHONPATH", "")
+    return env
+
+
+def import_profile(src: str) -> Tuple[float, List[Tuple[float, int, str]]]:
+    """
+    Total ms for importing the app, plus (cumulative ms, depth, module) for everything
+    it pulled in
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import reddit_cli.app"],
+        env=_env(src),
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    modules = []
+    total = 0.0
+    for line in result.stderr.splitlines():
+        match = IMPORTTIME_LINE.match(line)
+        if match is None:
+            continue
+        cumulative = int(match.group(2)) / 1000
+        depth = len(match.group(3)) // 2
+        modules.append((cumulative, depth, match.group(4)))
+        if match.group(4) == "reddit_cli.app":
+            total = cumulative
+    return total, modules
+
+
+def time_to_first_frame(src: str) -> float:
+    """Wall clock ms from launching the interpreter to the feed list being on screen"""
+    started = time.perf_counter()
+    process = subprocess.Popen(
+        [sys.executable, "-c", FIRST_FRAME_SCRIPT],
+        env=_env(src),
+        stdout=subprocess.PIPE,
+        stderr=subprocess.DEVNULL,
+        text=True,
+    )
+    assert process.stdout is not None
+    line = process.stdout.readline()
+    elapsed = (time.perf_counter() - started) * 1000
+    process.wait()
+    if line.strip() != "ready":
+        raise RuntimeError(
+            "App didn't start, is config.yaml or config.sample.yaml in place?"
+        )
+    return elapsed
+
+
+def interpreter_baseline() -> float:
+    started = time.perf_counter()
+    subprocess.run([sys.executable, "-c", "pass"], check=True)
+    return (time.perf_counter() - started) * 1000
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--runs", type=int, default=7)
+    parser.add_argument("--top", type=int, default=15, help="heaviest imports to list")
+    parser.add_argument(
+        "--src", default=REPO_SRC, help="src dir to import reddit_cli from"
+    )
+    parser.add_argument(
+        "--no-frame", action="store_true", help="skip the headless first frame timing"
+    )
+    args = parser.parse_args()
+
+    profiles = [import_profile(args.src) for _ in range(args.runs)]
+    totals = [total for total, _ in profiles]
+    # List the modules from the median run so one noisy run doesn't skew the table
+    _, modules = sorted(profiles, key=lambda profile: profile[0])[len(profiles) // 2]
+
+    print(f"reddit_cli from {args.src}, {args.runs} runs")
+    baseline = statistics.median(interpreter_baseline() for _ in range(args.runs))
+    print(f"  {'python -c pass':<28} {baseline:8.1f} ms")
+    print(
+        f"  {'import reddit_cli.app':<28} {statistics.median(totals):8.1f} ms  "
+        f"(min {min(totals):.1f}, max {max(totals):.1f})"
+    )
+    if not args.no_frame:
+        frames = [time_to_first_frame(args.src) for _ in range(args.runs)]
+        print(
+            f"  {'launch to first frame':<28} {statistics.median(frames):8.1f} ms  "
+            f"(min {min(frames):.1f}, max {max(frames):.1f})"
+        )
+
+    # Direct imports of the app and anything of ours are where deferring an import
+    # can help
+    print("\nHeaviest imports (cumulative ms):")
+    interesting = [m for m in modules if m[1] <= 1 or m[2].startswith("reddit_cli")]
+    for cumulative, depth, name in sorted(interesting, reverse=True)[: args.top]:
+        print(f"  {'  ' * max(depth - 1, 0)}{name:<40} {cumulative:8.1f}")
+    for heavy in ("feedparser", "bs4", "requests", "textual_image", "httpx", "sqlite3"):
+        loaded = any(name == heavy for _, _, name in modules)
+        print(f"  {heavy + ' loaded at startup:':<40} {'yes' if loaded else 'no'}")
+
+
+if __name__ == "__main__":
+    main()
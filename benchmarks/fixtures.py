@@ -0,0 +1,194 @@
+"""
+Deterministic reddit-shaped payloads for the benchmarks.
+Shapes mirror real /.json listings and /.rss Atom feeds, content is generated so the
+numbers are comparable between machines and commits.
+"""
+
+import argparse
+import json
+import os
+import random
+from html import escape
+from typing import Any
+from typing import Dict
+
+SUBREDDITS = [
+    "python",
+    "linux",
+    "programming",
+    "AskReddit",
+    "pics",
+    "worldnews",
+    "science",
+    "gaming",
+]
+WORDS = (
+    "lorem ipsum dolor sit amet consectetur adipiscing elit sed do eiusmod tempor "
+    "incididunt ut labore"
+).split()
+
+
+def _sentence(rng: random.Random, words: int) -> str:
+    return " ".join(rng.choice(WORDS) for _ in range(words)).capitalize() + "."
+
+
+def _selftext(rng: random.Random, paragraphs: int) -> str:
+    return "\n\n".join(
+        " ".join(_sentence(rng, rng.randint(6, 18)) for _ in range(4))
+        for _ in range(paragraphs)
+    )
+
+
+def _post_data(rng: random.Random, index: int, long_selftext: bool) -> Dict[str, Any]:
+    subreddit = rng.choice(SUBREDDITS)
+    post_id = f"{index:06x}"
+    kind = rng.random()
+    is_image = kind < 0.3
+    is_link = 0.3 <= kind < 0.5
+    selftext = (
+        ""
+        if (is_image or is_link)
+        else _selftext(rng, 40 if long_selftext else rng.randint(1, 4))
+    )
+    url = (
+        f"https://i.redd.it/{post_id}.jpg"
+        if is_image
+        else f"https://example.com/{post_id}" if is_link else None
+    )
+    return {
+        # A slice of the ~100 keys a real child has, the handler should only touch a few
+        "approved_at_utc": None,
+        "subreddit": subreddit,
+        "selftext": selftext,
+        "author_fullname": f"t2_{post_id}",
+        "title": _sentence(rng, rng.randint(4, 20)),
+        "subreddit_name_prefixed": f"r/{subreddit}",
+        "downs": 0,
+        "name": f"t3_{post_id}",
+        "upvote_ratio": round(rng.random(), 2),
+        "ups": rng.randint(0, 50000),
+        "thumbnail": (
+            "self" if selftext else f"https://b.thumbs.redditmedia.com/{post_id}.jpg"
+        ),
+        "created": 1760000000.0 + index,
+        "selftext_html": (
+            '&lt;!-- SC_OFF --&gt;&lt;div class="md"&gt;'
+            f"&lt;p&gt;{escape(selftext)}&lt;/p&gt;"
+            "&lt;/div&gt;&lt;!-- SC_ON --&gt;"
+            if selftext
+            else None
+        ),
+        "is_reddit_media_domain": is_image,
+        "url_overridden_by_dest": url,
+        "preview": (
+            {
+                "images": [
+                    {
+                        "source": {"url": url, "width": 1920, "height": 1080},
+                        "resolutions": [
+                            {"url": url, "width": w, "height": w}
+                            for w in (108, 216, 320, 640, 960)
+                        ],
+                    }
+                ]
+            }
+            if is_image
+            else None
+        ),
+        "permalink": f"/r/{subreddit}/comments/{post_id}/post_{index}/",
+        "url": url
+        or f"https://www.reddit.com/r/{subreddit}/comments/{post_id}/post_{index}/",
+        "num_comments": rng.randint(0, 5000),
+        "all_awardings": [],
+        "author": f"user{index}",
+    }
+
+
+def json_listing(count: int, long_selftext: bool = False, seed: int = 0) -> str:
+    rng = random.Random(seed)
+    children = [
+        {"kind": "t3", "data": _post_data(rng, index, long_selftext)}
+        for index in range(count)
+    ]
+    after = children[-1]["data"]["name"] if children else None
+    return json.dumps(
+        {
+            "kind": "Listing",
+            "data": {
+                "after": after,
+                "dist": count,
+                "modhash": "",
+                "geo_filter": None,
+                "children": children,
+                "before": None,
+            },
+        }
+    )
+
+
+def rss_listing(count: int, long_selftext: bool = False, seed: int = 0) -> str:
+    rng = random.Random(seed)
+    entries = []
+    for index in range(count):
+        data = _post_data(rng, index, long_selftext)
+        post_url = f"https://www.reddit.com{data['permalink']}"
+        link = data["url_overridden_by_dest"] or post_url
+        thumbnail = ""
+        if data["is_reddit_media_domain"]:
+            title = escape(data["title"])
+            thumbnail = (
+                f'<td> <a href="{post_url}"> <img src="{data["thumbnail"]}"'
+                f' alt="{title}" title="{title}" /> </a> </td>'
+            )
+        body = (
+            '<!-- SC_OFF --><div class="md">'
+            f'<p>{escape(data["selftext"])}</p></div><!-- SC_ON -->'
+            if data["selftext"]
+            else ""
+        )
+        content = (
+            f"<table> <tr>{thumbnail}<td> {body} &#32; submitted by &#32;"
+            f' <a href="https://www.reddit.com/user/{data["author"]}">'
+            f' /u/{data["author"]} </a> <br/> <span><a href="{link}">[link]</a></span>'
+            f' &#32; <span><a href="{post_url}">[comments]</a></span>'
+            " </td></tr></table>"
+        )
+        entries.append(
+            f"<entry><author><name>/u/{data['author']}</name></author>"
+            f'<category term="{data["subreddit"]}" label="r/{data["subreddit"]}"/>'
+            f'<content type="html">{escape(content)}</content><id>{data["name"]}</id>'
+            f'<link href="{post_url}" /><updated>2026-10-01T00:00:00+00:00</updated>'
+            f"<title>{escape(data['title'])}</title></entry>"
+        )
+    return (
+        '<?xml version="1.0" encoding="UTF-8"?>'
+        '<feed xmlns="http://www.w3.org/2005/Atom">'
+        "<title>benchmark</title>" + "".join(entries) + "</feed>"
+    )
+
+
+def main() -> None:
+    """
+    Write the payloads out as files, for bench_hot_paths.py --fixtures or to diff
+    against real listings
+    """
+    parser = argparse.ArgumentParser(description=main.__doc__)
+    parser.add_argument("--out", required=True, help="directory to write into")
+    parser.add_argument("--sizes", default="25,100,1000")
+    args = parser.parse_args()
+
+    os.makedirs(args.out, exist_ok=True)
+    for size in (int(size) for size in args.sizes.split(",")):
+        for long_selftext in (False, True):
+            suffix = "_long" if long_selftext else ""
+            for name, payload in (
+                (f"json{suffix}_{size}.json", json_listing(size, long_selftext)),
+                (f"rss{suffix}_{size}.xml", rss_listing(size, long_selftext)),
+            ):
+                with open(os.path.join(args.out, name), "w", encoding="utf-8") as f:
+                    f.write(payload)
+                print(f"Wrote {name}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,70 +1,82 @@
+import logging
 import sys
-from logging.config import dictConfig
 
 from textual.app import App
 from textual.events import Key
 
-from reddit_cli.common import CONFIG_YAML_PATH
-from reddit_cli.states.state_stack import StateStack
+from reddit_cli.common import get_config_path
+from reddit_cli.logging_setup import setup_logging
 from reddit_cli.states.feed_list_state import FeedListState
+from reddit_cli.states.state_stack import StateStack
 from reddit_cli.style import THEMES
+from reddit_cli.utils import read_log_config_from_yaml
 from reddit_cli.utils import read_theme_from_yaml
 
-# Setup logging globally
-dictConfig({
-    "version": 1,
-    "disable_existing_loggers": False,
-
-    "formatters": {
-        "file_formatter": {
-            "format": "%(asctime)s | %(levelname)-8s | %(name)s | %(message)s",
-            "datefmt": "%Y-%m-%d %H:%M:%S",
-        },
-    },
-
-    "handlers": {
-        "file_handler": {
-            "class": "logging.FileHandler",
-            "filename": "app.log",
-            "mode": "a",
-            "encoding": "utf-8",
-            "formatter": "file_formatter",
-            "level": "DEBUG",
-        },
-    },
-
-    "root": {
-        "handlers": ["file_handler"],
-        "level": "DEBUG",
-    },
-})
-
-
-_theme_name = read_theme_from_yaml(CONFIG_YAML_PATH)
 
 class RedditCLIApp(App[None]):
-    
-    CSS_PATH = THEMES.get(_theme_name, THEMES["default"])
 
     def __init__(self, boss_mode: bool = False) -> None:
-        super().__init__()
+        # Theme is read when the app is built, not at import
+        theme_name = read_theme_from_yaml(get_config_path())
+        super().__init__(css_path=THEMES.get(theme_name, THEMES["default"]))
         self.stack = StateStack(self, boss_mode=boss_mode)
 
     def on_mount(self) -> None:
         # Push first state
         self.stack.push(FeedListState(self.stack))
 
+    async def on_unmount(self) -> None:
+        from reddit_cli.feed_handlers import shutdown_process_pool
+        from reddit_cli.transport import close_async_transport
+
+        await close_async_transport()
+        shutdown_process_pool()
+
     def on_key(self, event: Key) -> None:
+        # Overlay keys work from any state
+        if event.key == "f12":
+            self.stack.toggle_overlay()
+            return
+        if event.key == "f11":
+            self.stack.export_perf()
+            return
         if self.stack.current:
             self.stack.current.handle_input(event.key)
             if not self.stack.current:
                 self.exit()
 
+
 def main() -> None:
     clargs = sys.argv
-    boss_mode =  clargs[-1] == "--boss-mode"
+    # `reddit sync ...` runs the headless sync instead of the app
+    if len(clargs) > 1 and clargs[1] == "sync":
+        from reddit_cli.sync import main as sync_main
+
+        sync_main(clargs[2:])
+        return
+    setup_logging(read_log_config_from_yaml(get_config_path()))
+    boss_mode = clargs[-1] == "--boss-mode"
+    if not boss_mode:
+        # textual_image asks the terminal what it can draw when it's imported, which
+        # only works before textual takes the terminal over. Boss mode never shows
+        # images so skips the cost
+        import textual_image.widget  # noqa: F401
     app = RedditCLIApp(boss_mode=boss_mode)
     app.run(inline=True)
+    # Handy for sizing the cache budgets in config.yaml. Imported here so they stay off
+    # the startup path
+    from reddit_cli.dedup import get_seen_index
+    from reddit_cli.feed_handlers import get_feed_cache
+    from reddit_cli.perf import get_perf
+    from reddit_cli.scheduler import get_scheduler
+
+    logging.info(f"Feed cache stats: {get_feed_cache().stats}")
+    logging.info(f"Dedup stats: {get_seen_index().stats()}")
+    logging.info(f"Rate limit stats: {get_scheduler().stats()}")
+    perf = get_perf()
+    if perf.config.export_path:
+        logging.info(f"Spans written to {perf.export(perf.config.export_path)}")
+
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -0,0 +1,245 @@
+import asyncio
+import json
+from typing import Any
+from typing import Dict
+from typing import List
+from typing import Optional
+from typing import Union
+from urllib.parse import urlencode
+from urllib.parse import urljoin
+from urllib.parse import urlparse
+from urllib.parse import urlunparse
+
+from reddit_cli.common import get_config_path
+from reddit_cli.utils import read_comments_config_from_yaml
+
+# Reddit caps the ids per morechildren request
+MORE_CHILDREN_BATCH = 100
+
+
+class Comment:
+    """
+    A single comment and its replies, kept as plain data.
+    The tree view only builds nodes for the parts that get expanded.
+    """
+
+    __slots__ = ("name", "author", "body", "score", "depth", "replies")
+
+    def __init__(
+        self,
+        name: str,
+        author: str,
+        body: str,
+        score: int,
+        depth: int,
+        replies: Optional[List["CommentNode"]] = None,
+    ) -> None:
+        self.name = name
+        self.author = author
+        self.body = body
+        self.score = score
+        self.depth = depth
+        self.replies: List[CommentNode] = replies if replies is not None else []
+
+    def __repr__(self) -> str:
+        return (
+            f"Comment(name={self.name!r}, author={self.author!r}, "
+            f"replies={len(self.replies)})"
+        )
+
+
+class MoreComments:
+    """
+    A "load more comments" stub. Holds the ids reddit left out, fetched when the stub
+    is opened. No ids means reddit wants the thread opened on its own page
+    ("continue this thread").
+    """
+
+    __slots__ = ("parent_name", "children", "count", "depth")
+
+    def __init__(
+        self, parent_name: str, children: List[str], count: int, depth: int
+    ) -> None:
+        self.parent_name = parent_name
+        self.children = children
+        self.count = count
+        self.depth = depth
+
+    @property
+    def is_continue_thread(self) -> bool:
+        return not self.children
+
+    def __repr__(self) -> str:
+        return f"MoreComments(parent_name={self.parent_name!r}, count={self.count})"
+
+
+CommentNode = Union[Comment, MoreComments]
+
+
+def _node_from_thing(thing: Dict[str, Any]) -> Optional[CommentNode]:
+    data = thing.get("data", {})
+    if thing.get("kind") == "more":
+        return MoreComments(
+            parent_name=data.get("parent_id", ""),
+            children=list(data.get("children", [])),
+            count=data.get("count", 0),
+            depth=data.get("depth", 0),
+        )
+    if thing.get("kind") != "t1":
+        return None
+
+    replies = data.get("replies")
+    # Reddit sends an empty string rather than an empty listing when there are none
+    reply_things = (
+        replies.get("data", {}).get("children", []) if isinstance(replies, dict) else []
+    )
+    return Comment(
+        name=data.get("name", ""),
+        author=data.get("author") or "[deleted]",
+        body=data.get("body") or "",
+        score=data.get("score") or 0,
+        depth=data.get("depth", 0),
+        replies=parse_comment_things(reply_things),
+    )
+
+
+def parse_comment_things(things: List[Dict[str, Any]]) -> List[CommentNode]:
+    nodes = []
+    for thing in things:
+        node = _node_from_thing(thing)
+        if node is not None:
+            nodes.append(node)
+    return nodes
+
+
+def parse_comments_listing(raw: str) -> List[CommentNode]:
+    """A post's .json is [post listing, comment listing], only the second is wanted"""
+    listings = json.loads(raw)
+    if not isinstance(listings, list) or len(listings) < 2:
+        return []
+    return parse_comment_things(listings[1].get("data", {}).get("children", []))
+
+
+def parse_more_children(raw: str) -> List[CommentNode]:
+    """
+    morechildren hands back a flat list of things with parent ids, put the tree back
+    together. Anything whose parent isn't in the batch hangs off the stub's parent, so
+    it's a root here.
+    """
+    things = json.loads(raw).get("json", {}).get("data", {}).get("things", [])
+    roots: List[CommentNode] = []
+    by_name: Dict[str, Comment] = {}
+    for thing in things:
+        node = _node_from_thing(thing)
+        if node is None:
+            continue
+        parent_name = thing.get("data", {}).get("parent_id", "")
+        parent = by_name.get(parent_name)
+        if parent is not None:
+            parent.replies.append(node)
+        else:
+            roots.append(node)
+        if isinstance(node, Comment):
+            by_name[node.name] = node
+    return roots
+
+
+def _shift_depth(nodes: List[CommentNode], offset: int) -> None:
+    for node in nodes:
+        node.depth += offset
+        if isinstance(node, Comment):
+            _shift_depth(node.replies, offset)
+
+
+def count_comments(nodes: List[CommentNode]) -> int:
+    """Comments in a tree, stubs count as what they stand in for"""
+    total = 0
+    for node in nodes:
+        if isinstance(node, Comment):
+            total += 1 + count_comments(node.replies)
+        else:
+            total += node.count
+    return total
+
+
+class CommentsHandler:
+    """Fetches a post's comments and fills in "more" stubs on demand"""
+
+    def __init__(self, post_url: str, link_name: Optional[str] = None) -> None:
+        parsed = urlparse(post_url)
+        self.post_url = urlunparse(parsed._replace(query="", fragment=""))
+        self.link_name = link_name or self._link_name_from_url(self.post_url)
+        self.config = read_comments_config_from_yaml(get_config_path())
+
+    @staticmethod
+    def _link_name_from_url(post_url: str) -> str:
+        # Permalinks go /r/<sub>/comments/<id>/<slug>/
+        parts = urlparse(post_url).path.strip("/").split("/")
+        if "comments" in parts and parts.index("comments") + 1 < len(parts):
+            return f"t3_{parts[parts.index('comments') + 1]}"
+        return ""
+
+    def _thread_url(self, comment_id: Optional[str] = None) -> str:
+        base = self.post_url.rstrip("/")
+        if comment_id is not None:
+            base = f"{base}/{comment_id}"
+        query = {"raw_json": 1, "limit": self.config.limit, "sort": self.config.sort}
+        return f"{base}.json?{urlencode(query)}"
+
+    async def _get_text(self, url: str) -> str:
+        # widgets imports the comment records, keep httpx out of that import
+        from reddit_cli.transport import get_async_transport
+
+        response = await get_async_transport().get(url)
+        response.raise_for_status()
+        return response.text
+
+    async def afetch_comments(self) -> List[CommentNode]:
+        raw = await self._get_text(self._thread_url())
+        return await asyncio.to_thread(parse_comments_listing, raw)
+
+    async def aload_more(self, more: MoreComments) -> List[CommentNode]:
+        """
+        Fetch what a stub stands in for. Ids past the batch limit come back as a
+        smaller stub
+        """
+        if more.is_continue_thread:
+            # The deep thread's own page starts with the parent comment, we want its
+            # replies
+            raw = await self._get_text(
+                self._thread_url(more.parent_name.split("_", 1)[-1])
+            )
+            nodes = await asyncio.to_thread(parse_comments_listing, raw)
+            if nodes and isinstance(nodes[0], Comment):
+                nodes = nodes[0].replies
+            # That page counts depth from the parent, put them back where the stub was
+            top = min((node.depth for node in nodes), default=more.depth)
+            _shift_depth(nodes, more.depth - top)
+            return nodes
+
+        batch, rest = (
+            more.children[:MORE_CHILDREN_BATCH],
+            more.children[MORE_CHILDREN_BATCH:],
+        )
+        query = {
+            "api_type": "json",
+            "raw_json": 1,
+            "link_id": self.link_name,
+            "children": ",".join(batch),
+            "sort": self.config.sort,
+            "limit_children": "false",
+        }
+        raw = await self._get_text(
+            urljoin(self.post_url, f"/api/morechildren.json?{urlencode(query)}")
+        )
+        nodes = await asyncio.to_thread(parse_more_children, raw)
+        if rest:
+            nodes.append(
+                MoreComments(
+                    more.parent_name,
+                    rest,
+                    max(more.count - len(batch), len(rest)),
+                    more.depth,
+                )
+            )
+        return nodes
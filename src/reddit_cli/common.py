@@ -1,13 +1,9 @@
 import os
+import sys
+import zlib
 from dataclasses import dataclass
-from dataclasses import field
-from typing import Any
-from typing import Dict
 from typing import Optional
 
-from textual.containers import Horizontal
-from textual.widgets import Static
-
 # Jank ass finding of the feeds yaml
 _this_dir = os.path.abspath(os.path.dirname(__file__))
 _root_dir = _this_dir
@@ -15,59 +11,341 @@ _root_dir = _this_dir
 for i in range(2):
     _root_dir = os.path.dirname(_root_dir)
 
-CONFIG_YAML_PATH = os.path.join(_root_dir, "config.yaml")
-if not os.path.exists(CONFIG_YAML_PATH):
-    # Try and load config.sample.yaml
-    CONFIG_YAML_PATH = os.path.join(_root_dir, "config.sample.yaml")
-if not os.path.exists(CONFIG_YAML_PATH):
-    raise FileNotFoundError(f"Neither config.yaml nor config.sample.yaml found in {_root_dir}. Please create one of these files. Refer to the README for instructions.")
+_config_path: Optional[str] = None
+
+
+def get_config_path() -> str:
+    """
+    Path to config.yaml, falling back to config.sample.yaml.
+    Worked out on first use rather than at import so importing the package stays cheap.
+    """
+    global _config_path
+    if _config_path is None:
+        path = os.path.join(_root_dir, "config.yaml")
+        if not os.path.exists(path):
+            # Try and load config.sample.yaml
+            path = os.path.join(_root_dir, "config.sample.yaml")
+        if not os.path.exists(path):
+            raise FileNotFoundError(
+                f"Neither config.yaml nor config.sample.yaml found in {_root_dir}. "
+                "Please create one of these files. "
+                "Refer to the README for instructions."
+            )
+        _config_path = path
+    return _config_path
+
+
+def __getattr__(name: str) -> str:
+    # CONFIG_YAML_PATH used to be a module constant, keep it working for anything
+    # still importing it
+    if name == "CONFIG_YAML_PATH":
+        return get_config_path()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+# Text shorter than this isn't worth compressing
+_COMPRESS_MIN_LENGTH = 256
+
+
+def _pack(value: Optional[str]) -> Optional[str | bytes]:
+    if not value:
+        # Empty and missing read back the same, so hold them the same way too
+        return None
+    if len(value) >= _COMPRESS_MIN_LENGTH:
+        return zlib.compress(value.encode("utf-8"), 1)
+    return value
+
+
+def _unpack(value: Optional[str | bytes]) -> str:
+    if isinstance(value, bytes):
+        return zlib.decompress(value).decode("utf-8")
+    return value or ""
+
 
-@dataclass
 class RedditPost:
-    """Contains all relevant information about the posts"""
-    title: str
-    post_url: str
-    subreddit: str
-    content_raw: str
-    content_clean: str
-    external_url: Optional[str] = None
-    image_url: Optional[str] = None
-    meta: Dict[str, Any] = field(default_factory=dict)
+    """
+    Contains all relevant information about the posts.
+    Kept compact as sessions can hold thousands: slotted, subreddit names are
+    interned and the bodies, which the list never reads, are held zlib compressed
+    and only decompressed when the detail view (or the store) asks for them.
+    """
+
+    __slots__ = (
+        "title",
+        "post_url",
+        "subreddit",
+        "external_url",
+        "image_url",
+        "name",
+        "_content_raw",
+        "_content_clean",
+    )
+
+    _content_raw: Optional[str | bytes]
+    _content_clean: Optional[str | bytes]
+
+    def __init__(
+        self,
+        title: str,
+        post_url: str,
+        subreddit: str,
+        content_raw: Optional[str],
+        content_clean: Optional[str] = None,
+        external_url: Optional[str] = None,
+        image_url: Optional[str] = None,
+        name: Optional[str] = None,
+    ) -> None:
+        self.title = title
+        self.post_url = post_url
+        self.subreddit = sys.intern(subreddit)
+        self.external_url = external_url
+        self.image_url = image_url
+        # Reddit fullname (t3_xxx), used for the 'after' query param for lazy loading
+        self.name = name
+        self._content_raw = _pack(content_raw)
+        self._content_clean = _pack(content_clean)
+
+    @property
+    def content_raw(self) -> str:
+        return _unpack(self._content_raw)
+
+    @property
+    def content_clean(self) -> str:
+        return _unpack(self._content_clean)
+
+    def approx_size(self) -> int:
+        """Rough bytes held by the text fields, without decompressing anything"""
+        size = len(self.title) + len(self.post_url) + len(self.subreddit)
+        size += len(self._content_raw or "") + len(self._content_clean or "")
+        size += len(self.external_url or "") + len(self.image_url or "")
+        return size
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, RedditPost):
+            return NotImplemented
+        return (
+            self.title == other.title
+            and self.post_url == other.post_url
+            and self.subreddit == other.subreddit
+            and self.name == other.name
+            and self.external_url == other.external_url
+            and self.image_url == other.image_url
+            # Packing is deterministic so there's no need to decompress to compare
+            and self._content_raw == other._content_raw
+            and self._content_clean == other._content_clean
+        )
+
+    def __repr__(self) -> str:
+        return (
+            f"RedditPost(title={self.title!r}, subreddit={self.subreddit!r}, "
+            f"name={self.name!r}, post_url={self.post_url!r})"
+        )
+
+
+# How long (seconds) a stored copy of a feed is shown before we go back to reddit
+# for a new one
+DEFAULT_FEED_TTL = 300
+
 
 @dataclass
 class Feed:
     """Contains global information about the user's feeds"""
+
     name: str
     url: str
+    ttl: float = DEFAULT_FEED_TTL
+
+
+@dataclass
+class HttpConfig:
+    """Connection settings for the shared HTTP transport"""
+
+    connect_timeout: float = 3.05
+    read_timeout: float = 10.0
+    retries: int = 3
+    backoff_factor: float = 0.5
+    pool_connections: int = 4
+    pool_maxsize: int = 10
+    # Send reddit's traffic somewhere else, e.g. the local stand-in in
+    # reddit_cli.devserver
+    base_url: str = ""
+
+
+@dataclass
+class CacheConfig:
+    """Budgets for the in-memory caches"""
+
+    feed_entries: int = 64
+    feed_max_mb: float = 32.0
+    image_memory_entries: int = 64
+    image_memory_mb: float = 64.0
+    image_disk_mb: float = 256.0
+    # Decoded images already shrunk to the terminal, per url and size
+    scaled_image_entries: int = 16
+    scaled_image_mb: float = 48.0
+
+
+@dataclass
+class PrefetchConfig:
+    """How eagerly post details are fetched ahead of the cursor"""
+
+    enabled: bool = True
+    neighbours: int = 2
+    concurrency: int = 2
+    delay: float = 0.3
+    max_image_mb: float = 8.0
+    max_total_mb: float = 200.0
+
+
+@dataclass
+class WarmupConfig:
+    """Fetching every configured feed up front when the app starts"""
+
+    enabled: bool = False
+    concurrency: int = 3
+
+
+@dataclass
+class RSSConfig:
+    """RSS parsing, the process pool is off unless process_pool_min_entries is set"""
+
+    process_pool_min_entries: int = 0
+    workers: int = 0
+    # BeautifulSoup backend, lxml is only used when asked for as it wasn't any quicker
+    # on reddit's entries and can split text differently
+    html_parser: str = "html.parser"
+
+
+@dataclass
+class LogConfig:
+    """
+    Where app.log goes and how much of it to keep, json writes one object per line
+    instead of text
+    """
+
+    level: str = "DEBUG"
+    # Empty means app.log in the working directory
+    path: str = ""
+    max_bytes: int = 5 * 1024 * 1024
+    backups: int = 3
+    json: bool = False
+
+
+@dataclass
+class PaginationConfig:
+    """
+    Paging through a feed, auto fetches the next page once the cursor is
+    look_ahead rows from the end
+    """
+
+    auto: bool = True
+    look_ahead: int = 10
+    page_size: int = 25
+
+
+@dataclass
+class DedupConfig:
+    """
+    Dropping posts a listing has already shown, cross_feed also drops posts seen
+    in other feeds
+    """
+
+    enabled: bool = True
+    cross_feed: bool = False
+
+
+@dataclass
+class CommentsConfig:
+    """
+    How comment threads are fetched, limit is how many comments reddit sends
+    before using "more" stubs
+    """
+
+    limit: int = 200
+    sort: str = "confidence"
+
+
+@dataclass
+class SearchConfig:
+    """
+    Local search over every post fetched so far, oldest posts are dropped past
+    max_posts
+    """
+
+    enabled: bool = True
+    max_results: int = 50
+    max_posts: int = 50000
+
+
+@dataclass
+class PerfConfig:
+    """
+    Timing spans for the overlay, window is how many recent timings each
+    histogram keeps
+    """
+
+    enabled: bool = True
+    window: int = 256
+    max_spans: int = 5000
+    # Written on exit when set, f11 in the app exports on demand
+    export_path: str = ""
+
+
+@dataclass
+class RateLimitConfig:
+    """
+    Per host request budgets, reddit's own rate limit headers tighten these when
+    they say so
+    """
+
+    enabled: bool = True
+    requests_per_minute: float = 60
+    burst: int = 10
+    # Image and media hosts
+    other_requests_per_minute: float = 600
+    other_burst: int = 20
+
 
 @dataclass
 class PostRowData:
-    """For displaying a post in a ListView, we only need a subset of the RedditPost data"""
+    """
+    For displaying a post in a ListView, we only need a subset of the RedditPost
+    data
+    """
+
     emoji: str
     subreddit: str
     title: str
-    meta: Optional[Dict[str, Any]] = None
-
-    def to_container(self) -> Horizontal:
-        container = Horizontal(
-            Static(self.emoji, classes="col-emoji"),
-            Static(self.subreddit, classes="col-subreddit"),
-            Static(self.title, classes="col-title"),
-            classes="post-row"
+    name: Optional[str] = None
+
+    @classmethod
+    def from_post(cls, post: RedditPost) -> "PostRowData":
+        # Emoji for image/link/selfpost
+        if post.image_url:
+            emoji = "📷"
+        elif post.external_url:
+            emoji = "🔗"
+        else:
+            emoji = "📰"
+        return cls(
+            emoji=emoji, subreddit=post.subreddit, title=post.title, name=post.name
         )
-        return container
+
 
 @dataclass
 class BaseMetadata:
     """Information for rendering a static component"""
+
     content: str
     classes: Optional[str] = None
     id: Optional[str] = None
 
+
 @dataclass
 class HeaderMetadata(BaseMetadata):
     pass
 
+
 @dataclass
 class FooterMetadata(BaseMetadata):
     pass
@@ -86,7 +364,7 @@ REDDIT_CLI_ASCII_ART = """
 ╔══════════════════════════════════╗
 ║ Reddit CLI — Powered by [s]RSS[/s] JSON ║
 ╚══════════════════════════════════╝
-""".strip()
+""".strip()  # noqa: E501,W291
 
 BOSS_MODE_ASCII_ART = """
  █████   ███   █████    ███████    ███████████   █████   ████
@@ -101,4 +379,4 @@ BOSS_MODE_ASCII_ART = """
 ╔═══════════════════════════════════╗
 ║ Job CLI — Powered by [s]JSON[/s] Synergy ║
 ╚═══════════════════════════════════╝
-"""
\ No newline at end of file
+"""  # noqa: W291
@@ -0,0 +1,112 @@
+import threading
+from dataclasses import dataclass
+from typing import Dict
+from typing import List
+from typing import Optional
+from typing import Set
+
+from reddit_cli.common import RedditPost
+from reddit_cli.common import get_config_path
+from reddit_cli.utils import read_dedup_config_from_yaml
+
+
+def post_key(post: RedditPost) -> str:
+    """
+    Reddit fullname (t3_xxx) when the feed has one, RSS entries only have their
+    permalink
+    """
+    return post.name or post.post_url
+
+
+@dataclass
+class DedupStats:
+    """Duplicates dropped so far, per feed and overall"""
+
+    dropped: int = 0
+    dropped_cross_feed: int = 0
+    indexed: int = 0
+
+
+class SeenIndex:
+    """
+    The fullnames each feed has handed out, for dropping posts we've already shown.
+    Reddit listings shift between requests, so 'after' pages regularly repeat posts from
+    the page before. Filtering happens at parse time so duplicates never reach the list.
+    With cross_feed on, a post already shown by another feed is dropped as well.
+    """
+
+    def __init__(self, cross_feed: bool = False) -> None:
+        self.cross_feed = cross_feed
+        # Feed -> the keys it has shown, so forgetting a feed only touches its own posts
+        self._keys: Dict[str, Set[str]] = {}
+        # Key -> the feed that showed it first, for cross_feed
+        self._owners: Dict[str, str] = {}
+        self._stats: Dict[str, DedupStats] = {}
+        self._lock = threading.Lock()
+
+    def reset(self, feed: str) -> None:
+        """Forget a feed's posts, a fresh first page starts the listing over"""
+        with self._lock:
+            self._forget(feed)
+
+    def _forget(self, feed: str) -> None:
+        for key in self._keys.pop(feed, set()):
+            if self._owners.get(key) == feed:
+                del self._owners[key]
+
+    def filter(
+        self, feed: str, posts: List[RedditPost], reset: bool = False
+    ) -> List[RedditPost]:
+        """Index posts under a feed and return only the ones not seen before"""
+        with self._lock:
+            if reset:
+                self._forget(feed)
+            stats = self._stats.setdefault(feed, DedupStats())
+            keys = self._keys.setdefault(feed, set())
+            kept = []
+            for post in posts:
+                key = post_key(post)
+                if key in keys:
+                    stats.dropped += 1
+                    continue
+                if self.cross_feed and self._owners.get(key, feed) != feed:
+                    stats.dropped += 1
+                    stats.dropped_cross_feed += 1
+                    continue
+                keys.add(key)
+                self._owners.setdefault(key, feed)
+                kept.append(post)
+            stats.indexed = len(keys)
+            return kept
+
+    def stats(self, feed: Optional[str] = None) -> DedupStats:
+        """Counters for one feed, or summed over every feed"""
+        with self._lock:
+            if feed is not None:
+                stats = self._stats.get(feed, DedupStats())
+                return DedupStats(
+                    stats.dropped,
+                    stats.dropped_cross_feed,
+                    len(self._keys.get(feed, ())),
+                )
+            return DedupStats(
+                dropped=sum(stats.dropped for stats in self._stats.values()),
+                dropped_cross_feed=sum(
+                    stats.dropped_cross_feed for stats in self._stats.values()
+                ),
+                indexed=sum(len(keys) for keys in self._keys.values()),
+            )
+
+
+_seen_index: Optional[SeenIndex] = None
+_seen_index_lock = threading.Lock()
+
+
+def get_seen_index() -> SeenIndex:
+    """Shared index, created on first use from the dedup config"""
+    global _seen_index
+    with _seen_index_lock:
+        if _seen_index is None:
+            config = read_dedup_config_from_yaml(get_config_path())
+            _seen_index = SeenIndex(cross_feed=config.cross_feed)
+        return _seen_index
@@ -0,0 +1,609 @@
+"""
+Local stand-in for reddit, for working offline, demos and load testing the fetch
+pipeline. Serves made up but deterministic listings (with 'after' paging), RSS, comment
+threads, morechildren and images, with optional latency, jitter and rate limiting:
+
+    python -m reddit_cli.devserver --port 8787 --latency 80 --jitter 40 --throttle 0.05
+    REDDIT_CLI_BASE_URL=http://127.0.0.1:8787 python app.py
+
+With a base url set every request for reddit.com, redd.it and redditmedia.com goes to
+the stand-in instead (see http.base_url in the README).
+"""
+
+import argparse
+import hashlib
+import json
+import random
+import struct
+import sys
+import threading
+import time
+import zlib
+from collections import Counter
+from dataclasses import dataclass
+from html import escape
+from http.server import BaseHTTPRequestHandler
+from http.server import ThreadingHTTPServer
+from typing import Any
+from typing import Dict
+from typing import List
+from typing import Optional
+from typing import Tuple
+from urllib.parse import parse_qs
+from urllib.parse import urlparse
+
+WORDS = (
+    "terminal python reddit async cache latency parser thread image feed comment "
+    "linux editor keyboard window render pipeline socket buffer queue memory "
+    "question answer release update"
+).split()
+
+IMAGE_EXTENSIONS = (".png", ".jpg", ".jpeg", ".gif", ".webp")
+
+
+@dataclass
+class StandInOptions:
+    posts: int = 1000  # per feed, paging stops after this many
+    comments: int = 200  # top level comments per thread
+    depth: int = 4  # reply depth before a continue thread stub
+    latency: float = 0.0  # ms added to every response
+    jitter: float = 0.0  # +/- ms on top of the latency
+    throttle: float = 0.0  # chance of a random 429
+    retry_after: int = 1  # seconds, sent with every 429
+    budget: int = (
+        0  # requests per window before 429s, 0 for no limit (and no rate limit headers)
+    )
+    window: float = 60.0  # seconds
+    seed: int = 0
+
+
+def _words(rng: random.Random, count: int) -> str:
+    return " ".join(rng.choice(WORDS) for _ in range(count))
+
+
+def _png(width: int, height: int, seed: str) -> bytes:
+    """A gradient PNG, made with zlib so the stand-in has no dependencies"""
+    rng = random.Random(seed)
+    top = [rng.randrange(256) for _ in range(3)]
+    bottom = [rng.randrange(256) for _ in range(3)]
+    rows = []
+    for y in range(height):
+        mix = y / max(height - 1, 1)
+        pixel = bytes(int(a + (b - a) * mix) for a, b in zip(top, bottom))
+        rows.append(b"\x00" + pixel * width)
+
+    def chunk(kind: bytes, data: bytes) -> bytes:
+        return (
+            struct.pack(">I", len(data))
+            + kind
+            + data
+            + struct.pack(">I", zlib.crc32(kind + data) & 0xFFFFFFFF)
+        )
+
+    header = struct.pack(">IIBBBBB", width, height, 8, 2, 0, 0, 0)
+    return (
+        b"\x89PNG\r\n\x1a\n"
+        + chunk(b"IHDR", header)
+        + chunk(b"IDAT", zlib.compress(b"".join(rows), 6))
+        + chunk(b"IEND", b"")
+    )
+
+
+class RedditStandIn(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address: Tuple[str, int], options: StandInOptions) -> None:
+        super().__init__(address, _Handler)
+        self.options = options
+        self.hits: Counter[str] = Counter()
+        self._lock = threading.Lock()
+        self._rng = random.Random(options.seed)
+        self._window_start = time.monotonic()
+        self._window_used = 0
+
+    def handle_error(self, request: Any, client_address: Any) -> None:
+        # Clients hang up mid response all the time (cancelled prefetches), that's not
+        # worth a traceback
+        if isinstance(sys.exc_info()[1], ConnectionError):
+            return
+        super().handle_error(request, client_address)
+
+    def count(self, kind: str) -> None:
+        # Every handler thread counts its requests, Counter's += isn't atomic
+        with self._lock:
+            self.hits[kind] += 1
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return dict(self.hits)
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.server_address[:2]
+        if isinstance(host, bytes):
+            host = host.decode()
+        return f"http://{host}:{port}"
+
+    def admit(self) -> Tuple[Optional[float], Dict[str, str]]:
+        """
+        Latency to add (seconds) or None for a 429, plus the rate limit headers to send
+        """
+        options = self.options
+        with self._lock:
+            delay = (
+                max(
+                    0.0,
+                    options.latency
+                    + self._rng.uniform(-options.jitter, options.jitter),
+                )
+                / 1000
+            )
+            headers: Dict[str, str] = {}
+            if options.budget:
+                now = time.monotonic()
+                if now - self._window_start >= options.window:
+                    self._window_start = now
+                    self._window_used = 0
+                self._window_used += 1
+                reset = max(0.0, options.window - (now - self._window_start))
+                headers = {
+                    "X-Ratelimit-Used": str(self._window_used),
+                    "X-Ratelimit-Remaining": str(
+                        max(0, options.budget - self._window_used)
+                    ),
+                    "X-Ratelimit-Reset": str(int(reset) + 1),
+                }
+                if self._window_used > options.budget:
+                    return None, headers
+            if options.throttle and self._rng.random() < options.throttle:
+                return None, headers
+        return delay, headers
+
+    # Everything below is a pure function of the request, so repeated fetches see the
+    # same data
+
+    def post_data(self, sub: str, index: int) -> Dict[str, Any]:
+        rng = random.Random(f"{self.options.seed}:{sub}:{index}")
+        post_id = self.post_id(sub, index)
+        kind = rng.random()
+        image = kind < 0.3
+        link = 0.3 <= kind < 0.45
+        selftext = (
+            ""
+            if (image or link)
+            else "\n\n".join(
+                _words(rng, rng.randint(12, 60)).capitalize() + "."
+                for _ in range(rng.randint(1, 5))
+            )
+        )
+        url = (
+            f"https://i.redd.it/{post_id}.png"
+            if image
+            else f"https://example.com/{post_id}" if link else None
+        )
+        return {
+            "name": f"t3_{post_id}",
+            "id": post_id,
+            "title": f"{_words(rng, rng.randint(3, 12)).capitalize()} ({sub} #{index})",
+            "subreddit": sub,
+            "author": f"user_{rng.randrange(10000)}",
+            "selftext": selftext,
+            "selftext_html": (
+                f'&lt;div class="md"&gt;&lt;p&gt;{escape(selftext)}'
+                "&lt;/p&gt;&lt;/div&gt;"
+                if selftext
+                else None
+            ),
+            "permalink": f"/r/{sub}/comments/{post_id}/post_{index}/",
+            "url": url
+            or f"https://www.reddit.com/r/{sub}/comments/{post_id}/post_{index}/",
+            "url_overridden_by_dest": url,
+            "is_reddit_media_domain": image,
+            "score": rng.randrange(50000),
+            "num_comments": self.options.comments,
+            "created_utc": 1760000000.0 - index * 60,
+        }
+
+    @staticmethod
+    def post_id(sub: str, index: int) -> str:
+        # Subreddit hash then the position, so ids are unique across feeds and 'after'
+        # can be decoded
+        return f"{zlib.crc32(sub.encode()):08x}{index:05x}"
+
+    def listing(self, sub: str, limit: int, after: Optional[str]) -> Dict[str, Any]:
+        start = 0
+        prefix = f"t3_{self.post_id(sub, 0)[:8]}"
+        if after is not None and after.startswith(prefix):
+            start = int(after[len(prefix) :], 16) + 1
+        end = min(start + limit, self.options.posts)
+        children: List[Dict[str, Any]] = [
+            {"kind": "t3", "data": self.post_data(sub, index)}
+            for index in range(start, end)
+        ]
+        next_after = (
+            children[-1]["data"]["name"]
+            if children and end < self.options.posts
+            else None
+        )
+        return {
+            "kind": "Listing",
+            "data": {
+                "after": next_after,
+                "dist": len(children),
+                "children": children,
+                "before": None,
+            },
+        }
+
+    def rss(self, sub: str, limit: int) -> str:
+        entries = []
+        for index in range(min(limit, self.options.posts)):
+            data = self.post_data(sub, index)
+            post_url = f"https://www.reddit.com{data['permalink']}"
+            image = (
+                f'<a href="{post_url}"><img src="{data["url"]}" alt="" /></a>'
+                if data["is_reddit_media_domain"]
+                else ""
+            )
+            content = (
+                f'<table><tr><td>{image}<div class="md">'
+                f'<p>{escape(data["selftext"])}</p></div> submitted by '
+                f'<a href="https://www.reddit.com/user/{data["author"]}">'
+                f' /u/{data["author"]} </a> <br/>'
+                f'<span><a href="{data["url"]}">[link]</a></span> '
+                f'<span><a href="{post_url}">[comments]</a></span>'
+                "</td></tr></table>"
+            )
+            entries.append(
+                f'<entry><author><name>/u/{data["author"]}</name></author>'
+                f'<category term="{sub}" label="r/{sub}"/>'
+                f'<content type="html">{escape(content)}</content>'
+                f'<id>{data["name"]}</id><link href="{post_url}" />'
+                "<updated>2026-10-01T00:00:00+00:00</updated>"
+                f'<title>{escape(data["title"])}</title></entry>'
+            )
+        return (
+            '<?xml version="1.0" encoding="UTF-8"?>'
+            '<feed xmlns="http://www.w3.org/2005/Atom">'
+            f'<title>r/{sub}</title>{"".join(entries)}</feed>'
+        )
+
+    def comment(
+        self,
+        comment_id: str,
+        depth: int,
+        link_id: str,
+        parent_id: str,
+        min_replies: int = 0,
+    ) -> Dict[str, Any]:
+        rng = random.Random(f"{self.options.seed}:{comment_id}")
+        if depth + 1 >= self.options.depth:
+            # Reddit stops nesting here and hands back a continue this thread stub
+            replies: List[Dict[str, Any]] = [
+                {
+                    "kind": "more",
+                    "data": {
+                        "count": 0,
+                        "name": "t1__",
+                        "id": "_",
+                        "parent_id": f"t1_{comment_id}",
+                        "depth": depth + 1,
+                        "children": [],
+                    },
+                }
+            ]
+        else:
+            replies = [
+                self.comment(
+                    f"{comment_id}r{n}", depth + 1, link_id, f"t1_{comment_id}"
+                )
+                for n in range(rng.randint(min_replies, 3))
+            ]
+        return {
+            "kind": "t1",
+            "data": {
+                "name": f"t1_{comment_id}",
+                "id": comment_id,
+                "author": f"user_{rng.randrange(10000)}",
+                "body": _words(rng, rng.randint(4, 40)).capitalize() + ".",
+                "score": rng.randrange(-5, 2000),
+                "depth": depth,
+                "parent_id": parent_id,
+                "link_id": link_id,
+                "replies": (
+                    {"kind": "Listing", "data": {"children": replies}}
+                    if replies
+                    else ""
+                ),
+            },
+        }
+
+    def thread(
+        self, post_id: str, comment_id: Optional[str], limit: int
+    ) -> List[Dict[str, Any]]:
+        link_id = f"t3_{post_id}"
+        post = {
+            "kind": "Listing",
+            "data": {
+                "children": [{"kind": "t3", "data": {"name": link_id, "id": post_id}}]
+            },
+        }
+        if comment_id is not None:
+            # Continue this thread, the comment re-rooted at depth 0. It was cut off for
+            # having replies so make sure it has some
+            return [
+                post,
+                {
+                    "kind": "Listing",
+                    "data": {
+                        "children": [
+                            self.comment(comment_id, 0, link_id, link_id, min_replies=1)
+                        ]
+                    },
+                },
+            ]
+
+        shown = min(limit, self.options.comments)
+        children = [
+            self.comment(f"{post_id}c{n}", 0, link_id, link_id) for n in range(shown)
+        ]
+        rest = [f"{post_id}c{n}" for n in range(shown, self.options.comments)]
+        if rest:
+            children.append(
+                {
+                    "kind": "more",
+                    "data": {
+                        "count": len(rest),
+                        "name": f"t1_{rest[0]}",
+                        "id": rest[0],
+                        "parent_id": link_id,
+                        "depth": 0,
+                        "children": rest,
+                    },
+                }
+            )
+        return [post, {"kind": "Listing", "data": {"children": children}}]
+
+    def more_children(self, link_id: str, ids: List[str]) -> Dict[str, Any]:
+        things = []
+        for comment_id in ids:
+            # Flattened, morechildren hands back each comment with its replies as
+            # separate things
+            pending = [self.comment(comment_id, 0, link_id, link_id)]
+            while pending:
+                thing = pending.pop(0)
+                replies = thing["data"]["replies"]
+                thing["data"]["replies"] = ""
+                things.append(thing)
+                if replies:
+                    pending.extend(
+                        child
+                        for child in replies["data"]["children"]
+                        if child["kind"] == "t1"
+                    )
+        return {"json": {"errors": [], "data": {"things": things}}}
+
+
+class _BadRequest(ValueError):
+    pass
+
+
+def _int_param(query: Dict[str, str], name: str, default: int) -> int:
+    try:
+        return int(query.get(name, default))
+    except ValueError:
+        raise _BadRequest(f"{name} must be a number") from None
+
+
+class _Handler(BaseHTTPRequestHandler):
+    server: RedditStandIn
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format: str, *args: Any) -> None:
+        pass
+
+    def do_GET(self) -> None:
+        url = urlparse(self.path)
+        query = {key: values[0] for key, values in parse_qs(url.query).items()}
+        path = url.path.rstrip("/")
+
+        if path == "/__stats":
+            return self._send(
+                200, "application/json", json.dumps(self.server.stats()).encode()
+            )
+
+        delay, headers = self.server.admit()
+        if delay is None:
+            self.server.count("429")
+            return self._send(
+                429,
+                "application/json",
+                b'{"message": "Too Many Requests", "error": 429}',
+                {**headers, "Retry-After": str(self.server.options.retry_after)},
+            )
+        time.sleep(delay)
+
+        try:
+            self._route(path, query, headers)
+        except _BadRequest as e:
+            self.server.count("400")
+            body = json.dumps({"message": str(e), "error": 400}).encode()
+            self._send(400, "application/json", body, headers)
+
+    def _route(self, path: str, query: Dict[str, str], headers: Dict[str, str]) -> None:
+        parts = path.strip("/").split("/")
+        if path.lower().endswith(IMAGE_EXTENSIONS):
+            self.server.count("image")
+            body = _png(320, 180, path)
+            return self._send(200, "image/png", body, headers)
+        if path == "/api/morechildren.json":
+            self.server.count("morechildren")
+            ids = [
+                comment_id
+                for comment_id in query.get("children", "").split(",")
+                if comment_id
+            ]
+            return self._json(
+                self.server.more_children(query.get("link_id", ""), ids), headers
+            )
+        if "comments" in parts and path.endswith(".json"):
+            limit = _int_param(query, "limit", 200)
+            self.server.count("comments")
+            parts[-1] = parts[-1][: -len(".json")]
+            parts = [part for part in parts if part]
+            position = parts.index("comments")
+            post_id = parts[position + 1]
+            # /r/sub/comments/id/slug/comment_id for a continue thread
+            comment_id = parts[position + 3] if len(parts) > position + 3 else None
+            return self._json(self.server.thread(post_id, comment_id, limit), headers)
+
+        # Reddit clamps listing limits to 1..100
+        limit = max(1, min(_int_param(query, "limit", 25), 100))
+        sub = parts[1] if len(parts) > 1 and parts[0] == "r" else "frontpage"
+        sub = sub.replace(".json", "").replace(".rss", "")
+        if path.endswith(".rss"):
+            self.server.count("rss")
+            return self._send(
+                200,
+                "application/atom+xml",
+                self.server.rss(sub, limit).encode(),
+                headers,
+            )
+        if path.endswith(".json"):
+            self.server.count("listing")
+            return self._json(
+                self.server.listing(sub, limit, query.get("after")), headers
+            )
+
+        self.server.count("404")
+        self._send(
+            404, "application/json", b'{"message": "Not Found", "error": 404}', headers
+        )
+
+    def _json(self, data: Any, headers: Dict[str, str]) -> None:
+        self._send(200, "application/json", json.dumps(data).encode(), headers)
+
+    def _send(
+        self,
+        status: int,
+        content_type: str,
+        body: bytes,
+        headers: Optional[Dict[str, str]] = None,
+    ) -> None:
+        etag = f'"{hashlib.md5(body).hexdigest()}"'
+        if status == 200 and self.headers.get("If-None-Match") == etag:
+            status, body = 304, b""
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        if status in (200, 304):
+            self.send_header("ETag", etag)
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+
+def serve(
+    host: str = "127.0.0.1", port: int = 0, options: Optional[StandInOptions] = None
+) -> RedditStandIn:
+    """
+    Start the stand-in on a background thread, port 0 picks a free one. Stop it with
+    shutdown()
+    """
+    server = RedditStandIn((host, port), options or StandInOptions())
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    defaults = StandInOptions()
+    parser = argparse.ArgumentParser(
+        prog="python -m reddit_cli.devserver",
+        description="Serve a fake reddit locally.",
+    )
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8787)
+    parser.add_argument(
+        "--posts",
+        type=int,
+        default=defaults.posts,
+        help="posts per feed before paging runs out",
+    )
+    parser.add_argument(
+        "--comments",
+        type=int,
+        default=defaults.comments,
+        help="top level comments per thread",
+    )
+    parser.add_argument(
+        "--depth",
+        type=int,
+        default=defaults.depth,
+        help="reply depth before a continue thread stub",
+    )
+    parser.add_argument(
+        "--latency",
+        type=float,
+        default=defaults.latency,
+        help="ms added to every response",
+    )
+    parser.add_argument(
+        "--jitter",
+        type=float,
+        default=defaults.jitter,
+        help="random +/- ms on top of the latency",
+    )
+    parser.add_argument(
+        "--throttle",
+        type=float,
+        default=defaults.throttle,
+        help="fraction of requests answered with a 429",
+    )
+    parser.add_argument(
+        "--retry-after",
+        type=int,
+        default=defaults.retry_after,
+        help="Retry-After seconds sent with a 429",
+    )
+    parser.add_argument(
+        "--budget",
+        type=int,
+        default=defaults.budget,
+        help="requests per window before 429s, sends reddit's X-Ratelimit headers",
+    )
+    parser.add_argument(
+        "--window",
+        type=float,
+        default=defaults.window,
+        help="rate limit window in seconds",
+    )
+    parser.add_argument("--seed", type=int, default=defaults.seed)
+    args = parser.parse_args(argv)
+
+    options = StandInOptions(
+        posts=args.posts,
+        comments=args.comments,
+        depth=args.depth,
+        latency=args.latency,
+        jitter=args.jitter,
+        throttle=args.throttle,
+        retry_after=args.retry_after,
+        budget=args.budget,
+        window=args.window,
+        seed=args.seed,
+    )
+    server = RedditStandIn((args.host, args.port), options)
+    print(f"Serving a stand-in reddit on {server.base_url}")
+    print(f"Point the app at it with REDDIT_CLI_BASE_URL={server.base_url}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        print(f"Requests served: {server.stats()}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,40 +1,122 @@
+import asyncio
+import atexit
+import codecs
+import importlib.util
 import json
+import logging
+import multiprocessing
+import os
 import re
 import textwrap
+import threading
+import time
 from abc import ABC
 from abc import abstractmethod
-from typing import Dict, List
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from typing import Any
+from typing import AsyncIterator
+from typing import Awaitable
+from typing import Callable
+from typing import Dict
+from typing import List
+from typing import Mapping
 from typing import Optional
+from typing import Tuple
 from urllib.parse import parse_qs
 from urllib.parse import urlencode
 from urllib.parse import urljoin
 from urllib.parse import urlparse
 from urllib.parse import urlunparse
 
-import feedparser
-import requests
-from bs4 import BeautifulSoup
-
+from reddit_cli.cache import LRUCache
+from reddit_cli.common import DEFAULT_FEED_TTL
+from reddit_cli.common import Feed
 from reddit_cli.common import RedditPost
-from reddit_cli.utils import get_random_user_agent
+from reddit_cli.common import get_config_path
+from reddit_cli.dedup import get_seen_index
+from reddit_cli.feed_store import StoredFeed
+from reddit_cli.feed_store import get_feed_store
+from reddit_cli.perf import get_perf
+from reddit_cli.scheduler import Priority
+from reddit_cli.search_index import get_search_index
+from reddit_cli.singleflight import SingleFlight
+from reddit_cli.transport import get_async_transport
+from reddit_cli.transport import get_transport
+from reddit_cli.utils import read_cache_config_from_yaml
+from reddit_cli.utils import read_dedup_config_from_yaml
+from reddit_cli.utils import read_rss_config_from_yaml
+
+
+def _estimate_feed_size(posts: List[RedditPost]) -> int:
+    """Rough byte count of a feed, the text fields dominate so that's all we count"""
+    return sum(post.approx_size() for post in posts)
+
+
+_feed_cache: Optional[LRUCache[str, List[RedditPost]]] = None
+_feed_cache_lock = threading.Lock()
+
+
+def get_feed_cache() -> LRUCache[str, List[RedditPost]]:
+    """In-memory cache of parsed feeds keyed by base url, shared by every handler"""
+    global _feed_cache
+    with _feed_cache_lock:
+        if _feed_cache is None:
+            config = read_cache_config_from_yaml(get_config_path())
+            _feed_cache = LRUCache(
+                max_entries=config.feed_entries,
+                max_bytes=int(config.feed_max_mb * 1024 * 1024),
+                sizeof=_estimate_feed_size,
+            )
+        return _feed_cache
+
+
+# (kind, feed url) -> the handler doing the work and what it got, so one press of 'r'
+# after another or a warm-up racing the post list only fetch and parse the page once
+_feed_flights: SingleFlight[Tuple[str, str], Tuple["BaseHandler", List[RedditPost]]] = (
+    SingleFlight()
+)
+
+
+def feed_loads_in_flight() -> int:
+    return _feed_flights.in_flight()
+
 
 class BaseHandler(ABC):
-    FEED_CACHE: Dict[str, List[RedditPost]] = {}
 
-    def __init__(self, feed_url: str, force_reload: bool=False, limit: int = 25, after: Optional[str] = None) -> None:
+    def __init__(
+        self,
+        feed_url: str,
+        force_reload: bool = False,
+        limit: int = 25,
+        after: Optional[str] = None,
+        ttl: float = DEFAULT_FEED_TTL,
+        priority: Priority = Priority.FOREGROUND,
+    ) -> None:
         # Parse and rebuild url with limit param
         self.feed_url = feed_url
         self.limit = limit
         self.after = after
+        self.ttl = ttl
+        # Where this handler's requests queue in the scheduler
+        self.priority = priority
         self.base_url = self._extract_base_url(self.feed_url)
         self._sanitise_feed_url()
+        self.feed_cache = get_feed_cache()
 
         self.raw_feed: Optional[str] = None
         self.feed: Optional[List[RedditPost]] = None
+        # Validators from the last response, kept so the stored copy can be revalidated
+        self.etag: Optional[str] = None
+        self.last_modified: Optional[str] = None
+        # Fullname of the last post reddit sent, before duplicates were dropped, for the
+        # next 'after'
+        self.next_after: Optional[str] = None
+        self.dedup = read_dedup_config_from_yaml(get_config_path()).enabled
 
         # Check if our feed is already cached
-        if self.base_url in self.FEED_CACHE and not force_reload:
-            self.feed = self.FEED_CACHE[self.base_url]
+        if not force_reload:
+            self.feed = self.feed_cache.get(self.base_url)
 
     @staticmethod
     def _extract_base_url(url: str) -> str:
@@ -45,25 +127,49 @@ class BaseHandler(ABC):
     def _sanitise_feed_url(self) -> None:
         # Prepares url with query parameters
         parsed = urlparse(self.feed_url)
-        query = parse_qs(parsed.query)  
-        query['limit'] = [str(self.limit)]
+        query = parse_qs(parsed.query)
+        query["limit"] = [str(self.limit)]
         if self.after is not None:
-            query['after'] = [self.after]
+            query["after"] = [self.after]
         new_query = urlencode(query, doseq=True)
         self.feed_url = urlunparse(parsed._replace(query=new_query))
 
-    def _fetch_feed(self) -> str:
+    def _fetch_feed(self, headers: Optional[Dict[str, str]] = None) -> Optional[str]:
         """
         Fetch the RSS feed for the given URL.
+        Returns None if a conditional request came back 304 Not Modified.
+        """
+        self._sanitise_feed_url()
+        with get_perf().span("fetch", feed=self.base_url):
+            response = get_transport().get(self.feed_url, headers=headers)
+        if response.status_code == 304:
+            return None
+        response.raise_for_status()
+        self._read_validators(response.headers)
+        return response.text
+
+    async def _afetch_feed(
+        self, headers: Optional[Dict[str, str]] = None
+    ) -> Optional[str]:
+        """
+        Async version of _fetch_feed, raises httpx.HTTPStatusError rather than requests'
+        HTTPError
         """
-        header = {
-            'User-Agent': get_random_user_agent()
-        }
         self._sanitise_feed_url()
-        response = requests.get(self.feed_url, headers=header)
+        with get_perf().span("fetch", feed=self.base_url):
+            response = await get_async_transport().get(
+                self.feed_url, headers=headers, priority=self.priority
+            )
+        if response.status_code == 304:
+            return None
         response.raise_for_status()
+        self._read_validators(response.headers)
         return response.text
 
+    def _read_validators(self, headers: Mapping[str, str]) -> None:
+        self.etag = headers.get("ETag")
+        self.last_modified = headers.get("Last-Modified")
+
     @abstractmethod
     def _parse_feed(self) -> List[RedditPost]:
         pass
@@ -72,126 +178,482 @@ class BaseHandler(ABC):
         """Return the parsed feed on demand, fetching and parsing if necessary."""
         if self.feed is not None:
             return self.feed
-        
+
         self.raw_feed = self._fetch_feed()
-        self.feed = self._parse_feed()
+        return self._finish_get_feed()
+
+    async def aget_feed(self) -> List[RedditPost]:
+        """
+        Async get_feed. Only the network wait is async, parsing and the sqlite write go
+        to a thread
+        """
+        if self.feed is not None:
+            return self.feed
+        return await self._single_flight("get", self._aget_feed)
+
+    async def _aget_feed(self) -> List[RedditPost]:
+        self.raw_feed = await self._afetch_feed()
+        return await asyncio.to_thread(self._finish_get_feed)
+
+    async def _single_flight(
+        self, kind: str, work: Callable[[], Awaitable[List[RedditPost]]]
+    ) -> List[RedditPost]:
+        """
+        Run work, or if another handler is already doing the same thing for this url,
+        share its result
+        """
+
+        async def run() -> Tuple[BaseHandler, List[RedditPost]]:
+            return self, await work()
+
+        leader, posts = await _feed_flights.do((kind, self.feed_url), run)
+        if leader is not self:
+            self.feed = leader.feed
+            self.next_after = leader.next_after
+            self.etag = leader.etag
+            self.last_modified = leader.last_modified
+        return posts
+
+    async def astream_feed(self) -> AsyncIterator[List[RedditPost]]:
+        """
+        Yield the feed in batches as it arrives so the first rows can be drawn early.
+        Handlers that can't parse incrementally just yield the whole feed once.
+        """
+        yield await self.aget_feed()
+
+    def _dedup(self, posts: List[RedditPost], reset: bool = False) -> List[RedditPost]:
+        """
+        Drop posts this feed (or any feed, with cross_feed on) has already handed out
+        """
+        if posts:
+            self.next_after = posts[-1].name
+        if not self.dedup:
+            return posts
+        return get_seen_index().filter(self.base_url, posts, reset=reset)
+
+    def _timed_parse(self) -> List[RedditPost]:
+        with get_perf().span("parse", feed=self.base_url) as span:
+            posts = self._parse_feed()
+            span["posts"] = len(posts)
+        return posts
+
+    def _finish_get_feed(self) -> List[RedditPost]:
+        # A first page starts the listing over, later pages are checked against
+        # everything before them
+        self.feed = self._dedup(self._timed_parse(), reset=self.after is None)
         # Cache the feed for future use
-        self.FEED_CACHE[self.base_url] = self.feed
+        self._cache_feed()
+        self._store_feed()
+        self._index_posts(self.feed)
         return self.feed
 
+    def _cache_feed(self) -> None:
+        if self.feed is not None:
+            self.feed_cache.put(self.base_url, self.feed, ttl=self.ttl)
+
+    def _store_feed(self) -> None:
+        # Only the first page is persisted, that's all we need for a warm start
+        store = get_feed_store()
+        if store is None or self.feed is None or self.after is not None:
+            return
+        with get_perf().span("store", feed=self.base_url):
+            store.save(
+                self.base_url,
+                self.feed,
+                etag=self.etag,
+                last_modified=self.last_modified,
+            )
+
+    def _index_posts(self, posts: List[RedditPost]) -> None:
+        # Every page that gets parsed ends up searchable
+        index = get_search_index()
+        if index is not None and posts:
+            with get_perf().span("index", feed=self.base_url, posts=len(posts)):
+                index.add(self.base_url, posts)
+
+    def cache_stored_feed(self, stored: StoredFeed) -> None:
+        """
+        Adopt a stored copy as the current feed, cached for whatever is left of its ttl
+        """
+        self.feed = stored.posts
+        remaining = self.ttl - stored.age
+        if remaining > 0:
+            self.feed_cache.put(self.base_url, self.feed, ttl=remaining)
+
+    def get_stored_feed(self) -> Optional[StoredFeed]:
+        """Return the copy of this feed persisted by a previous run, if there is one"""
+        store = get_feed_store()
+        if store is None:
+            return None
+        stored = store.load(self.base_url)
+        if stored is not None:
+            # Whatever gets paged in after the stored copy is checked against it
+            stored.posts = self._dedup(stored.posts, reset=True)
+        return stored
+
+    async def aget_stored_feed(self) -> Optional[StoredFeed]:
+        return await asyncio.to_thread(self.get_stored_feed)
+
+    @staticmethod
+    def _conditional_headers(stored: StoredFeed) -> Dict[str, str]:
+        headers = {}
+        if stored.etag:
+            headers["If-None-Match"] = stored.etag
+        if stored.last_modified:
+            headers["If-Modified-Since"] = stored.last_modified
+        return headers
+
+    def revalidate_feed(self, stored: StoredFeed) -> Optional[List[RedditPost]]:
+        """
+        Conditionally refetch a stored feed.
+        Returns the new posts, or None if reddit says the stored copy is still current.
+        """
+        raw_feed = self._fetch_feed(headers=self._conditional_headers(stored))
+        return self._finish_revalidation(stored, raw_feed)
+
+    async def arevalidate_feed(self, stored: StoredFeed) -> Optional[List[RedditPost]]:
+        raw_feed = await self._afetch_feed(headers=self._conditional_headers(stored))
+        return await asyncio.to_thread(self._finish_revalidation, stored, raw_feed)
+
+    def _finish_revalidation(
+        self, stored: StoredFeed, raw_feed: Optional[str]
+    ) -> Optional[List[RedditPost]]:
+        if raw_feed is None:
+            store = get_feed_store()
+            if store is not None:
+                store.touch(self.base_url)
+            # Reddit says it's current, so its ttl starts over
+            stored.fetched_at = time.time()
+            self.cache_stored_feed(stored)
+            return None
+
+        self.raw_feed = raw_feed
+        return self._finish_get_feed()
+
     def load_more_posts(self) -> List[RedditPost]:
         """
         Used when the feed has already been loaded to get more posts
         Same as get_feed but will add to feed rather than replacing
         """
         self.raw_feed = self._fetch_feed()
-        new_posts = self._parse_feed()
-        # Get pre-existing posts
-        old_posts = self.FEED_CACHE.get(self.feed_url, [])
-        self.feed = old_posts + new_posts
-
-        # Update cache
-        self.FEED_CACHE[self.base_url] = self.feed
+        return self._finish_load_more()
+
+    async def aload_more_posts(self) -> List[RedditPost]:
+        return await self._single_flight("more", self._aload_more_posts)
+
+    async def _aload_more_posts(self) -> List[RedditPost]:
+        self.raw_feed = await self._afetch_feed()
+        return await asyncio.to_thread(self._finish_load_more)
+
+    def _finish_load_more(self) -> List[RedditPost]:
+        assert self.raw_feed is not None, "Unconditional fetch can't be Not Modified"
+        new_posts = self._dedup(self._timed_parse())
+        # Get pre-existing posts, keyed on base_url like everything else so the query
+        # string doesn't matter
+        old_posts = self.feed_cache.get(self.base_url)
+        if old_posts is not None:
+            self.feed = old_posts + new_posts
+            self._cache_feed()
+        else:
+            # The first page expired or never made it into the cache. Caching this page
+            # on its own would have the feed open at post #25 next time
+            self.feed = new_posts
+        self._index_posts(new_posts)
         return new_posts
 
 
-class RSSHandler(BaseHandler):
-    @staticmethod
-    def _clean_content(content: str) -> str:
-        soup = BeautifulSoup(content, "html.parser")
+HTML_PARSER = "html.parser"
 
-        text = soup.get_text(separator="\n\n")
 
-        text = text.split("submitted by")[0]
+def _usable_html_parser(parser: str) -> str:
+    # find_spec rather than an import so nothing gets loaded until an RSS feed is
+    # actually parsed
+    if parser != HTML_PARSER and importlib.util.find_spec(parser) is None:
+        logging.warning(f"rss.html_parser {parser!r} isn't there, using {HTML_PARSER}")
+        return HTML_PARSER
+    return parser
 
-        text = textwrap.dedent(text)
 
-        lines = [line.rstrip() for line in text.splitlines()]
-        text = "\n".join(lines)
+def parse_entry_content(
+    content: str, parser: str = HTML_PARSER
+) -> Tuple[str, Optional[str], Optional[str]]:
+    """
+    Pull everything we need out of an RSS entry's HTML in one parse.
+    Returns the clean text, the external [link] url and the first image url.
+    Module level so it can be shipped off to a process pool.
+    """
+    if not content:
+        return "", None, None
 
-        # collapse 3+ newlines into 2
-        text = re.sub(r"\n{3,}", "\n\n", text)
+    # bs4 is only needed for RSS feeds, which most people never open, so it isn't loaded
+    # up front
+    from bs4 import BeautifulSoup
 
-        return text.strip()
-    
-    @staticmethod
-    def _extract_external_url(content: str) -> Optional[str]:
-        """External URLs have placeholder text [link] so can be easily found"""
-        soup = BeautifulSoup(content, "html.parser")
+    soup = BeautifulSoup(content, parser)
 
-        link_tag = soup.find("a", text="[link]")
-        external_url = str(link_tag["href"]) if link_tag else None
+    # External URLs have placeholder text [link] so can be easily found
+    link_tag = soup.find("a", string="[link]")
+    external_url = str(link_tag["href"]) if link_tag else None
+    # Defaults to the link to the post
+    if external_url and "reddit.com" in external_url:
+        external_url = None
 
-        # Defaults to the link to the post
-        if external_url and "reddit.com" in external_url:
-            return None
+    img = soup.find("img")
+    image_url = str(img["src"]) if img and img.get("src") else None
 
-        return external_url
+    text = soup.get_text(separator="\n\n")
 
+    text = text.split("submitted by")[0]
 
-    @staticmethod
-    def _extract_image_url(content: str) -> Optional[str]:
-        if not content:
-            return None
+    text = textwrap.dedent(text)
+
+    lines = [line.rstrip() for line in text.splitlines()]
+    text = "\n".join(lines)
+
+    # collapse 3+ newlines into 2
+    text = re.sub(r"\n{3,}", "\n\n", text)
+
+    return text.strip(), external_url, image_url
+
+
+_process_pool: Optional[ProcessPoolExecutor] = None
+_process_pool_lock = threading.Lock()
+
+
+def _get_process_pool(workers: int) -> ProcessPoolExecutor:
+    global _process_pool
+    with _process_pool_lock:
+        if _process_pool is None:
+            # By now the process has the log writer, httpx and executor threads going,
+            # and forking a threaded process can deadlock the child. forkserver forks
+            # from a clean single threaded server instead, spawn is the fallback where
+            # that isn't available (Windows)
+            method = (
+                "forkserver"
+                if "forkserver" in multiprocessing.get_all_start_methods()
+                else "spawn"
+            )
+            _process_pool = ProcessPoolExecutor(
+                max_workers=workers, mp_context=multiprocessing.get_context(method)
+            )
+            atexit.register(shutdown_process_pool)
+        return _process_pool
 
-        soup = BeautifulSoup(content, "html.parser")
 
-        img = soup.find("img")
+def shutdown_process_pool() -> None:
+    """Stop the RSS workers, anything still queued is dropped"""
+    global _process_pool
+    with _process_pool_lock:
+        if _process_pool is not None:
+            _process_pool.shutdown(wait=False, cancel_futures=True)
+            _process_pool = None
 
-        if img and img.get("src"):
-            return str(img["src"])
 
-        return None
+class RSSHandler(BaseHandler):
 
+    def _parse_contents(
+        self, contents: List[str]
+    ) -> List[Tuple[str, Optional[str], Optional[str]]]:
+        config = read_rss_config_from_yaml(get_config_path())
+        parser = _usable_html_parser(config.html_parser)
+        parse = partial(parse_entry_content, parser=parser)
+        # Spinning up worker processes only pays off on big feeds
+        if (
+            config.process_pool_min_entries
+            and len(contents) >= config.process_pool_min_entries
+        ):
+            workers = config.workers or os.cpu_count() or 1
+            chunksize = max(1, len(contents) // (4 * workers))
+            pool = _get_process_pool(workers)
+            return list(pool.map(parse, contents, chunksize=chunksize))
+        return [parse(content) for content in contents]
 
     def _parse_feed(self) -> List[RedditPost]:
         """Parse the raw feed data into structured RedditPost objects."""
         if self.raw_feed is None:
             raise Exception("Feed not fetched yet. Call fetch_feed() first.")
 
+        # Same as bs4, JSON feeds never need it
+        import feedparser
+
         feed = feedparser.parse(self.raw_feed)
-        
+
+        # Content is the raw HTML content of the post
+        contents = [entry.content[0].value for entry in feed.entries]
+        parsed_contents = self._parse_contents(contents)
+
         entries = []
-        for entry in feed.entries:
-            # Content is the raw HTML content of the post
-            content = entry.content[0].value
+        for entry, content, (content_clean, external_url, image_url) in zip(
+            feed.entries, contents, parsed_contents
+        ):
             entry_obj = RedditPost(
                 title=entry.title,
                 post_url=entry.link,
                 content_raw=content,
-                content_clean=self._clean_content(content),
-                subreddit=entry.tags[0].term if 'tags' in entry else 'Unknown',
-                external_url=self._extract_external_url(content),
-                image_url=self._extract_image_url(content)
+                content_clean=content_clean,
+                subreddit=entry.tags[0].term if "tags" in entry else "Unknown",
+                external_url=external_url,
+                image_url=image_url,
             )
             entries.append(entry_obj)
-        
+
         return entries
 
+
+class ListingStreamParser:
+    """
+    Incremental parser for a reddit listing. Feed it chunks of the body and it hands
+    back each child's data as soon as that child is complete, so nothing waits on the
+    whole page and only one child is held as a dict at a time.
+    """
+
+    CHILDREN_START = re.compile(r'"children"\s*:\s*\[')
+
+    def __init__(self) -> None:
+        self._decoder = json.JSONDecoder()
+        self._text_decoder = codecs.getincrementaldecoder("utf-8")()
+        self._buffer = ""
+        self._in_children = False
+        self.done = False
+
+    def feed(self, chunk: bytes) -> List[Dict[str, Any]]:
+        if self.done:
+            return []
+        self._buffer += self._text_decoder.decode(chunk)
+
+        if not self._in_children:
+            match = self.CHILDREN_START.search(self._buffer)
+            if match is None:
+                return []
+            self._buffer = self._buffer[match.end() :]
+            self._in_children = True
+
+        children = []
+        pos = 0
+        while True:
+            # Skip the separators between children
+            while pos < len(self._buffer) and self._buffer[pos] in " \t\r\n,":
+                pos += 1
+            if pos >= len(self._buffer):
+                break
+            if self._buffer[pos] == "]":
+                self.done = True
+                break
+            try:
+                child, pos = self._decoder.raw_decode(self._buffer, pos)
+            except json.JSONDecodeError:
+                # Child isn't all here yet, pick it up on the next chunk
+                break
+            children.append(child.get("data", {}))
+
+        self._buffer = self._buffer[pos:]
+        return children
+
+
 class JSONHandler(BaseHandler):
 
     REDDIT_BASE_URL = "https://www.reddit.com"
 
+    # How much of the body to read at a time when streaming
+    STREAM_CHUNK_SIZE = 16 * 1024
+
+    def _post_from_data(self, data: Dict[str, Any]) -> RedditPost:
+        return RedditPost(
+            title=data["title"],
+            post_url=urljoin(self.REDDIT_BASE_URL, data["permalink"]),
+            content_raw=data["selftext_html"],
+            content_clean=data["selftext"],
+            subreddit=data["subreddit"],
+            external_url=data.get("url_overridden_by_dest"),
+            image_url=(
+                data.get("url_overridden_by_dest")
+                if data.get("is_reddit_media_domain")
+                else None
+            ),
+            name=data.get("name"),  # Used for the 'after' query param for lazy loading
+        )
+
     def _parse_feed(self) -> List[RedditPost]:
         """Parse raw JSON into structured RedditPost objects."""
         if self.raw_feed is None:
             raise Exception("Feed not fetched yet. Call fetch_feed() first.")
 
-        feed = json.loads(self.raw_feed).get('data', {}).get('children', [])
+        feed = json.loads(self.raw_feed).get("data", {}).get("children", [])
 
-        entries = []
-        for entry in feed:
-            data = entry['data']
-            entry_obj = RedditPost(
-                title=data['title'],
-                post_url=urljoin(self.REDDIT_BASE_URL, data['permalink']),
-                content_raw=data['selftext_html'],
-                content_clean=data['selftext'],
-                subreddit=data['subreddit'],
-                external_url=data.get('url_overridden_by_dest'),
-                image_url=data.get('url_overridden_by_dest') if data.get('is_reddit_media_domain') else None,
-                meta={'name': data.get('name')} # Used for the 'after' query param for lazy loading
-            )
-            entries.append(entry_obj)
-        
-        return entries
+        return [self._post_from_data(entry["data"]) for entry in feed]
+
+    async def astream_feed(self) -> AsyncIterator[List[RedditPost]]:
+        """
+        Stream the listing, yielding posts every time a chunk completes one or more
+        children. Shares the "get" flight with aget_feed: if a fetch of this page is
+        already going (warm-up, say) this waits for it, and an aget_feed that comes
+        along mid stream waits for the stream.
+        """
+        if self.feed is not None:
+            yield self.feed
+            return
+
+        if ("get", self.feed_url) in _feed_flights:
+            yield await self.aget_feed()
+            return
+
+        # The stream runs as the flight's task so joiners don't depend on this generator
+        # being iterated, batches come back through the queue with None marking the end
+        batches: "asyncio.Queue[Optional[List[RedditPost]]]" = asyncio.Queue()
+
+        async def stream() -> List[RedditPost]:
+            try:
+                return await self._astream_into(batches.put_nowait)
+            finally:
+                batches.put_nowait(None)
+
+        flight = asyncio.ensure_future(self._single_flight("get", stream))
+        try:
+            while (batch := await batches.get()) is not None:
+                yield batch
+            # Raises whatever ended the stream early
+            await flight
+        finally:
+            # Dropping our interest, the stream itself carries on if anyone joined it
+            flight.cancel()
+
+    async def _astream_into(
+        self, emit: Callable[[List[RedditPost]], None]
+    ) -> List[RedditPost]:
+        self._sanitise_feed_url()
+        parser = ListingStreamParser()
+        posts: List[RedditPost] = []
+        perf = get_perf()
+        # first_rows is the wait before anything can be drawn, stream the whole page
+        started = perf.now()
+        async with get_async_transport().stream(
+            self.feed_url, priority=self.priority
+        ) as response:
+            response.raise_for_status()
+            self._read_validators(response.headers)
+            async for chunk in response.aiter_bytes(chunk_size=self.STREAM_CHUNK_SIZE):
+                batch = [self._post_from_data(data) for data in parser.feed(chunk)]
+                batch = self._dedup(batch, reset=not posts and self.after is None)
+                if batch:
+                    if not posts:
+                        perf.record("first_rows", started, feed=self.base_url)
+                    posts.extend(batch)
+                    emit(batch)
+        # An HTML error page or a body cut off early never closes the children array.
+        # Whatever did stream in is only part of the listing, so it mustn't replace the
+        # cached or stored copy
+        if not parser.done:
+            raise ValueError(f"Listing from {self.feed_url} ended before its posts did")
+        perf.record("stream", started, feed=self.base_url, posts=len(posts))
+
+        self.feed = posts
+        self._cache_feed()
+        await asyncio.to_thread(self._store_feed)
+        await asyncio.to_thread(self._index_posts, posts)
+        return posts
+
+
+def handler_for_feed(feed: Feed, **kwargs: Any) -> BaseHandler:
+    """Pick the right handler for a configured feed"""
+    handler_class = RSSHandler if ".rss" in feed.url else JSONHandler
+    return handler_class(feed.url, ttl=feed.ttl, **kwargs)
@@ -0,0 +1,189 @@
+import logging
+import os
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from typing import List
+from typing import Optional
+
+from reddit_cli.common import RedditPost
+from reddit_cli.utils import get_cache_dir
+
+# Bump whenever the tables change, it's only a cache so old ones are just dropped
+SCHEMA_VERSION = 2
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS feeds (
+    base_url TEXT PRIMARY KEY,
+    etag TEXT,
+    last_modified TEXT,
+    fetched_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS posts (
+    base_url TEXT NOT NULL REFERENCES feeds(base_url) ON DELETE CASCADE,
+    position INTEGER NOT NULL,
+    title TEXT NOT NULL,
+    post_url TEXT NOT NULL,
+    subreddit TEXT NOT NULL,
+    content_raw TEXT,
+    content_clean TEXT,
+    external_url TEXT,
+    image_url TEXT,
+    name TEXT,
+    PRIMARY KEY (base_url, position)
+);
+"""
+
+
+@dataclass
+class StoredFeed:
+    """
+    A feed as it was last fetched, along with the validators needed to revalidate it
+    """
+
+    posts: List[RedditPost]
+    etag: Optional[str]
+    last_modified: Optional[str]
+    fetched_at: float
+
+    @property
+    def age(self) -> float:
+        return time.time() - self.fetched_at
+
+    def is_fresh(self, ttl: float) -> bool:
+        return self.age < ttl
+
+
+class FeedStore:
+    """
+    SQLite backed store of parsed feeds, keyed by the feed's base url.
+    Lets the app draw the last known copy of a feed straight away on launch.
+    """
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # Handlers are called from executor threads, so share one connection behind a
+        # lock
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA foreign_keys = ON")
+        self._conn.execute("PRAGMA journal_mode = WAL")
+        if self._conn.execute("PRAGMA user_version").fetchone()[0] != SCHEMA_VERSION:
+            self._conn.executescript(
+                "DROP TABLE IF EXISTS posts; DROP TABLE IF EXISTS feeds;"
+            )
+            self._conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+        self._conn.executescript(SCHEMA)
+
+    def load(self, base_url: str) -> Optional[StoredFeed]:
+        with self._lock:
+            feed_row = self._conn.execute(
+                "SELECT etag, last_modified, fetched_at FROM feeds WHERE base_url = ?",
+                (base_url,),
+            ).fetchone()
+            if feed_row is None:
+                return None
+            post_rows = self._conn.execute(
+                "SELECT title, post_url, subreddit, content_raw, content_clean, "
+                "external_url, image_url, name "
+                "FROM posts WHERE base_url = ? ORDER BY position",
+                (base_url,),
+            ).fetchall()
+
+        posts = [
+            RedditPost(
+                title=title,
+                post_url=post_url,
+                subreddit=subreddit,
+                content_raw=content_raw or "",
+                content_clean=content_clean or "",
+                external_url=external_url,
+                image_url=image_url,
+                name=name,
+            )
+            for (
+                title,
+                post_url,
+                subreddit,
+                content_raw,
+                content_clean,
+                external_url,
+                image_url,
+                name,
+            ) in post_rows
+        ]
+        etag, last_modified, fetched_at = feed_row
+        return StoredFeed(
+            posts=posts, etag=etag, last_modified=last_modified, fetched_at=fetched_at
+        )
+
+    def save(
+        self,
+        base_url: str,
+        posts: List[RedditPost],
+        etag: Optional[str] = None,
+        last_modified: Optional[str] = None,
+    ) -> None:
+        rows = [
+            (
+                base_url,
+                position,
+                post.title,
+                post.post_url,
+                post.subreddit,
+                post.content_raw,
+                post.content_clean,
+                post.external_url,
+                post.image_url,
+                post.name,
+            )
+            for position, post in enumerate(posts)
+        ]
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO feeds "
+                "(base_url, etag, last_modified, fetched_at) VALUES (?, ?, ?, ?)",
+                (base_url, etag, last_modified, time.time()),
+            )
+            self._conn.execute("DELETE FROM posts WHERE base_url = ?", (base_url,))
+            self._conn.executemany(
+                "INSERT INTO posts (base_url, position, title, post_url, subreddit, "
+                "content_raw, content_clean, external_url, image_url, name) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                rows,
+            )
+
+    def touch(self, base_url: str) -> None:
+        """
+        Mark a feed as freshly validated without rewriting its posts (i.e. after a 304)
+        """
+        with self._lock, self._conn:
+            self._conn.execute(
+                "UPDATE feeds SET fetched_at = ? WHERE base_url = ?",
+                (time.time(), base_url),
+            )
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+_store: Optional[FeedStore] = None
+_store_failed = False
+_store_lock = threading.Lock()
+
+
+def get_feed_store() -> Optional[FeedStore]:
+    """Return the shared feed store, or None if the cache dir can't be used"""
+    global _store, _store_failed
+    with _store_lock:
+        if _store is None and not _store_failed:
+            try:
+                _store = FeedStore(os.path.join(get_cache_dir(), "feeds.sqlite3"))
+            except (OSError, sqlite3.Error) as e:
+                # Not fatal, we just lose the warm start
+                logging.warning(f"Feed store unavailable: {e}")
+                _store_failed = True
+        return _store
@@ -0,0 +1,196 @@
+import asyncio
+import hashlib
+import logging
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+from typing import List
+from typing import Optional
+from typing import Tuple
+
+from reddit_cli.cache import LRUCache
+from reddit_cli.common import get_config_path
+from reddit_cli.utils import get_cache_dir
+from reddit_cli.utils import read_cache_config_from_yaml
+
+
+def url_key(url: str) -> str:
+    return hashlib.sha256(url.encode("utf-8")).hexdigest()
+
+
+class DiskImageCache:
+    """
+    Content addressed image files keyed by a hash of the url. The directory is only
+    walked once, to build an index of path -> size in least recently used order (from
+    the file mtimes, which reads still bump so the order survives a restart). After that
+    eviction pops the oldest entries off the index rather than rescanning.
+    """
+
+    def __init__(self, directory: str, max_bytes: int) -> None:
+        self.directory = directory
+        self.max_bytes = max_bytes
+        os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self._index: OrderedDict[str, int] = OrderedDict(
+            (path, size)
+            for path, size, _ in sorted(self._scan(), key=lambda entry: entry[2])
+        )
+        self._bytes = sum(self._index.values())
+
+    def _path(self, url: str) -> str:
+        key = url_key(url)
+        # Fan out on the first two hex chars so no single dir gets huge
+        return os.path.join(self.directory, key[:2], key)
+
+    def _scan(self) -> List[Tuple[str, int, float]]:
+        entries = []
+        for root, _, files in os.walk(self.directory):
+            for name in files:
+                path = os.path.join(root, name)
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                entries.append((path, stat.st_size, stat.st_mtime))
+        return entries
+
+    def get(self, url: str) -> Optional[bytes]:
+        path = self._path(url)
+        try:
+            with open(path, "rb") as f:
+                data = f.read()
+            os.utime(path)
+        except OSError:
+            return None
+        with self._lock:
+            self._touch(path, len(data))
+        return data
+
+    def __contains__(self, url: object) -> bool:
+        # Goes by the index so it never touches the disk, a file deleted behind our
+        # back just gets downloaded again when it's opened
+        if not isinstance(url, str):
+            return False
+        with self._lock:
+            return self._path(url) in self._index
+
+    def _touch(self, path: str, size: int) -> None:
+        """
+        Mark path as the most recently used, keeping the byte count in step with its
+        size
+        """
+        self._bytes += size - self._index.pop(path, 0)
+        self._index[path] = size
+
+    def put(self, url: str, data: bytes) -> None:
+        if len(data) > self.max_bytes:
+            return
+        path = self._path(url)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+
+        with self._lock:
+            # Write to a temp file and swap it in so a crash never leaves half an image
+            # behind
+            fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path))
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+
+            self._touch(path, len(data))
+            if self._bytes > self.max_bytes:
+                self._evict()
+
+    def _evict(self) -> None:
+        while self._bytes > self.max_bytes and self._index:
+            path, size = self._index.popitem(last=False)
+            self._bytes -= size
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                # Already gone, someone cleared the cache dir by hand
+                pass
+            except OSError as e:
+                logging.warning(f"Could not evict {path} from the image cache: {e}")
+
+
+class ImageCache:
+    """
+    Two tier image cache, recently shown images in memory with everything else on disk
+    """
+
+    def __init__(
+        self, memory: LRUCache[str, bytes], disk: Optional[DiskImageCache]
+    ) -> None:
+        self.memory = memory
+        self.disk = disk
+
+    def get(self, url: str) -> Optional[bytes]:
+        data = self.memory.get(url)
+        if data is not None:
+            return data
+
+        if self.disk is None:
+            return None
+        data = self.disk.get(url)
+        if data is not None:
+            # Promote it so flicking back and forth between posts skips the disk read
+            self.memory.put(url, data)
+        return data
+
+    def __contains__(self, url: object) -> bool:
+        # Unlike get this doesn't count towards the hit rate or promote anything
+        return url in self.memory or (self.disk is not None and url in self.disk)
+
+    def put(self, url: str, data: bytes) -> None:
+        self.memory.put(url, data)
+        if self.disk is not None:
+            try:
+                self.disk.put(url, data)
+            except OSError as e:
+                logging.warning(f"Could not write {url} to the image cache: {e}")
+
+
+_image_cache: Optional[ImageCache] = None
+_image_cache_lock = threading.Lock()
+
+
+def get_image_cache() -> ImageCache:
+    global _image_cache
+    with _image_cache_lock:
+        if _image_cache is None:
+            config = read_cache_config_from_yaml(get_config_path())
+            memory: LRUCache[str, bytes] = LRUCache(
+                max_entries=config.image_memory_entries,
+                max_bytes=int(config.image_memory_mb * 1024 * 1024),
+                sizeof=len,
+            )
+            disk: Optional[DiskImageCache] = None
+            try:
+                disk = DiskImageCache(
+                    os.path.join(get_cache_dir(), "images"),
+                    max_bytes=int(config.image_disk_mb * 1024 * 1024),
+                )
+            except OSError as e:
+                # Memory tier still works without it
+                logging.warning(f"Image disk cache unavailable: {e}")
+            _image_cache = ImageCache(memory, disk)
+        return _image_cache
+
+
+async def aget_image_cache() -> ImageCache:
+    """
+    get_image_cache for the event loop, the first call walks the disk cache so it goes
+    to a thread
+    """
+    if _image_cache is not None:
+        return _image_cache
+    return await asyncio.to_thread(get_image_cache)
+
+
+def peek_image_cache() -> Optional[ImageCache]:
+    """
+    The image cache if something has built it yet, for stats that shouldn't build it
+    themselves
+    """
+    return _image_cache
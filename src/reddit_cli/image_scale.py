@@ -0,0 +1,130 @@
+import asyncio
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+from typing import TYPE_CHECKING
+from typing import Optional
+from typing import Tuple
+
+from reddit_cli.cache import LRUCache
+from reddit_cli.common import get_config_path
+from reddit_cli.perf import get_perf
+from reddit_cli.utils import read_cache_config_from_yaml
+
+if TYPE_CHECKING:
+    from PIL import Image as PILImage
+
+# What textual_image assumes itself when the terminal won't say
+FALLBACK_CELL_SIZE = (10, 20)
+
+# Pillow drops the GIL while decoding and resampling, so a couple of threads is plenty
+DECODE_WORKERS = 2
+
+# (url, width px, height px)
+ScaleKey = Tuple[str, int, int]
+
+
+def cell_size() -> Tuple[int, int]:
+    """
+    Pixels per terminal cell as (width, height), from textual_image when it can tell
+    """
+    try:
+        from textual_image._terminal import get_cell_size
+
+        size = get_cell_size()
+        return (size.width, size.height)
+    except Exception as e:
+        # Private to textual_image so it could move, and it raises if stdout has gone
+        logging.debug(
+            f"Couldn't get the terminal cell size, assuming {FALLBACK_CELL_SIZE}: {e}"
+        )
+        return FALLBACK_CELL_SIZE
+
+
+def target_size(columns: int, rows: int) -> Tuple[int, int]:
+    """The most pixels an image drawn in columns x rows cells can actually show"""
+    width, height = cell_size()
+    return (max(1, columns) * width, max(1, rows) * height)
+
+
+def downscale(data: bytes, size: Tuple[int, int]) -> "PILImage.Image":
+    """
+    Decode an image and shrink it to fit size, keeping its aspect ratio. Never scales up
+    """
+    from PIL import Image
+
+    image: "PILImage.Image" = Image.open(BytesIO(data))
+    source = image.size
+    # JPEGs can be decoded straight to a fraction of their size, far cheaper than
+    # decoding it all
+    image.draft("RGB", size)
+    # Bicubic looks no different to lanczos at terminal resolution and takes about half
+    # as long
+    image.thumbnail(size, Image.Resampling.BICUBIC)
+    if image.mode not in ("RGB", "RGBA"):
+        image = image.convert(
+            "RGBA"
+            if "transparency" in image.info or image.mode in ("LA", "PA")
+            else "RGB"
+        )
+    # thumbnail() is lazy for some formats, make sure the work happens here and not on
+    # the UI thread
+    image.load()
+    logging.debug(f"Scaled image from {source} to {image.size}")
+    return image
+
+
+def _image_bytes(image: "PILImage.Image") -> int:
+    return image.width * image.height * len(image.getbands())
+
+
+class ImageScaler:
+    """
+    Decodes and downscales images in a small thread pool, keeping the results for each
+    (url, target size) so revisiting a post, or the same size terminal, skips the work
+    """
+
+    def __init__(
+        self, cache: LRUCache[ScaleKey, "PILImage.Image"], workers: int = DECODE_WORKERS
+    ) -> None:
+        self.cache = cache
+        self.executor = ThreadPoolExecutor(
+            max_workers=workers, thread_name_prefix="image-scale"
+        )
+
+    async def scale(
+        self, url: str, data: bytes, columns: int, rows: int
+    ) -> "PILImage.Image":
+        width, height = target_size(columns, rows)
+        key = (url, width, height)
+        image = self.cache.get(key)
+        if image is not None:
+            return image
+
+        with get_perf().span(
+            "image_decode", bytes=len(data), width=width, height=height
+        ):
+            image = await asyncio.get_running_loop().run_in_executor(
+                self.executor, downscale, data, (width, height)
+            )
+        self.cache.put(key, image)
+        return image
+
+
+_image_scaler: Optional[ImageScaler] = None
+_image_scaler_lock = threading.Lock()
+
+
+def get_image_scaler() -> ImageScaler:
+    global _image_scaler
+    with _image_scaler_lock:
+        if _image_scaler is None:
+            config = read_cache_config_from_yaml(get_config_path())
+            cache: LRUCache[ScaleKey, "PILImage.Image"] = LRUCache(
+                max_entries=config.scaled_image_entries,
+                max_bytes=int(config.scaled_image_mb * 1024 * 1024),
+                sizeof=_image_bytes,
+            )
+            _image_scaler = ImageScaler(cache)
+        return _image_scaler
@@ -0,0 +1,111 @@
+import atexit
+import copy
+import json
+import logging
+import os
+import queue
+from logging.handlers import QueueHandler
+from logging.handlers import QueueListener
+from logging.handlers import RotatingFileHandler
+from typing import Any
+from typing import Dict
+from typing import Optional
+
+from reddit_cli.common import LogConfig
+
+TEXT_FORMAT = "%(asctime)s | %(levelname)-8s | %(name)s | %(message)s"
+DATE_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+# Passed through extra= on a log call, the transport sets these on every response it
+# logs
+REQUEST_FIELDS = ("url", "status", "bytes", "duration_ms")
+
+
+class JsonFormatter(logging.Formatter):
+    """
+    One json object per line, with any request fields the record carries as keys of
+    their own
+    """
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry: Dict[str, Any] = {
+            "time": self.formatTime(record, DATE_FORMAT),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        for field in REQUEST_FIELDS:
+            if hasattr(record, field):
+                entry[field] = getattr(record, field)
+        if record.exc_text:
+            entry["exc"] = record.exc_text
+        return json.dumps(entry, default=str)
+
+
+class _QueueHandler(QueueHandler):
+    """
+    The stock prepare() bakes the traceback into the message, this keeps it in exc_text
+    so the text format still prints it underneath and the json format can give it a key
+    of its own
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+
+_listener: Optional[QueueListener] = None
+_queue_handler: Optional[QueueHandler] = None
+
+
+def setup_logging(config: LogConfig, default_path: str = "app.log") -> None:
+    """
+    Send the root logger through a queue to a rotating file written on a background
+    thread, so a log call on the event loop is an append to the queue rather than a disk
+    write
+    """
+    global _listener, _queue_handler
+    if _listener is not None:
+        return
+
+    path = os.path.expanduser(config.path or default_path)
+    file_handler = RotatingFileHandler(
+        path,
+        maxBytes=config.max_bytes,
+        backupCount=config.backups,
+        encoding="utf-8",
+        delay=True,
+    )
+    file_handler.setFormatter(
+        JsonFormatter() if config.json else logging.Formatter(TEXT_FORMAT, DATE_FORMAT)
+    )
+
+    log_queue: "queue.SimpleQueue[logging.LogRecord]" = queue.SimpleQueue()
+    root = logging.getLogger()
+    _queue_handler = _QueueHandler(log_queue)
+    root.addHandler(_queue_handler)
+    level = logging.getLevelName(config.level.upper())
+    root.setLevel(level if isinstance(level, int) else logging.DEBUG)
+
+    _listener = QueueListener(log_queue, file_handler, respect_handler_level=True)
+    _listener.start()
+    # Whatever is still queued gets written out before the process goes
+    atexit.register(stop_logging)
+
+
+def stop_logging() -> None:
+    """Write out whatever is queued and close the file, setup_logging can run again"""
+    global _listener, _queue_handler
+    if _queue_handler is not None:
+        logging.getLogger().removeHandler(_queue_handler)
+        _queue_handler = None
+    if _listener is not None:
+        _listener.stop()
+        for handler in _listener.handlers:
+            handler.close()
+        _listener = None
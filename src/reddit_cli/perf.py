@@ -0,0 +1,168 @@
+import json
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Any
+from typing import Deque
+from typing import Dict
+from typing import Iterator
+from typing import List
+from typing import Optional
+
+from reddit_cli.common import PerfConfig
+from reddit_cli.common import get_config_path
+from reddit_cli.utils import get_cache_dir
+from reddit_cli.utils import read_perf_config_from_yaml
+
+
+class Span:
+    """
+    One timed piece of work, start is wall clock so exported spans line up with the log
+    """
+
+    __slots__ = ("name", "start", "ms", "fields")
+
+    def __init__(
+        self, name: str, start: float, ms: float, fields: Dict[str, Any]
+    ) -> None:
+        self.name = name
+        self.start = start
+        self.ms = ms
+        self.fields = fields
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "name": self.name,
+            "start": self.start,
+            "ms": round(self.ms, 3),
+            **self.fields,
+        }
+
+
+@dataclass
+class SpanSummary:
+    name: str
+    count: int
+    last_ms: float
+    p50_ms: float
+    p95_ms: float
+    max_ms: float
+
+
+class RollingHistogram:
+    """
+    The most recent timings for one span name, percentiles are worked out when asked for
+    """
+
+    def __init__(self, window: int) -> None:
+        self.samples: Deque[float] = deque(maxlen=window)
+        self.count = 0
+
+    def add(self, ms: float) -> None:
+        self.samples.append(ms)
+        self.count += 1
+
+    def summary(self, name: str) -> SpanSummary:
+        ordered = sorted(self.samples)
+
+        def percentile(fraction: float) -> float:
+            return (
+                ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+                if ordered
+                else 0.0
+            )
+
+        return SpanSummary(
+            name=name,
+            count=self.count,
+            last_ms=self.samples[-1] if self.samples else 0.0,
+            p50_ms=percentile(0.5),
+            p95_ms=percentile(0.95),
+            max_ms=ordered[-1] if ordered else 0.0,
+        )
+
+
+class PerfRecorder:
+    """
+    Cheap enough to leave on: a span is two perf_counter calls and an append under a
+    lock. Timings land in a rolling histogram per name for the overlay, and in a bounded
+    list of raw spans for exporting.
+    """
+
+    def __init__(self, config: PerfConfig) -> None:
+        self.config = config
+        self.enabled = config.enabled
+        self._lock = threading.Lock()
+        self._histograms: Dict[str, RollingHistogram] = {}
+        self._spans: Deque[Span] = deque(maxlen=max(1, config.max_spans))
+
+    @staticmethod
+    def now() -> float:
+        return time.perf_counter()
+
+    def record(self, name: str, started: float, **fields: Any) -> None:
+        """
+        Record a span that began at started (from now()), for work that doesn't fit in a
+        with block
+        """
+        if not self.enabled:
+            return
+        ms = (time.perf_counter() - started) * 1000
+        span = Span(name, time.time() - ms / 1000, ms, fields)
+        with self._lock:
+            histogram = self._histograms.get(name)
+            if histogram is None:
+                histogram = self._histograms[name] = RollingHistogram(
+                    self.config.window
+                )
+            histogram.add(ms)
+            self._spans.append(span)
+
+    @contextmanager
+    def span(self, name: str, **fields: Any) -> Iterator[Dict[str, Any]]:
+        """
+        Time the block. Yields the span's fields so the block can add what it found out
+        (post counts etc)
+        """
+        started = time.perf_counter()
+        try:
+            yield fields
+        finally:
+            self.record(name, started, **fields)
+
+    def summaries(self) -> List[SpanSummary]:
+        with self._lock:
+            return [
+                histogram.summary(name)
+                for name, histogram in sorted(self._histograms.items())
+            ]
+
+    def export(self, path: Optional[str] = None) -> str:
+        """Write the raw spans as JSON lines, returns where they went"""
+        if not path:
+            path = os.path.join(
+                get_cache_dir(), f"perf-{time.strftime('%Y%m%d-%H%M%S')}.jsonl"
+            )
+        path = os.path.expanduser(path)
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with self._lock:
+            spans = list(self._spans)
+        with open(path, "w", encoding="utf-8") as f:
+            for span in spans:
+                f.write(json.dumps(span.to_dict()) + "\n")
+        return path
+
+
+_perf: Optional[PerfRecorder] = None
+_perf_lock = threading.Lock()
+
+
+def get_perf() -> PerfRecorder:
+    global _perf
+    with _perf_lock:
+        if _perf is None:
+            _perf = PerfRecorder(read_perf_config_from_yaml(get_config_path()))
+        return _perf
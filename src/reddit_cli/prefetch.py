@@ -0,0 +1,81 @@
+import asyncio
+import logging
+from typing import Awaitable
+from typing import Callable
+from typing import Dict
+from typing import List
+from typing import Optional
+
+from reddit_cli.common import PrefetchConfig
+
+# Fetches one url and returns the bytes downloaded
+PrefetchFn = Callable[[str], Awaitable[int]]
+
+
+class Prefetcher:
+    """
+    Background fetcher for the payloads around the cursor. Waits for the cursor to
+    settle, runs a bounded number of fetches at once, stops once the session byte budget
+    is used up, and drops anything that's no longer wanted.
+    """
+
+    def __init__(self, config: PrefetchConfig, fetch: PrefetchFn) -> None:
+        self.config = config
+        self.fetch = fetch
+        self.bytes_fetched = 0
+        self._semaphore = asyncio.Semaphore(config.concurrency)
+        self._pending: Optional[asyncio.Task[None]] = None
+        self._tasks: Dict[str, asyncio.Task[None]] = {}
+
+    @property
+    def budget_left(self) -> bool:
+        return self.bytes_fetched < self.config.max_total_mb * 1024 * 1024
+
+    def schedule(self, urls: List[str]) -> None:
+        """
+        Prefetch these urls once the cursor has rested for a moment, replacing any
+        previous request
+        """
+        if self._pending is not None:
+            self._pending.cancel()
+        self._pending = asyncio.create_task(self._debounce(urls))
+
+    async def _debounce(self, urls: List[str]) -> None:
+        await asyncio.sleep(self.config.delay)
+        wanted = set(urls)
+
+        # Cursor has moved on from these
+        for url in list(self._tasks):
+            if url not in wanted:
+                self._cancel_task(url)
+
+        for url in urls:
+            if url in self._tasks or not self.budget_left:
+                continue
+            self._tasks[url] = asyncio.create_task(self._run(url))
+
+    async def _run(self, url: str) -> None:
+        try:
+            async with self._semaphore:
+                if not self.budget_left:
+                    return
+                self.bytes_fetched += await self.fetch(url)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            # Purely speculative so failures don't matter, the real fetch will report
+            # them
+            logging.debug(f"Prefetch of {url} failed: {e}")
+        finally:
+            if self._tasks.get(url) is asyncio.current_task():
+                del self._tasks[url]
+
+    def _cancel_task(self, url: str) -> None:
+        self._tasks.pop(url).cancel()
+
+    def cancel(self) -> None:
+        if self._pending is not None:
+            self._pending.cancel()
+            self._pending = None
+        for url in list(self._tasks):
+            self._cancel_task(url)
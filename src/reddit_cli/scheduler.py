@@ -0,0 +1,250 @@
+import asyncio
+import heapq
+import itertools
+import logging
+import threading
+import time
+from dataclasses import dataclass
+from enum import IntEnum
+from typing import Dict
+from typing import List
+from typing import Mapping
+from typing import Optional
+from typing import Tuple
+from urllib.parse import urlparse
+
+from reddit_cli.common import RateLimitConfig
+from reddit_cli.common import get_config_path
+from reddit_cli.utils import read_rate_limit_config_from_yaml
+
+
+class Priority(IntEnum):
+    """Lower goes first"""
+
+    FOREGROUND = 0  # something the user is waiting on
+    BACKGROUND = 1  # warm-up, revalidation, paging ahead
+    PREFETCH = 2  # speculative, fine to wait
+
+
+@dataclass
+class HostStats:
+    granted: int = 0
+    waited: float = 0.0
+    throttled: int = 0
+
+
+class HostLimiter:
+    """
+    Token bucket for one host, nudged by what the server says about its own limits.
+    Reddit sends X-Ratelimit-Remaining and X-Ratelimit-Reset (seconds until the window
+    resets), once remaining runs out we hold everything until the reset rather than eat
+    a 429. Not thread safe by itself, the scheduler's lock covers it.
+    """
+
+    def __init__(self, rate: float, burst: int) -> None:
+        self.rate = rate
+        self.burst = burst
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+        self.remaining: Optional[float] = None
+        self.reset_at: Optional[float] = None
+        self.paused_until = 0.0
+        self.stats = HostStats()
+
+    def _refill(self, now: float) -> None:
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        if self.reset_at is not None and now >= self.reset_at:
+            # New window, we don't know the budget until the next response tells us
+            self.remaining = None
+            self.reset_at = None
+
+    def wait_time(self, now: float) -> float:
+        """Seconds until a request may go out, 0 if it can go now"""
+        self._refill(now)
+        waits = [self.paused_until - now]
+        if self.tokens < 1:
+            waits.append((1 - self.tokens) / self.rate)
+        if (
+            self.remaining is not None
+            and self.remaining < 1
+            and self.reset_at is not None
+        ):
+            waits.append(self.reset_at - now)
+        return max(0.0, *waits)
+
+    def take(self) -> None:
+        self.tokens -= 1
+        if self.remaining is not None:
+            self.remaining -= 1
+        self.stats.granted += 1
+
+    def observe(self, now: float, status: int, headers: Mapping[str, str]) -> None:
+        remaining = headers.get("X-Ratelimit-Remaining")
+        reset = headers.get("X-Ratelimit-Reset")
+        try:
+            if remaining is not None and reset is not None:
+                self.remaining = float(remaining)
+                self.reset_at = now + float(reset)
+        except ValueError:
+            pass
+
+        if status == 429:
+            self.stats.throttled += 1
+            retry_after = headers.get("Retry-After")
+            pause = (
+                float(retry_after)
+                if retry_after is not None and retry_after.isdigit()
+                else None
+            )
+            if pause is None and self.reset_at is not None:
+                pause = self.reset_at - now
+            # Nothing to go on, back off a little and let the bucket carry on
+            self.paused_until = max(
+                self.paused_until, now + (pause if pause is not None else 2.0)
+            )
+            self.tokens = min(self.tokens, 0.0)
+
+
+class RequestScheduler:
+    """
+    Single gate every outgoing request goes through. One limiter per host and a priority
+    queue per host, so a foreground fetch always beats queued background work and
+    prefetch, and together they stay just under what the server allows. Async callers
+    queue by priority, threads (the sync pipeline) just wait their turn.
+    """
+
+    def __init__(self, config: RateLimitConfig) -> None:
+        self.config = config
+        self._lock = threading.Lock()
+        self._limiters: Dict[str, HostLimiter] = {}
+        # host -> heap of (priority, order, waiter)
+        self._queues: Dict[str, List[Tuple[int, int, asyncio.Future[None]]]] = {}
+        self._pumps: Dict[str, asyncio.Task[None]] = {}
+        self._order = itertools.count()
+
+    @staticmethod
+    def host_of(url: str) -> str:
+        return urlparse(url).netloc.lower()
+
+    def _is_reddit(self, host: str) -> bool:
+        return host == "reddit.com" or host.endswith(".reddit.com")
+
+    def _limiter(self, host: str) -> HostLimiter:
+        limiter = self._limiters.get(host)
+        if limiter is None:
+            if self._is_reddit(host):
+                limiter = HostLimiter(
+                    self.config.requests_per_minute / 60, self.config.burst
+                )
+            else:
+                limiter = HostLimiter(
+                    self.config.other_requests_per_minute / 60, self.config.other_burst
+                )
+            self._limiters[host] = limiter
+        return limiter
+
+    async def acquire(self, url: str, priority: Priority = Priority.FOREGROUND) -> None:
+        """
+        Wait until this request may go out. Cancelling the caller drops it from the
+        queue
+        """
+        if not self.config.enabled:
+            return
+        host = self.host_of(url)
+        loop = asyncio.get_running_loop()
+        waiter: asyncio.Future[None] = loop.create_future()
+        queued = loop.time()
+        with self._lock:
+            heapq.heappush(
+                self._queues.setdefault(host, []),
+                (int(priority), next(self._order), waiter),
+            )
+            pump = self._pumps.get(host)
+            if pump is None or pump.done() or pump.get_loop() is not loop:
+                self._pumps[host] = loop.create_task(self._pump(host))
+        await waiter
+        waited = loop.time() - queued
+        if waited > 0.5:
+            logging.debug(
+                f"Waited {waited:.1f}s for a {priority.name.lower()} slot on {host}"
+            )
+
+    async def _pump(self, host: str) -> None:
+        # Hands out slots for one host, best priority first, as fast as the limiter
+        # allows
+        while True:
+            with self._lock:
+                queue = self._queues.get(host, [])
+                # Drop waiters whose callers gave up
+                while queue and queue[0][2].done():
+                    heapq.heappop(queue)
+                if not queue:
+                    self._pumps.pop(host, None)
+                    return
+                limiter = self._limiter(host)
+                delay = limiter.wait_time(time.monotonic())
+                if delay <= 0:
+                    _, _, waiter = heapq.heappop(queue)
+                    limiter.take()
+                    waiter.set_result(None)
+                    continue
+                limiter.stats.waited += delay
+            # Sleep outside the lock, then pick again so anything more urgent that
+            # turned up goes first
+            await asyncio.sleep(delay)
+
+    def acquire_blocking(self, url: str) -> None:
+        """
+        Thread version of acquire, used by the sync transport. No priorities, first come
+        first served
+        """
+        if not self.config.enabled:
+            return
+        host = self.host_of(url)
+        while True:
+            with self._lock:
+                limiter = self._limiter(host)
+                delay = limiter.wait_time(time.monotonic())
+                if delay <= 0:
+                    limiter.take()
+                    return
+                limiter.stats.waited += delay
+            time.sleep(delay)
+
+    def observe(self, url: str, status: int, headers: Mapping[str, str]) -> None:
+        """
+        Feed a response's status and rate limit headers back into its host's limiter
+        """
+        if not self.config.enabled:
+            return
+        with self._lock:
+            self._limiter(self.host_of(url)).observe(time.monotonic(), status, headers)
+
+    def stats(self) -> Dict[str, HostStats]:
+        with self._lock:
+            return {host: limiter.stats for host, limiter in self._limiters.items()}
+
+    def queued(self) -> int:
+        """Requests waiting for a slot right now"""
+        with self._lock:
+            return sum(
+                1
+                for queue in self._queues.values()
+                for _, _, waiter in queue
+                if not waiter.done()
+            )
+
+
+_scheduler: Optional[RequestScheduler] = None
+_scheduler_lock = threading.Lock()
+
+
+def get_scheduler() -> RequestScheduler:
+    global _scheduler
+    with _scheduler_lock:
+        if _scheduler is None:
+            _scheduler = RequestScheduler(
+                read_rate_limit_config_from_yaml(get_config_path())
+            )
+        return _scheduler
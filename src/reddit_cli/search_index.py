@@ -0,0 +1,277 @@
+import logging
+import os
+import re
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from typing import List
+from typing import Optional
+
+from reddit_cli.common import RedditPost
+from reddit_cli.common import get_config_path
+from reddit_cli.dedup import post_key
+from reddit_cli.utils import get_cache_dir
+from reddit_cli.utils import read_search_config_from_yaml
+
+# Bump whenever the tables change, the index is rebuilt from whatever gets fetched next
+SCHEMA_VERSION = 1
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS posts (
+    id INTEGER PRIMARY KEY,
+    feed TEXT NOT NULL,
+    key TEXT NOT NULL,
+    title TEXT NOT NULL,
+    subreddit TEXT NOT NULL,
+    content_clean TEXT,
+    post_url TEXT NOT NULL,
+    external_url TEXT,
+    image_url TEXT,
+    name TEXT,
+    indexed_at REAL NOT NULL,
+    UNIQUE (feed, key)
+);
+CREATE INDEX IF NOT EXISTS posts_indexed_at ON posts (indexed_at);
+"""
+
+# External content table, so the text is only stored once and triggers keep it in step
+FTS_SCHEMA = """
+CREATE VIRTUAL TABLE IF NOT EXISTS posts_fts USING fts5(
+    title, subreddit, content_clean,
+    content='posts', content_rowid='id', tokenize='unicode61 remove_diacritics 2'
+);
+CREATE TRIGGER IF NOT EXISTS posts_ai AFTER INSERT ON posts BEGIN
+    INSERT INTO posts_fts (rowid, title, subreddit, content_clean)
+    VALUES (new.id, new.title, new.subreddit, new.content_clean);
+END;
+CREATE TRIGGER IF NOT EXISTS posts_ad AFTER DELETE ON posts BEGIN
+    INSERT INTO posts_fts (posts_fts, rowid, title, subreddit, content_clean)
+    VALUES ('delete', old.id, old.title, old.subreddit, old.content_clean);
+END;
+CREATE TRIGGER IF NOT EXISTS posts_au AFTER UPDATE ON posts BEGIN
+    INSERT INTO posts_fts (posts_fts, rowid, title, subreddit, content_clean)
+    VALUES ('delete', old.id, old.title, old.subreddit, old.content_clean);
+    INSERT INTO posts_fts (rowid, title, subreddit, content_clean)
+    VALUES (new.id, new.title, new.subreddit, new.content_clean);
+END;
+"""
+
+# Pruning takes the index this far under max_posts, so a full index isn't pruned on
+# every add
+PRUNE_SLACK = 0.1
+
+RESULT_COLUMNS = (
+    "p.feed, p.key, p.title, p.post_url, p.subreddit, p.content_clean, "
+    "p.external_url, p.image_url, p.name"
+)
+
+
+@dataclass
+class SearchResult:
+    feed: str
+    post: RedditPost
+
+
+def _terms(query: str) -> List[str]:
+    return re.findall(r"\w+", query.lower())
+
+
+def _fts_query(terms: List[str]) -> str:
+    # Every word has to match, the last one as a prefix so results show up while typing
+    quoted = [f'"{term}"' for term in terms]
+    quoted[-1] += "*"
+    return " ".join(quoted)
+
+
+class SearchIndex:
+    """
+    Local full text index of every post the handlers have parsed, so search never
+    touches the network. Uses SQLite FTS5 when it's compiled in and falls back to LIKE
+    scans when it isn't.
+    """
+
+    def __init__(self, path: str, max_posts: int = 50000) -> None:
+        self.path = path
+        self.max_posts = max_posts
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # Same deal as the feed store, handlers write from executor threads
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode = WAL")
+        if self._conn.execute("PRAGMA user_version").fetchone()[0] != SCHEMA_VERSION:
+            self._conn.executescript(
+                "DROP TABLE IF EXISTS posts_fts; DROP TABLE IF EXISTS posts;"
+            )
+            self._conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+        self._conn.executescript(SCHEMA)
+        try:
+            self._conn.executescript(FTS_SCHEMA)
+            self.has_fts = True
+        except sqlite3.OperationalError as e:
+            logging.warning(f"FTS5 unavailable, search will be slower: {e}")
+            self.has_fts = False
+        # Rows there could be, re-adding a post counts it again. Only recounted once it
+        # passes max_posts
+        self._count = self._row_count()
+
+    def _row_count(self) -> int:
+        return int(self._conn.execute("SELECT count(*) FROM posts").fetchone()[0])
+
+    def add(self, feed: str, posts: List[RedditPost]) -> None:
+        """Index (or refresh) posts under the feed they came from"""
+        now = time.time()
+        rows = [
+            (
+                feed,
+                post_key(post),
+                post.title,
+                post.subreddit,
+                post.content_clean,
+                post.post_url,
+                post.external_url,
+                post.image_url,
+                post.name,
+                now,
+            )
+            for post in posts
+        ]
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT INTO posts (feed, key, title, subreddit, content_clean, "
+                "post_url, external_url, image_url, name, indexed_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?) "
+                "ON CONFLICT (feed, key) DO UPDATE SET title = excluded.title, "
+                "subreddit = excluded.subreddit, "
+                "content_clean = excluded.content_clean, "
+                "external_url = excluded.external_url, "
+                "image_url = excluded.image_url, indexed_at = excluded.indexed_at",
+                rows,
+            )
+            self._count += len(rows)
+            if self._count > self.max_posts:
+                self._prune()
+
+    def _prune(self) -> None:
+        # Oldest posts go first once the index is over budget
+        count = self._row_count()
+        if count > self.max_posts:
+            keep = self.max_posts - int(self.max_posts * PRUNE_SLACK)
+            self._conn.execute(
+                "DELETE FROM posts WHERE id IN "
+                "(SELECT id FROM posts ORDER BY indexed_at LIMIT ?)",
+                (count - keep,),
+            )
+            count = keep
+        self._count = count
+
+    def search(
+        self, query: str, feed: Optional[str] = None, limit: int = 50
+    ) -> List[SearchResult]:
+        """
+        Best matches first. With no feed every feed is searched and each post only shows
+        up once
+        """
+        terms = _terms(query)
+        if not terms:
+            return []
+
+        feed_clause = " AND p.feed = ?" if feed is not None else ""
+        feed_params = [feed] if feed is not None else []
+        # Grab a few spare rows so dropping cross feed repeats doesn't come up short
+        fetch_limit = limit if feed is not None else limit * 2
+        if self.has_fts:
+            sql = (
+                f"SELECT {RESULT_COLUMNS} FROM posts_fts "
+                "JOIN posts p ON p.id = posts_fts.rowid "
+                f"WHERE posts_fts MATCH ?{feed_clause} "
+                "ORDER BY bm25(posts_fts, 10.0, 2.0, 1.0) LIMIT ?"
+            )
+            params: List[object] = [_fts_query(terms), *feed_params, fetch_limit]
+        else:
+            like = " AND ".join(
+                "(p.title LIKE ? OR p.subreddit LIKE ? OR p.content_clean LIKE ?)"
+                for _ in terms
+            )
+            sql = (
+                f"SELECT {RESULT_COLUMNS} FROM posts p WHERE {like}{feed_clause} "
+                "ORDER BY p.indexed_at DESC LIMIT ?"
+            )
+            params = (
+                [pattern for term in terms for pattern in [f"%{term}%"] * 3]
+                + feed_params
+                + [fetch_limit]
+            )
+
+        with self._lock:
+            try:
+                rows = self._conn.execute(sql, params).fetchall()
+            except sqlite3.OperationalError as e:
+                logging.error(f"Search for {query!r} failed: {e}")
+                return []
+
+        results = []
+        seen = set()
+        for (
+            row_feed,
+            key,
+            title,
+            post_url,
+            subreddit,
+            content_clean,
+            external_url,
+            image_url,
+            name,
+        ) in rows:
+            if key in seen:
+                continue
+            seen.add(key)
+            post = RedditPost(
+                title=title,
+                post_url=post_url,
+                subreddit=subreddit,
+                # The detail view only shows the clean body so the raw html isn't
+                # indexed
+                content_raw=None,
+                content_clean=content_clean,
+                external_url=external_url,
+                image_url=image_url,
+                name=name,
+            )
+            results.append(SearchResult(feed=row_feed, post=post))
+            if len(results) == limit:
+                break
+        return results
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._row_count()
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+_index: Optional[SearchIndex] = None
+_index_failed = False
+_index_lock = threading.Lock()
+
+
+def get_search_index() -> Optional[SearchIndex]:
+    """Return the shared search index, or None if it's turned off or can't be opened"""
+    global _index, _index_failed
+    with _index_lock:
+        if _index is None and not _index_failed:
+            config = read_search_config_from_yaml(get_config_path())
+            if not config.enabled:
+                _index_failed = True
+                return None
+            try:
+                _index = SearchIndex(
+                    os.path.join(get_cache_dir(), "search.sqlite3"),
+                    max_posts=config.max_posts,
+                )
+            except (OSError, sqlite3.Error) as e:
+                logging.warning(f"Search index unavailable: {e}")
+                _index_failed = True
+        return _index
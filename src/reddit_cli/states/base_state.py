@@ -1,6 +1,13 @@
 from __future__ import annotations
+
+import asyncio
+import logging
 from abc import abstractmethod
 from typing import TYPE_CHECKING
+from typing import Any
+from typing import Coroutine
+from typing import Set
+from typing import TypeVar
 
 from textual.app import ComposeResult
 from textual.widget import Widget
@@ -8,11 +15,39 @@ from textual.widget import Widget
 if TYPE_CHECKING:
     from reddit_cli.states.state_stack import StateStack
 
+T = TypeVar("T")
+
+
 class BaseState(Widget):
     def __init__(self, stack: StateStack) -> None:
         super().__init__()
         self.stack = stack
         self.cursor = 0
+        # Background work started by this state, cancelled when it's popped
+        self._tasks: Set[asyncio.Task[Any]] = set()
+
+    def spawn(self, coro: Coroutine[Any, Any, T]) -> asyncio.Task[T]:
+        """
+        Start a task owned by this state, so it can't outlive the state and touch
+        removed widgets
+        """
+        task = asyncio.create_task(coro)
+        self._tasks.add(task)
+        task.add_done_callback(self._task_done)
+        return task
+
+    def _task_done(self, task: asyncio.Task[Any]) -> None:
+        self._tasks.discard(task)
+        # Otherwise these vanish without a trace
+        if not task.cancelled() and task.exception() is not None:
+            logging.error(
+                f"Task in {type(self).__name__} failed", exc_info=task.exception()
+            )
+
+    def cancel_tasks(self) -> None:
+        for task in list(self._tasks):
+            task.cancel()
+        self._tasks.clear()
 
     def move_up(self) -> None:
         if self.cursor > 0:
@@ -3,25 +3,31 @@ from typing import List
 from typing import Optional
 
 from textual.app import ComposeResult
-from textual.widgets import ListItem
-from textual.widgets import ListView
-from textual.widgets import Static
 from textual.reactive import reactive
+from textual.widgets import Static
 
 from reddit_cli.common import FooterMetadata
 from reddit_cli.common import HeaderMetadata
 from reddit_cli.states.base_state import BaseState
 from reddit_cli.states.state_stack import StateStack
+from reddit_cli.widgets import VirtualListView
+
 
 class BaseListViewState(BaseState):
 
+    DEFAULT_CSS = """
+    BaseListViewState {
+        height: 1fr;
+    }
+    """
+
     who = reactive("BaseListViewState", recompose=True)
 
     def __init__(self, stack: StateStack):
         super().__init__(stack)
         self.cursor: int = 0
         self.iterable_items: List[Any] = []
-        self.list_view: Optional[ListView] = None
+        self.list_view: Optional[VirtualListView] = None
         self.classes = "list-view-state"
         self.header_metadata: Optional[HeaderMetadata] = None
         self.footer_metadata: Optional[FooterMetadata] = None
@@ -30,28 +36,29 @@ class BaseListViewState(BaseState):
     def compose(self) -> ComposeResult:
         """Helper method to compose a ListView from iterable_items"""
         if self.header_metadata is not None:
-            yield Static(self.header_metadata.content, id=self.header_metadata.id, classes=self.header_metadata.classes)
+            yield Static(
+                self.header_metadata.content,
+                id=self.header_metadata.id,
+                classes=self.header_metadata.classes,
+            )
 
         # Yield an empty error with noclass
         yield Static("Oh no! An error occurred!", classes="nostyle")
 
         if self.list_view is None:
-            items = []
-
-            for item in self.iterable_items:
-                items.append(
-                    ListItem(Static(item))
-                )
-
-            list_view = ListView(*items)
-            self.list_view = list_view
+            # Rows are rendered straight from iterable_items, nothing is built per item
+            self.list_view = VirtualListView(self.iterable_items)
             self.list_view.index = self.cursor
         else:
             self._populate_listview()
         yield self.list_view
 
         if self.footer_metadata is not None:
-            yield Static(self.footer_metadata.content, id=self.footer_metadata.id, classes=self.footer_metadata.classes)
+            yield Static(
+                self.footer_metadata.content,
+                id=self.footer_metadata.id,
+                classes=self.footer_metadata.classes,
+            )
 
     def handle_input(self, key: str) -> None:
         """Vim style navigation for list views"""
@@ -80,21 +87,17 @@ class BaseListViewState(BaseState):
 
         self.refresh()
 
-    def _populate_listview(self) -> None:
+    def _update_item(self, index: int, item: str) -> None:
+        """Swap the text of a single row without rebuilding the list"""
+        self.iterable_items[index] = item
         if self.list_view is None:
-            self.list_view = ListView()
-
-        self.list_view.clear()
-
-        items = []
-        for item in self.iterable_items:
-            if isinstance(item, str):
-                it = ListItem(Static(item))
-            else:
-                it = ListItem(item)
+            return
+        self.list_view.set_row(index, item)
 
-            items.append(it)
+    def _populate_listview(self) -> None:
+        if self.list_view is None:
+            self.list_view = VirtualListView()
 
-        self.list_view.extend(items)
-        self.list_view.refresh()
-        self.list_view.index = min(self.cursor, len(self.iterable_items))
\ No newline at end of file
+        # Diff against what's on screen so a refresh only pays for what changed
+        self.list_view.update_rows(self.iterable_items)
+        self.cursor = self.list_view.index
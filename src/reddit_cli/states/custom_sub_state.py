@@ -1,20 +1,21 @@
 import re
 from typing import Any
 from urllib.parse import urljoin
-  
+
 from textual import on
 from textual.app import ComposeResult
 from textual.reactive import reactive
+from textual.validation import Function
 from textual.widgets import Input
 from textual.widgets import Static
-from textual.validation import Function
 
 from reddit_cli.common import Feed
 from reddit_cli.common import FooterMetadata
 from reddit_cli.common import HeaderMetadata
 from reddit_cli.states.base_state import BaseState
-from reddit_cli.states.state_stack import StateStack
 from reddit_cli.states.post_list_state import PostListState
+from reddit_cli.states.state_stack import StateStack
+
 
 class CustomSubState(BaseState):
 
@@ -28,22 +29,36 @@ class CustomSubState(BaseState):
         self.header_metadata = HeaderMetadata(
             content="Enter a subreddit name",
             id="custom-sub-header",
-            classes="custom-sub-header header"
+            classes="custom-sub-header header",
         )
         self.footer_metadata = FooterMetadata(
-            content="\[esc] to go back, \[enter] to submit.",
+            content=r"\[esc] to go back, \[enter] to submit.",
             id="custom-sub-footer",
-            classes="custom-sub-footer footer"
+            classes="custom-sub-footer footer",
         )
 
     def compose(self) -> ComposeResult:
-        yield Static(self.header_metadata.content, id=self.header_metadata.id, classes=self.header_metadata.classes)
-        yield Input(placeholder="Enter subreddit name",
-                    validators=[Function(lambda w: re.fullmatch(r'[\w\-]+', w) is not None, "Subreddit contains invalid characters.")],
-                    id="subreddit-input"
+        yield Static(
+            self.header_metadata.content,
+            id=self.header_metadata.id,
+            classes=self.header_metadata.classes,
+        )
+        yield Input(
+            placeholder="Enter subreddit name",
+            validators=[
+                Function(
+                    lambda w: re.fullmatch(r"[\w\-]+", w) is not None,
+                    "Subreddit contains invalid characters.",
+                )
+            ],
+            id="subreddit-input",
+        )
+        yield Static(id="validation-error")
+        yield Static(
+            self.footer_metadata.content,
+            id=self.footer_metadata.id,
+            classes=self.footer_metadata.classes,
         )
-        yield Static(id='validation-error')
-        yield Static(self.footer_metadata.content, id=self.footer_metadata.id, classes=self.footer_metadata.classes)
 
     def _focus_input(self) -> None:
         # Make sure cursor is in the input box by default
@@ -74,18 +89,15 @@ class CustomSubState(BaseState):
                 failure_message = "\n".join(failure_descriptions)
                 validation_error.update(failure_message)
         else:
-            validation_error.update('')
+            validation_error.update("")
 
     @on(Input.Submitted)
     def goto_subreddit_feed(self, event: Input.Submitted) -> None:
         if self._is_valid(event):
-            inp = self.query_one('#subreddit-input', Input).value
-            feed = Feed(inp, urljoin(self.BASE_URL, f'{inp}/.json'))
-            self.stack.push(
-                PostListState(self.stack, feed)
-            )
-
+            inp = self.query_one("#subreddit-input", Input).value
+            feed = Feed(inp, urljoin(self.BASE_URL, f"{inp}/.json"))
+            self.stack.push(PostListState(self.stack, feed))
 
     def handle_input(self, key: str) -> None:
         if key == "escape":
-            self.stack.pop()
\ No newline at end of file
+            self.stack.pop()
@@ -1,44 +1,115 @@
+import asyncio
+import logging
 from typing import List
 
-from reddit_cli.common import CONFIG_YAML_PATH
+from rich.markup import escape
+
+from reddit_cli.common import BOSS_MODE_ASCII_ART
+from reddit_cli.common import REDDIT_CLI_ASCII_ART
 from reddit_cli.common import Feed
 from reddit_cli.common import FooterMetadata
 from reddit_cli.common import HeaderMetadata
-from reddit_cli.common import BOSS_MODE_ASCII_ART
-from reddit_cli.common import REDDIT_CLI_ASCII_ART
+from reddit_cli.common import get_config_path
+from reddit_cli.scheduler import Priority
 from reddit_cli.states.common import BaseListViewState
-from reddit_cli.states.custom_sub_state import CustomSubState
 from reddit_cli.states.state_stack import StateStack
-from reddit_cli.states.post_list_state import PostListState
 from reddit_cli.utils import read_feeds_from_yaml
+from reddit_cli.utils import read_warmup_config_from_yaml
 
 
 class FeedListState(BaseListViewState):
 
     def __init__(self, stack: StateStack) -> None:
         super().__init__(stack)
-        self.feeds: List[Feed] = read_feeds_from_yaml(CONFIG_YAML_PATH)
+        self.feeds: List[Feed] = read_feeds_from_yaml(get_config_path())
         self.iterable_items = [feed.name for feed in self.feeds]
         # Append add custom feed to the end
         self.iterable_items.append("Enter custom subreddit")
         self.cursor: int = 0
         self.id = "FeedListState"
-        header_art = BOSS_MODE_ASCII_ART if self.stack.boss_mode else REDDIT_CLI_ASCII_ART
+        header_art = (
+            BOSS_MODE_ASCII_ART if self.stack.boss_mode else REDDIT_CLI_ASCII_ART
+        )
         self.header_metadata = HeaderMetadata(content=header_art, id="ascii-art")
-        self.footer_metadata = FooterMetadata(content="\[j/k] or \[up/down] to navigate, \[enter] to select, \[q] to quit", classes="footer")
-    
+        self.footer_metadata = FooterMetadata(
+            content=(
+                r"\[j/k] or \[up/down] to navigate, \[enter] to select, "
+                r"\[/] to search, \[q] to quit"
+            ),
+            classes="footer",
+        )
+        self.warmup_config = read_warmup_config_from_yaml(get_config_path())
+
+    def on_mount(self) -> None:
+        if self.warmup_config.enabled:
+            self.spawn(self._warm_feeds())
+
+    async def _warm_feeds(self) -> None:
+        """Fetch every configured feed concurrently so opening any of them is instant"""
+        semaphore = asyncio.Semaphore(self.warmup_config.concurrency)
+
+        async def warm(index: int, feed: Feed) -> None:
+            async with semaphore:
+                await self._warm_feed(index, feed)
+
+        await asyncio.gather(
+            *(warm(index, feed) for index, feed in enumerate(self.feeds))
+        )
+
+    async def _warm_feed(self, index: int, feed: Feed) -> None:
+        # The network stack isn't needed to draw the feed list, so it's only loaded once
+        # warming starts
+        from httpx import HTTPError
+
+        from reddit_cli.feed_handlers import handler_for_feed
+
+        handler = handler_for_feed(feed, priority=Priority.BACKGROUND)
+        if handler.feed is not None:
+            self._set_feed_status(index, f"cached, {len(handler.feed)} posts")
+            return
+
+        self._set_feed_status(index, "loading...")
+        try:
+            stored = await handler.aget_stored_feed()
+            if stored is not None and stored.is_fresh(feed.ttl):
+                handler.cache_stored_feed(stored)
+                self._set_feed_status(index, f"cached, {len(stored.posts)} posts")
+                return
+            posts = await handler.aget_feed()
+        except (HTTPError, ValueError) as e:
+            logging.error(f"Warming {feed.url} failed: {e}")
+            self._set_feed_status(index, "error")
+            return
+
+        self._set_feed_status(index, f"{len(posts)} posts")
+
+    def _set_feed_status(self, index: int, status: str) -> None:
+        self._update_item(
+            index, f"{escape(self.feeds[index].name)} [dim]({status})[/dim]"
+        )
+
     def handle_input(self, key: str) -> None:
         super().handle_input(key)  # Handle navigation keys
+        # The other states are imported when first opened, they pull in the handlers,
+        # comments and the image widget which aren't needed before the feed list is on
+        # screen
         if key == "enter":
-            # Push the sub unless we've selected custom entry then go to custom sub state!
+            # Push the sub unless we've selected custom entry then go to custom sub
+            # state!
             if self.cursor == len(self.iterable_items) - 1:
+                from reddit_cli.states.custom_sub_state import CustomSubState
+
                 self.stack.push(CustomSubState(self.stack))
             else:
+                from reddit_cli.states.post_list_state import PostListState
+
                 selected_feed = self.feeds[self.cursor]
-                self.stack.push(
-                    PostListState(self.stack, selected_feed)
-                )
+                self.stack.push(PostListState(self.stack, selected_feed))
+        elif key == "slash":
+            from reddit_cli.states.search_state import SearchState
+
+            self.stack.push(SearchState(self.stack))
         elif key == "q":
             self.stack.pop()
 
-        self.refresh()
\ No newline at end of file
+        self.refresh()
@@ -1,26 +1,34 @@
 import asyncio
-from io import BytesIO
+import logging
 from typing import Optional
+from typing import Set
 
+import httpx
+from rich.markup import escape
 from textual.app import ComposeResult
 from textual.binding import Binding
 from textual.containers import Horizontal
-from textual.widgets import Static
+from textual.containers import Vertical
 from textual.containers import VerticalScroll
 from textual.reactive import reactive
-from textual_image.widget import Image
+from textual.widgets import Static
+from textual.widgets import Tree
+from textual.widgets.tree import TreeNode
 
-from reddit_cli.common import RedditPost
-from reddit_cli.common import HeaderMetadata
+from reddit_cli.comments import Comment
+from reddit_cli.comments import CommentNode
+from reddit_cli.comments import CommentsHandler
+from reddit_cli.comments import MoreComments
+from reddit_cli.comments import count_comments
 from reddit_cli.common import FooterMetadata
+from reddit_cli.common import HeaderMetadata
+from reddit_cli.common import RedditPost
+from reddit_cli.image_scale import get_image_scaler
+from reddit_cli.perf import get_perf
 from reddit_cli.states.base_state import BaseState
 from reddit_cli.states.state_stack import StateStack
-from reddit_cli.utils import fetch_image_bytes
-
-async def fetch_image_bytes_async(url: str) -> BytesIO | None:
-    """Async wrapper for fetch_image_bytes to avoid blocking the event loop."""
-    loop = asyncio.get_event_loop()
-    return await loop.run_in_executor(None, fetch_image_bytes, url)
+from reddit_cli.utils import afetch_image_bytes
+from reddit_cli.widgets import CommentTree
 
 
 class PostDetailState(BaseState):
@@ -33,7 +41,6 @@ class PostDetailState(BaseState):
         Binding("ctrl+d", "page_down", "Page Down", show=False),
     ]
 
-
     who = reactive("PostDetailState", recompose=True)
 
     def __init__(self, stack: StateStack, post: RedditPost) -> None:
@@ -43,18 +50,35 @@ class PostDetailState(BaseState):
         self.header_metadata = HeaderMetadata(
             content=post.title,
             id="post-detail-header",
-            classes="post-detail-header header"
+            classes="post-detail-header header",
         )
         self.footer_metadata = FooterMetadata(
-            content="[h/left] to go back.",
+            content="[h/left] to go back. [c] for comments.",
             id="post-detail-footer",
-            classes="post-detail-footer footer"
+            classes="post-detail-footer footer",
         )
 
         self.placeholder = Static("Loading image...", classes="post-image-placeholder")
-        self.image_bytes: Optional[BytesIO] = None
         self.image_widget: Optional[Horizontal] = None
-        
+
+        # Comments are only fetched the first time they're opened
+        self.comments_handler = CommentsHandler(post.post_url, link_name=post.name)
+        self.comment_tree = CommentTree(classes="post-comments-tree")
+        self.comment_status = Static(
+            "Loading comments...", classes="post-comments-status"
+        )
+        self.comment_body = Static("", classes="post-comment-body")
+        self.comments_pane = Vertical(
+            self.comment_status,
+            self.comment_tree,
+            self.comment_body,
+            classes="post-comments",
+        )
+        self.comments_pane.display = False
+        self.comments_task: Optional[asyncio.Task[None]] = None
+        # Stubs with a fetch in flight, so mashing enter doesn't ask twice
+        self.loading_stubs: Set[int] = set()
+
         self._set_content()
 
     def _set_content(self) -> None:
@@ -62,45 +86,178 @@ class PostDetailState(BaseState):
         external_url = self.post.external_url is not None
         components = []
 
-        components.append(Static(f"Link to post: {self.post.post_url}", classes="post-url"))
+        components.append(
+            Static(f"Link to post: {self.post.post_url}", classes="post-url")
+        )
 
         if img_content:
-            components.append(Static(f"Attached image URL: {self.post.image_url}", classes="post-image-url"))
+            components.append(
+                Static(
+                    f"Attached image URL: {self.post.image_url}",
+                    classes="post-image-url",
+                )
+            )
 
         if external_url:
-            components.append(Static(f"External link: {self.post.external_url}", classes="post-external-link-url"))
+            components.append(
+                Static(
+                    f"External link: {self.post.external_url}",
+                    classes="post-external-link-url",
+                )
+            )
 
         components.append(Static(self.post.content_clean, classes="post-content-body"))
-            
+
         if img_content:
             components.append(self.placeholder)
 
         self.content = VerticalScroll(*components, classes="post-detail-body")
 
     def compose(self) -> ComposeResult:
-        yield Static(self.header_metadata.content, id=self.header_metadata.id, classes=self.header_metadata.classes)
+        yield Static(
+            self.header_metadata.content,
+            id=self.header_metadata.id,
+            classes=self.header_metadata.classes,
+        )
         yield self.content
-        yield Static(self.footer_metadata.content, id=self.footer_metadata.id, classes=self.footer_metadata.classes)
+        yield self.comments_pane
+        yield Static(
+            self.footer_metadata.content,
+            id=self.footer_metadata.id,
+            classes=self.footer_metadata.classes,
+        )
 
     def handle_input(self, key: str) -> None:
         if key in ["h", "left"]:
             self.stack.pop()
+            return
+
+        if key == "c":
+            self._toggle_comments()
+            return
+
+        if not self.comments_pane.display:
+            return
+
+        tree = self.comment_tree
+        if key in ["j", "down"]:
+            tree.action_cursor_down()
+        elif key in ["k", "up"]:
+            tree.action_cursor_up()
+        elif key == "ctrl+d":
+            tree.action_page_down()
+        elif key == "ctrl+u":
+            tree.action_page_up()
+        elif key in ["enter", "space", "l", "right"]:
+            self._open_comment_node()
+
+    def _toggle_comments(self) -> None:
+        showing = not self.comments_pane.display
+        self.comments_pane.display = showing
+        self.content.display = not showing
+        if showing and self.comments_task is None:
+            self.comments_task = self.spawn(self._load_comments())
+
+    async def _load_comments(self) -> None:
+        perf = get_perf()
+        try:
+            with perf.span("comments_fetch"):
+                comments = await self.comments_handler.afetch_comments()
+        except httpx.HTTPError as e:
+            logging.error(str(e))
+            self.comment_status.update("Couldn't load comments!!")
+            # Let the next toggle have another go
+            self.comments_task = None
+            return
+
+        if not comments:
+            self.comment_status.update("No comments yet.")
+            return
+        self.comment_status.update(
+            f"{count_comments(comments)} comments. "
+            "Enter opens a thread, c goes back to the post."
+        )
+        with perf.span("comments_build", top_level=len(comments)):
+            self.comment_tree.set_comments(comments)
+        self.comment_tree.cursor_line = 0
+
+    def _open_comment_node(self) -> None:
+        node = self.comment_tree.cursor_node
+        if node is None:
+            return
+        if isinstance(node.data, MoreComments):
+            if node.id not in self.loading_stubs:
+                self.loading_stubs.add(node.id)
+                node.set_label("loading...")
+                self.spawn(self._load_more_comments(node))
+        elif node.allow_expand:
+            self.comment_tree.toggle(node)
+
+    async def _load_more_comments(self, node: TreeNode[CommentNode]) -> None:
+        stub = node.data
+        assert isinstance(stub, MoreComments)
+        try:
+            comments = await self.comments_handler.aload_more(stub)
+        except (httpx.HTTPError, ValueError) as e:
+            logging.error(str(e))
+            node.set_label("couldn't load more comments, enter to retry")
+            return
+        finally:
+            self.loading_stubs.discard(node.id)
+        self.comment_tree.replace_stub(node, comments)
+
+    def on_tree_node_highlighted(
+        self, event: Tree.NodeHighlighted[CommentNode]
+    ) -> None:
+        comment = event.node.data
+        if isinstance(comment, Comment):
+            self.comment_body.update(
+                f"[b]{escape(comment.author)}[/b] "
+                f"[dim]{comment.score} points[/dim]\n{escape(comment.body)}"
+            )
+        else:
+            self.comment_body.update("")
 
     def on_enter(self) -> None:
-        # Kick off image loading if there is a URL
-        if self.post.image_url is not None:
-            asyncio.create_task(self._load_image())
+        # Kick off image loading if there is a URL, boss mode never shows images
+        if self.post.image_url is not None and not self.stack.boss_mode:
+            self.spawn(self._load_image())
 
     async def _load_image(self) -> None:
         if self.image_widget is not None:
             return
 
-        img_bytes = await fetch_image_bytes_async(self.post.image_url)  # type: ignore
-        self.content.remove_children(".post-image-placeholder")
+        perf = get_perf()
+        with perf.span("image_fetch"):
+            img_bytes = await afetch_image_bytes(self.post.image_url)  # type: ignore
+        image = None
         if img_bytes:
-            self.image_bytes = img_bytes
-            # Remove the placeholder
-            self.image_widget = Horizontal(Image(img_bytes, classes="post-image"), classes="post-image-container")
-            self.content.mount(self.image_widget)
-        else:
+            # Scaled to the whole body, the widget's own max sizes then only ever shrink
+            # it further
+            try:
+                image = await get_image_scaler().scale(
+                    self.post.image_url,  # type: ignore
+                    img_bytes.getvalue(),
+                    self.content.size.width or self.app.size.width,
+                    self.app.size.height,
+                )
+            except Exception as e:
+                logging.error(f"Couldn't decode {self.post.image_url}: {e}")
+
+        # Remove the placeholder
+        self.content.remove_children(".post-image-placeholder")
+        if image is None:
             self.content.mount(Static("Failed to load image!!"))
+            return
+
+        # Already imported by main() before textual started, see the note there
+        from textual_image.widget import Image
+
+        started = perf.now()
+        self.image_widget = Horizontal(
+            Image(image, classes="post-image"), classes="post-image-container"
+        )
+        self.content.mount(self.image_widget)
+        perf.record("image_build", started, width=image.width, height=image.height)
+        # The draw happens when the widget first renders
+        self.app.call_after_refresh(perf.record, "image_render", started)
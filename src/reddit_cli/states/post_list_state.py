@@ -3,10 +3,11 @@ import logging
 from typing import Dict
 from typing import List
 from typing import Optional
+from typing import Tuple
 
-from requests.exceptions import HTTPError
-from textual.containers import Horizontal
-from textual.widgets import ListItem
+from httpx import HTTPError
+from httpx import HTTPStatusError
+from httpx import RequestError
 from textual.widgets import Static
 
 from reddit_cli.common import Feed
@@ -14,24 +15,27 @@ from reddit_cli.common import FooterMetadata
 from reddit_cli.common import HeaderMetadata
 from reddit_cli.common import PostRowData
 from reddit_cli.common import RedditPost
+from reddit_cli.common import get_config_path
 from reddit_cli.feed_handlers import BaseHandler
-from reddit_cli.feed_handlers import JSONHandler
-from reddit_cli.feed_handlers import RSSHandler
+from reddit_cli.feed_handlers import handler_for_feed
+from reddit_cli.feed_store import StoredFeed
+from reddit_cli.perf import get_perf
+from reddit_cli.prefetch import Prefetcher
+from reddit_cli.scheduler import Priority
 from reddit_cli.states.common import BaseListViewState
-from reddit_cli.states.state_stack import StateStack
 from reddit_cli.states.post_detail_state import PostDetailState
+from reddit_cli.states.search_state import SearchState
+from reddit_cli.states.state_stack import StateStack
+from reddit_cli.utils import aprefetch_image_bytes
+from reddit_cli.utils import read_pagination_config_from_yaml
+from reddit_cli.utils import read_prefetch_config_from_yaml
 
 
-async def fetch_feed_async(handler: BaseHandler) -> List[RedditPost]:
-    loop = asyncio.get_event_loop()
-    return await loop.run_in_executor(None, handler.get_feed)
-
-async def update_feed_async(handler: BaseHandler) -> List[RedditPost]:
-    loop = asyncio.get_event_loop()
-    return await loop.run_in_executor(None, handler.load_more_posts)
-
 class PostListState(BaseListViewState):
 
+    # Pages in a row that can come back all duplicates before we stop paging
+    MAX_EMPTY_PAGES = 3
+
     def __init__(self, stack: StateStack, feed_config: Feed) -> None:
         super().__init__(stack)
         self.feed_config = feed_config
@@ -41,17 +45,38 @@ class PostListState(BaseListViewState):
         self.header_metadata = HeaderMetadata(
             content=feed_config.name,
             id="post-list-header",
-            classes="list-view-header header"
+            classes="list-view-header header",
         )
         self.footer_text: Dict[str, str] = {
-            "default": "\[j/k] or \[up/down] to navigate, \[enter] to view post, \[h/left] to go back, \[r] to refresh.",
-            "bottom": "\[ctrl+L] load more posts, \[j/k] or \[up/down] to navigate, \[enter] to view post, \[h/left] to go back, \[r] to refresh."
+            "default": (
+                r"\[j/k] or \[up/down] to navigate, \[enter] to view post, "
+                r"\[h/left] to go back, \[r] to refresh, \[/] to search."
+            ),
+            "bottom": (
+                r"\[ctrl+L] load more posts, \[j/k] or \[up/down] to navigate, "
+                r"\[enter] to view post, \[h/left] to go back, \[r] to refresh, "
+                r"\[/] to search."
+            ),
         }
         self.footer_metadata = FooterMetadata(
-            content=self.footer_text['default'],
+            content=self.footer_text["default"],
             id="post-list-footer",
-            classes="list-view-footer footer"
+            classes="list-view-footer footer",
         )
+        self.prefetch_config = read_prefetch_config_from_yaml(get_config_path())
+        self.prefetcher: Optional[Prefetcher] = None
+        self.pagination_config = read_pagination_config_from_yaml(get_config_path())
+        # At most one page in flight, whether it was asked for or fetched ahead
+        self.page_task: Optional[asyncio.Task[None]] = None
+        # Bumped by every load/refresh, only the newest one is allowed to touch the list
+        self.generation = 0
+        # When the open (or refresh) started, cleared once its rows are on screen
+        self.open_started: Optional[float] = None
+        # The first page is still arriving, so there's no 'after' to page from yet
+        self.streaming = False
+        # Off once a load came back with nothing new after MAX_EMPTY_PAGES, ctrl+L can
+        # still ask
+        self.auto_paging = True
 
     def on_enter(self) -> None:
         if self.iterable_items:
@@ -59,120 +84,326 @@ class PostListState(BaseListViewState):
         super().on_enter()
         self.loading = True
         self.refresh()
-        asyncio.create_task(self._fetch_posts())
+        self.open_started = get_perf().now()
+        self._start_fetch()
+
+    def _start_fetch(self, force_reload: bool = False) -> None:
+        # A stream this replaces no longer gets a say in when paging can start
+        self.streaming = False
+        self.auto_paging = True
+        self.generation += 1
+        self.spawn(self._fetch_posts(self.generation, force_reload=force_reload))
 
-    async def _fetch_posts(self, force_reload: bool=False) -> None:
-        # Decide which handler to use
-        handler_class = RSSHandler if '.rss' in self.feed_config.url else JSONHandler
-        handler = handler_class(self.feed_config.url, force_reload=force_reload)
+    async def _fetch_posts(self, generation: int, force_reload: bool = False) -> None:
+        handler = handler_for_feed(
+            self.feed_config,
+            force_reload=force_reload,
+            limit=self.pagination_config.page_size,
+        )
+
+        # Nothing in memory yet, so draw whatever the last run stored and check it in
+        # the background
+        if (
+            handler.feed is None
+            and not force_reload
+            and await self._show_stored_posts(generation, handler)
+        ):
+            return
 
+        # Repeated refreshes share one fetch (see BaseHandler._single_flight), but a
+        # superseded one still finishes for the others' sake, so check it's still wanted
+        # before drawing
         try:
-            self.posts = await fetch_feed_async(handler)
-        except HTTPError as e:
-            logging.error(str(e))
-            response = e.response
-            status_code = response.status_code
-            reason = response.reason
-            # Set styling of the error
-            error_msg = self.query_one(".nostyle", Static)
-            # Adjust classes!
-            error_msg.set_class(True, "error-message")
-            error_msg.set_class(False, "nostyle")
-            error_msg.update(f"Oh no! An error occurred! Status code: {status_code}, reason: {reason}")
-            self.loading = False
-            self.refresh()
+            if self.posts:
+                # Refreshing, diff the whole page in one go rather than flashing a half
+                # empty list
+                posts = await handler.aget_feed()
+                if generation == self.generation:
+                    self._show_posts(posts)
+            else:
+                # First paint, draw rows as they stream in
+                self.streaming = True
+                try:
+                    async for batch in handler.astream_feed():
+                        if generation != self.generation:
+                            return
+                        self._append_posts(
+                            batch, after=batch[-1].name if batch else self.after
+                        )
+                finally:
+                    if generation == self.generation:
+                        self.streaming = False
+                # Page on from the last post reddit sent, now the whole page is in. A
+                # cached feed wasn't parsed this time, so that goes on from its last
+                # post
+                self.after = handler.next_after or self.after
+                self._maybe_load_ahead()
+        except (HTTPError, ValueError) as e:
+            if generation == self.generation:
+                self._show_error(e)
+            return
+
+    async def _show_stored_posts(self, generation: int, handler: BaseHandler) -> bool:
+        """Draw the copy stored by the last run if there is one, True if it was drawn"""
+        stored = await handler.aget_stored_feed()
+        if stored is None or not stored.posts or generation != self.generation:
+            return False
+
+        self._show_posts(stored.posts)
+        # Cached so pages loaded after it extend it rather than starting the cached feed
+        # over
+        handler.cache_stored_feed(stored)
+        if not stored.is_fresh(self.feed_config.ttl):
+            self.spawn(self._revalidate_posts(generation, handler, stored))
+        return True
+
+    async def _revalidate_posts(
+        self, generation: int, handler: BaseHandler, stored: StoredFeed
+    ) -> None:
+        # The stored copy is already on screen, so this can wait behind anything the
+        # user asks for
+        handler.priority = Priority.BACKGROUND
+        try:
+            posts = await handler.arevalidate_feed(stored)
+        except (HTTPError, ValueError) as e:
+            # We've already got something on screen so just log it
+            logging.error(f"Revalidating {self.feed_config.url} failed: {e!r}")
             return
 
+        if posts is not None and generation == self.generation:
+            self._show_posts(posts)
+
+    def _show_posts(self, posts: List[RedditPost]) -> None:
+        # Copy, the handler's list lives on in the feed cache and we extend ours when
+        # paging
+        self.posts = list(posts)
+
         # Set after attribute for lazy loading
         if self.posts:
-            self.after = self.posts[-1].meta.get("name")
+            self.after = self.posts[-1].name
 
-        self.iterable_items = self._generate_display_items(self.posts)
+        perf = get_perf()
+        with perf.span("rows", posts=len(self.posts)):
+            self.iterable_items = self._generate_display_items(self.posts)
         self.loading = False
 
-        self._populate_listview()  
+        started = perf.now()
+        self._populate_listview()
+        perf.record("populate", started, rows=len(self.iterable_items))
+        self.refresh()
+        self._record_render(started, len(self.iterable_items))
+        self._schedule_prefetch()
+        self._maybe_load_ahead()
+
+    def _schedule_prefetch(self) -> None:
+        """Warm the image cache for the highlighted post and its neighbours"""
+        # Boss mode never shows images so there's nothing worth fetching
+        if not self.prefetch_config.enabled or self.stack.boss_mode or not self.posts:
+            return
+
+        if self.prefetcher is None:
+            max_bytes = int(self.prefetch_config.max_image_mb * 1024 * 1024)
+            self.prefetcher = Prefetcher(
+                self.prefetch_config,
+                lambda url: aprefetch_image_bytes(url, max_bytes),
+            )
+
+        # Highlighted post first, then fan out either side of it
+        urls = []
+        for offset in range(self.prefetch_config.neighbours + 1):
+            for index in {self.cursor + offset, self.cursor - offset}:
+                if 0 <= index < len(self.posts):
+                    image_url = self.posts[index].image_url
+                    if image_url and image_url not in urls:
+                        urls.append(image_url)
+        self.prefetcher.schedule(urls)
+
+    def on_unmount(self) -> None:
+        # State has been popped, nothing it asked for is wanted any more
+        if self.prefetcher is not None:
+            self.prefetcher.cancel()
+
+    def _show_error(self, e: HTTPError | ValueError) -> None:
+        logging.error(str(e))
+        if isinstance(e, HTTPStatusError):
+            message = (
+                "Oh no! An error occurred! "
+                f"Status code: {e.response.status_code}, "
+                f"reason: {e.response.reason_phrase}"
+            )
+        elif isinstance(e, RequestError):
+            # Never got a response, timed out, refused, no network etc.
+            message = f"Oh no! Couldn't get through to reddit! ({type(e).__name__})"
+        else:
+            # A 200 that wasn't a listing, usually an error page from reddit's CDN
+            message = "Oh no! Reddit sent back something that wasn't a listing!"
+        # Set styling of the error, it's already styled if an earlier load failed too
+        error_msg = self.query_one(".nostyle, .error-message", Static)
+        # Adjust classes!
+        error_msg.set_class(True, "error-message")
+        error_msg.set_class(False, "nostyle")
+        error_msg.update(message)
+        self.loading = False
         self.refresh()
 
-    async def _load_more_posts(self) -> None:
-        handler_class = RSSHandler if '.rss' in self.feed_config.url else JSONHandler
-        if handler_class == RSSHandler:
+    async def _load_more_posts(self, priority: Priority = Priority.FOREGROUND) -> None:
+        if ".rss" in self.feed_config.url:
             logging.info("Loading more posts not allowed for RSS feeds")
             return
 
         if not self.iterable_items:
-            logging.info("Cannot load more posts, none have been loaded in the first place!")
+            logging.info(
+                "Cannot load more posts, none have been loaded in the first place!"
+            )
 
         if not self.after:
-            logging.info("Cannot load more posts, final post item has no meta.name attribute")
+            logging.info(
+                "Cannot load more posts, final post item has no name attribute"
+            )
+            return
+
+        generation = self.generation
+        try:
+            new_posts, after = await self._fetch_next_page(
+                generation, self.after, priority
+            )
+        except (HTTPError, ValueError) as e:
+            # Errors from a page of the old listing aren't worth showing over the
+            # refreshed one
+            if generation == self.generation:
+                self._show_error(e)
+            return
+        # The list was refreshed under us, this page belongs to the old one
+        if generation != self.generation:
             return
 
-        handler = handler_class(self.feed_config.url, force_reload=True, after=self.after)
+        # Every page we were allowed was all repeats. Appending nothing would look ahead
+        # straight into another round of them, so wait for the user to ask (or a page
+        # with posts on it)
+        self.auto_paging = bool(new_posts)
+        # This page is done, let appending look ahead to the next one
+        if self.page_task is asyncio.current_task():
+            self.page_task = None
+        self._append_posts(new_posts, after)
 
-        new_posts = await update_feed_async(handler)
-        if new_posts:
-            self.after = new_posts[-1].meta.get("name")
-        new_items = self._generate_display_items(new_posts)
+    async def _fetch_next_page(
+        self, generation: int, after: str, priority: Priority
+    ) -> Tuple[List[RedditPost], Optional[str]]:
+        """
+        The next page with anything new on it, and the cursor for the page after (None
+        at the end)
+        """
+        new_posts: List[RedditPost] = []
+        next_after: Optional[str] = after
+        # A page that was nothing but repeats is skipped over rather than ending the
+        # feed
+        for _ in range(self.MAX_EMPTY_PAGES):
+            handler = handler_for_feed(
+                self.feed_config,
+                force_reload=True,
+                after=next_after,
+                limit=self.pagination_config.page_size,
+                priority=priority,
+            )
+            new_posts = await handler.aload_more_posts()
+            # Carry on from what reddit sent, not what survived dedup. Same cursor twice
+            # means the end
+            next_after = (
+                handler.next_after if handler.next_after != next_after else None
+            )
+            if new_posts or not next_after or generation != self.generation:
+                break
+        return new_posts, next_after
+
+    def _start_page_load(self, priority: Priority = Priority.FOREGROUND) -> None:
+        if self.streaming or (self.page_task is not None and not self.page_task.done()):
+            return
+        self.page_task = self.spawn(self._load_more_posts(priority))
+
+    def _maybe_load_ahead(self) -> None:
+        """Fetch the next page in the background once the cursor gets near the end"""
+        if (
+            not self.pagination_config.auto
+            or not self.auto_paging
+            or not self.after
+            or ".rss" in self.feed_config.url
+        ):
+            return
+        if self.cursor >= len(self.iterable_items) - self.pagination_config.look_ahead:
+            self._start_page_load(Priority.BACKGROUND)
+
+    def _append_posts(self, new_posts: List[RedditPost], after: Optional[str]) -> None:
+        """
+        Add rows to the end of the list, after is where the next page starts (None if
+        there isn't one)
+        """
+        self.after = after
+        perf = get_perf()
+        with perf.span("rows", posts=len(new_posts)):
+            new_items = self._generate_display_items(new_posts)
 
         self.posts.extend(new_posts)
         self.iterable_items.extend(new_items)
         self.loading = False
 
-        list_items = [
-            ListItem(Static(item)) if isinstance(item, str)
-            else ListItem(item)
-            for item in new_items
-        ]
-
+        started = perf.now()
         if self.list_view is not None:
-            self.list_view.extend(list_items)
+            self.list_view.extend(new_items)
+        perf.record("populate", started, rows=len(new_items))
 
         self.refresh()
+        self._record_render(started, len(new_items))
         self._update_footer()
+        self._schedule_prefetch()
+        self._maybe_load_ahead()
 
-    def _generate_display_items(self, posts: List[RedditPost]) -> List[Horizontal]:
-        items = []
-        for post in posts:
-            # Emoji for image/link/selfpost
-            if post.image_url:
-                emoji = "📷" 
-            elif post.external_url:
-                emoji = "🔗"
-            else:
-                emoji = "📰"
-
-            data = PostRowData(
-                emoji=emoji,
-                subreddit=post.subreddit,
-                title=post.title,
-                meta=post.meta
+    def _record_render(self, started: float, rows: int) -> None:
+        perf = get_perf()
+        # call_after_refresh runs once the frame with the new rows has been drawn
+        self.app.call_after_refresh(perf.record, "render", started, rows=rows)
+        if self.open_started is not None:
+            self.app.call_after_refresh(
+                perf.record, "open", self.open_started, feed=self.feed_config.url
             )
-            items.append(data.to_container())
-        return items
+            self.open_started = None
+
+    def _generate_display_items(self, posts: List[RedditPost]) -> List[PostRowData]:
+        return [PostRowData.from_post(post) for post in posts]
 
     def _update_footer(self) -> None:
         # Check if we're at the bottom and update texts
         footer = self.query_one("#post-list-footer", Static)
         if self.cursor == len(self.iterable_items) - 1:
-            footer.update(self.footer_text['bottom'])
+            footer.update(self.footer_text["bottom"])
         else:
-            footer.update(self.footer_text['default'])
+            footer.update(self.footer_text["default"])
 
     def handle_input(self, key: str) -> None:
-        """Additional input handling for this state so we can refresh the feed with 'r'."""
+        """
+        Additional input handling for this state so we can refresh the feed with 'r'.
+        """
+        previous_cursor = self.cursor
         super().handle_input(key)
+        if self.cursor != previous_cursor:
+            self._schedule_prefetch()
+            self._maybe_load_ahead()
 
         if key == "r":
+            # Whatever page was coming belongs to the old listing
+            if self.page_task is not None:
+                self.page_task.cancel()
             self.loading = True
             self.refresh()
-            asyncio.create_task(self._fetch_posts(force_reload=True))
+            self.open_started = get_perf().now()
+            self._start_fetch(force_reload=True)
         elif key == "enter":
             selected_post = self.posts[self.cursor]
-            self.stack.push(
-                PostDetailState(self.stack, selected_post)
-            )
+            self.stack.push(PostDetailState(self.stack, selected_post))
+        elif key == "slash":
+            self.stack.push(SearchState(self.stack, self.feed_config))
 
         self._update_footer()
 
         if key == "ctrl+l" and self.cursor == len(self.iterable_items) - 1:
             self.loading = True
-            asyncio.create_task(self._load_more_posts())
\ No newline at end of file
+            self._start_page_load()
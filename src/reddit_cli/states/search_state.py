@@ -0,0 +1,157 @@
+import asyncio
+from typing import List
+from typing import Optional
+
+from rich.markup import escape
+from textual import on
+from textual.app import ComposeResult
+from textual.reactive import reactive
+from textual.widgets import Input
+from textual.widgets import Static
+
+from reddit_cli.common import Feed
+from reddit_cli.common import FooterMetadata
+from reddit_cli.common import HeaderMetadata
+from reddit_cli.common import PostRowData
+from reddit_cli.common import get_config_path
+from reddit_cli.feed_handlers import BaseHandler
+from reddit_cli.search_index import SearchResult
+from reddit_cli.search_index import get_search_index
+from reddit_cli.states.base_state import BaseState
+from reddit_cli.states.post_detail_state import PostDetailState
+from reddit_cli.states.state_stack import StateStack
+from reddit_cli.utils import read_search_config_from_yaml
+from reddit_cli.widgets import VirtualListView
+
+
+class SearchState(BaseState):
+    """
+    Search posts that have already been fetched, one feed or all of them. Never hits the
+    network
+    """
+
+    # Wait for a pause in typing before querying
+    SEARCH_DELAY = 0.15
+
+    who = reactive("SearchState", recompose=True)
+
+    def __init__(self, stack: StateStack, feed: Optional[Feed] = None) -> None:
+        super().__init__(stack)
+        self.id = "SearchState"
+        self.feed = feed
+        # Posts are indexed under their handler's base url
+        self.feed_key = (
+            BaseHandler._extract_base_url(feed.url) if feed is not None else None
+        )
+        self.header_metadata = HeaderMetadata(
+            content=(
+                f"Search {escape(feed.name)}"
+                if feed is not None
+                else "Search all feeds"
+            ),
+            id="search-header",
+            classes="search-header header",
+        )
+        self.footer_metadata = FooterMetadata(
+            content=(
+                r"\[esc] to go back, \[up/down] to pick a result, "
+                r"\[enter] to open it."
+            ),
+            id="search-footer",
+            classes="search-footer footer",
+        )
+        self.search_config = read_search_config_from_yaml(get_config_path())
+        self.results: List[SearchResult] = []
+        self.search_input = Input(
+            placeholder="Search titles, subreddits and post text", id="search-input"
+        )
+        self.list_view = VirtualListView()
+        # Only the newest query gets to draw its results
+        self.generation = 0
+
+    def compose(self) -> ComposeResult:
+        yield Static(
+            self.header_metadata.content,
+            id=self.header_metadata.id,
+            classes=self.header_metadata.classes,
+        )
+        yield self.search_input
+        yield Static("", id="search-status", classes="search-status")
+        yield self.list_view
+        yield Static(
+            self.footer_metadata.content,
+            id=self.footer_metadata.id,
+            classes=self.footer_metadata.classes,
+        )
+
+    def _focus_input(self) -> None:
+        # on_enter runs before the first compose, on_mount covers that case
+        if self.search_input.is_mounted:
+            self.search_input.focus()
+
+    def on_mount(self) -> None:
+        self._focus_input()
+
+    def on_enter(self) -> None:
+        super().on_enter()
+        self._focus_input()
+
+    @on(Input.Changed)
+    def search_as_you_type(self, event: Input.Changed) -> None:
+        self.generation += 1
+        self.spawn(self._search(event.value, self.generation))
+
+    async def _search(self, query: str, generation: int) -> None:
+        await asyncio.sleep(self.SEARCH_DELAY)
+        if generation != self.generation:
+            return
+
+        status = self.query_one("#search-status", Static)
+        index = get_search_index()
+        if index is None:
+            status.update("Search is turned off or the index couldn't be opened.")
+            return
+
+        results = await asyncio.to_thread(
+            index.search, query, self.feed_key, self.search_config.max_results
+        )
+        if generation != self.generation:
+            return
+
+        self.results = results
+        self.list_view.set_rows(
+            [PostRowData.from_post(result.post) for result in results]
+        )
+        self.list_view.index = 0
+        self.cursor = 0
+        if query.strip():
+            status.update(f"{len(results)} result{'s' if len(results) != 1 else ''}")
+        else:
+            status.update("")
+
+    @on(Input.Submitted)
+    def open_result(self, event: Input.Submitted) -> None:
+        if not self.results:
+            return
+        self.stack.push(PostDetailState(self.stack, self.results[self.cursor].post))
+
+    def handle_input(self, key: str) -> None:
+        # Letters go to the input box, so only keys it doesn't use get handled here
+        if key == "escape":
+            self.stack.pop()
+            return
+
+        if not self.results:
+            return
+
+        max_index = len(self.results) - 1
+        page = self.app.size.height // 2
+        if key == "down":
+            self.cursor = min(self.cursor + 1, max_index)
+        elif key == "up":
+            self.cursor = max(self.cursor - 1, 0)
+        elif key == "ctrl+d":
+            self.cursor = min(self.cursor + page, max_index)
+        elif key == "ctrl+u":
+            self.cursor = max(self.cursor - page, 0)
+        self.list_view.index = self.cursor
@@ -1,12 +1,21 @@
+import logging
+from typing import Optional
+
+from rich.markup import escape
 from textual.app import App
 
+from reddit_cli.perf import get_perf
 from reddit_cli.states.base_state import BaseState
+from reddit_cli.widgets import PerfOverlay
+
 
 class StateStack:
     def __init__(self, app: App[None], boss_mode: bool = False) -> None:
         self.boss_mode = boss_mode
         self.stack: list[BaseState] = []
         self.app = app
+        # Mounted the first time it's asked for
+        self.overlay: Optional[PerfOverlay] = None
 
     def push(self, state: BaseState) -> None:
         if self.stack:
@@ -15,9 +24,14 @@ class StateStack:
 
         self.stack.append(state)
 
+        perf = get_perf()
+        started = perf.now()
         self.app.mount(state)
         state.on_enter()
-
+        # Recorded once the state's first frame is drawn
+        self.app.call_after_refresh(
+            perf.record, "mount", started, state=type(state).__name__
+        )
 
     def pop(self) -> None:
         if not self.stack:
@@ -25,13 +39,34 @@ class StateStack:
 
         state = self.stack.pop()
         state.on_exit()
-        state.remove()  
+        # Nothing the state started is wanted any more
+        state.cancel_tasks()
+        state.remove()
 
         if self.stack:
             previous = self.stack[-1]
             previous.display = True
             previous.on_enter()
 
+    def toggle_overlay(self) -> None:
+        if self.overlay is None:
+            self.overlay = PerfOverlay()
+            self.app.mount(self.overlay)
+        self.overlay.show(not self.overlay.display)
+
+    def export_perf(self) -> None:
+        try:
+            path = get_perf().export(get_perf().config.export_path or None)
+            message = f"spans written to {escape(path)}"
+        except OSError as e:
+            logging.error(f"Exporting spans failed: {e}")
+            message = "couldn't write the spans, see the log"
+        if self.overlay is not None:
+            self.overlay.message = message
+            if self.overlay.display:
+                self.overlay.update_stats()
+        else:
+            self.app.notify(message)
 
     @property
     def current(self) -> BaseState | None:
@@ -8,4 +8,7 @@ THEMES = {
 }
 
 if not THEMES:
-    raise ValueError(f"No themes found in {_themes_dir}. Please add at least one .tcss file to the themes directory.")
\ No newline at end of file
+    raise ValueError(
+        f"No themes found in {_themes_dir}. "
+        "Please add at least one .tcss file to the themes directory."
+    )
@@ -0,0 +1,163 @@
+"""
+Headless sync, fetches every feed in config.yaml into the feed store and search index
+so the app opens on warm data. Run it once, on an interval, or from cron:
+
+    reddit sync --once
+    reddit-sync --interval 600
+"""
+
+import argparse
+import logging
+import sqlite3
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import List
+from typing import Optional
+
+import requests
+
+from reddit_cli.common import Feed
+from reddit_cli.common import get_config_path
+from reddit_cli.feed_handlers import handler_for_feed
+from reddit_cli.utils import read_feeds_from_yaml
+from reddit_cli.utils import read_warmup_config_from_yaml
+
+
+@dataclass
+class SyncResult:
+    feed: Feed
+    status: str
+    posts: int = 0
+    error: Optional[str] = None
+
+
+def sync_feed(feed: Feed, pages: int = 1, force: bool = False) -> SyncResult:
+    """
+    Bring one feed's stored copy up to date, extra pages only go into the search index
+    """
+    handler = handler_for_feed(feed, force_reload=True)
+    try:
+        stored = handler.get_stored_feed()
+        if stored is not None and not force and stored.is_fresh(feed.ttl):
+            return SyncResult(feed, "fresh", len(stored.posts))
+
+        if stored is not None and not force:
+            posts = handler.revalidate_feed(stored)
+            if posts is None:
+                return SyncResult(feed, "not modified", len(stored.posts))
+        else:
+            posts = handler.get_feed()
+
+        total = len(posts)
+        # RSS feeds can't page
+        after = handler.next_after
+        for _ in range(pages - 1):
+            if not after or ".rss" in feed.url:
+                break
+            page_handler = handler_for_feed(feed, force_reload=True, after=after)
+            total += len(page_handler.load_more_posts())
+            after = (
+                page_handler.next_after if page_handler.next_after != after else None
+            )
+        return SyncResult(feed, "updated", total)
+    except (requests.RequestException, ValueError) as e:
+        return SyncResult(feed, "failed", error=str(e))
+    except (sqlite3.Error, OSError) as e:
+        # A locked or full store only costs this feed, the rest can still sync
+        logging.error(f"Storing {feed.url} failed: {e}")
+        return SyncResult(feed, "failed", error=f"couldn't store it: {e}")
+
+
+def sync_all(
+    feeds: List[Feed], pages: int = 1, force: bool = False, jobs: int = 3
+) -> List[SyncResult]:
+    with ThreadPoolExecutor(max_workers=max(1, jobs)) as executor:
+        return list(
+            executor.map(lambda feed: sync_feed(feed, pages=pages, force=force), feeds)
+        )
+
+
+def _parse_args(argv: Optional[List[str]]) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        prog="reddit sync",
+        description=(
+            "Fetch every configured feed into the local store without opening the app."
+        ),
+    )
+    mode = parser.add_mutually_exclusive_group()
+    mode.add_argument(
+        "--once", action="store_true", help="sync once and exit (the default)"
+    )
+    mode.add_argument(
+        "--interval",
+        type=float,
+        metavar="SECONDS",
+        help="keep syncing, waiting this long between runs",
+    )
+    parser.add_argument(
+        "--pages",
+        type=int,
+        default=1,
+        help=(
+            "pages to fetch per JSON feed, only the first is stored but all of them "
+            "are searchable"
+        ),
+    )
+    parser.add_argument(
+        "--force",
+        action="store_true",
+        help="refetch even if the stored copy is still within its ttl",
+    )
+    parser.add_argument(
+        "--jobs",
+        type=int,
+        help="feeds to fetch at once, defaults to warmup.concurrency",
+    )
+    parser.add_argument(
+        "--feed",
+        action="append",
+        metavar="NAME",
+        help="only sync feeds with this name, can be given more than once",
+    )
+    return parser.parse_args(argv)
+
+
+def _run_once(feeds: List[Feed], args: argparse.Namespace, jobs: int) -> bool:
+    started = time.perf_counter()
+    results = sync_all(feeds, pages=args.pages, force=args.force, jobs=jobs)
+    for result in results:
+        detail = result.error if result.error else f"{result.posts} posts"
+        print(f"{result.feed.name}: {result.status} ({detail})")
+    print(f"Synced {len(results)} feeds in {time.perf_counter() - started:.1f}s")
+    return all(result.status != "failed" for result in results)
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    args = _parse_args(argv)
+    logging.basicConfig(
+        level=logging.WARNING, format="%(asctime)s | %(levelname)-8s | %(message)s"
+    )
+
+    feeds = read_feeds_from_yaml(get_config_path())
+    if args.feed:
+        feeds = [feed for feed in feeds if feed.name in args.feed]
+    if not feeds:
+        print("No feeds to sync, check config.yaml")
+        sys.exit(1)
+    jobs = args.jobs or read_warmup_config_from_yaml(get_config_path()).concurrency
+
+    if args.interval is None:
+        sys.exit(0 if _run_once(feeds, args, jobs) else 1)
+
+    try:
+        while True:
+            _run_once(feeds, args, jobs)
+            time.sleep(args.interval)
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
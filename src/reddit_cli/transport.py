@@ -0,0 +1,369 @@
+import asyncio
+import logging
+import os
+import threading
+import time
+from contextlib import asynccontextmanager
+from typing import TYPE_CHECKING
+from typing import Any
+from typing import AsyncIterator
+from typing import Dict
+from typing import Mapping
+from typing import Optional
+from urllib.parse import urlparse
+from urllib.parse import urlunparse
+
+import httpx
+
+from reddit_cli.common import HttpConfig
+from reddit_cli.common import get_config_path
+from reddit_cli.scheduler import Priority
+from reddit_cli.scheduler import get_scheduler
+from reddit_cli.singleflight import SingleFlight
+from reddit_cli.utils import get_random_user_agent
+from reddit_cli.utils import read_http_config_from_yaml
+
+if TYPE_CHECKING:
+    import requests
+
+# Statuses worth retrying - reddit hands out 429s freely and the CDN has the odd 5xx
+# wobble
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+# Everything under these goes to http.base_url when one is set
+REDDIT_HOSTS = ("reddit.com", "redd.it", "redditmedia.com", "redditstatic.com")
+
+# Wins over http.base_url, handy for pointing one run at the stand-in without touching
+# config.yaml
+BASE_URL_ENV = "REDDIT_CLI_BASE_URL"
+
+
+def resolve_base_url(config: HttpConfig) -> str:
+    return os.environ.get(BASE_URL_ENV) or config.base_url
+
+
+def rewrite_url(url: str, base_url: str) -> str:
+    """
+    Point a reddit url at base_url instead, anything else (or no base_url) is left alone
+    """
+    if not base_url:
+        return url
+    parsed = urlparse(url)
+    host = parsed.netloc.lower()
+    if not any(
+        host == reddit_host or host.endswith("." + reddit_host)
+        for reddit_host in REDDIT_HOSTS
+    ):
+        return url
+    base = urlparse(base_url)
+    return urlunparse(
+        parsed._replace(
+            scheme=base.scheme,
+            netloc=base.netloc,
+            path=base.path.rstrip("/") + parsed.path,
+        )
+    )
+
+
+def _backoff(
+    config: HttpConfig, attempt: int, headers: Optional[Mapping[str, str]] = None
+) -> float:
+    """Honour Retry-After if reddit sends one, otherwise back off exponentially"""
+    if headers is not None:
+        retry_after = headers.get("Retry-After")
+        if retry_after is not None and retry_after.isdigit():
+            return float(retry_after)
+    return float(config.backoff_factor * (2**attempt))
+
+
+def _retry_delay(
+    config: HttpConfig, attempt: int, status: int, headers: Mapping[str, str]
+) -> float:
+    # A 429 has already paused the host in the scheduler, so the next acquire does the
+    # waiting. With the scheduler off nothing else will, so fall back to sleeping here
+    if status == 429 and get_scheduler().config.enabled:
+        return 0.0
+    return _backoff(config, attempt, headers)
+
+
+def _log_response(
+    url: str, status: int, size: Optional[int], started: float, streamed: bool = False
+) -> None:
+    """
+    One line per response, the fields ride along as record attributes for the json log
+    """
+    duration_ms = round((time.perf_counter() - started) * 1000, 1)
+    logging.debug(
+        f"GET{' (stream)' if streamed else ''} {url} {status} "
+        f"{size if size is not None else '?'} bytes {duration_ms}ms",
+        extra={"url": url, "status": status, "bytes": size, "duration_ms": duration_ms},
+    )
+
+
+class HttpTransport:
+    """
+    Shared HTTP session for everything that talks to reddit. Keeps connections alive per
+    host so paging and image loads skip the TCP+TLS handshake.
+    """
+
+    def __init__(self, config: HttpConfig) -> None:
+        self.config = config
+        # Pick the user agent once so reddit sees one consistent client for the session
+        self.user_agent = get_random_user_agent()
+        self.base_url = resolve_base_url(config)
+        # requests is only used off the TUI's event loop (sync, benchmarks), so the
+        # session and the import behind it wait until something actually makes a request
+        self._session: Optional["requests.Session"] = None
+        self._session_lock = threading.Lock()
+
+    @property
+    def session(self) -> "requests.Session":
+        with self._session_lock:
+            if self._session is None:
+                self._session = self._build_session()
+            return self._session
+
+    def _build_session(self) -> "requests.Session":
+        import requests
+        from requests.adapters import HTTPAdapter
+
+        # No urllib3 retries, get() retries itself so every attempt goes through the
+        # scheduler
+        adapter = HTTPAdapter(
+            pool_connections=self.config.pool_connections,
+            pool_maxsize=self.config.pool_maxsize,
+        )
+
+        session = requests.Session()
+        session.headers.update({"User-Agent": self.user_agent})
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        return session
+
+    @property
+    def timeout(self) -> tuple[float, float]:
+        return (self.config.connect_timeout, self.config.read_timeout)
+
+    def get(
+        self, url: str, headers: Optional[Dict[str, str]] = None, **kwargs: Any
+    ) -> "requests.Response":
+        """
+        GET through the pooled session with the configured timeouts, retrying 429/5xx
+        and connection errors like the async transport. The final response is returned
+        as is
+        """
+        import requests
+
+        kwargs.setdefault("timeout", self.timeout)
+        scheduler = get_scheduler()
+        attempt = 0
+        while True:
+            # Paced and observed under the real host, so the stand-in sees reddit's
+            # limits
+            scheduler.acquire_blocking(url)
+            started = time.perf_counter()
+            try:
+                response = self.session.get(
+                    rewrite_url(url, self.base_url), headers=headers, **kwargs
+                )
+            except (requests.ConnectionError, requests.Timeout):
+                if attempt >= self.config.retries:
+                    raise
+                time.sleep(_backoff(self.config, attempt))
+                attempt += 1
+                continue
+
+            scheduler.observe(url, response.status_code, response.headers)
+            _log_response(
+                url,
+                response.status_code,
+                None if kwargs.get("stream") else len(response.content),
+                started,
+            )
+            if (
+                response.status_code not in RETRY_STATUSES
+                or attempt >= self.config.retries
+            ):
+                return response
+            response.close()
+            delay = _retry_delay(
+                self.config, attempt, response.status_code, response.headers
+            )
+            if delay:
+                time.sleep(delay)
+            attempt += 1
+
+    def close(self) -> None:
+        if self._session is not None:
+            self._session.close()
+
+
+class AsyncHttpTransport:
+    """
+    Async counterpart of HttpTransport for the TUI. Same pooling, user agent, timeouts
+    and retry policy, but fetches are coroutines so lots can be in flight without tying
+    up threads, and they cancel cleanly.
+    """
+
+    def __init__(self, config: HttpConfig, user_agent: str) -> None:
+        self.config = config
+        self.user_agent = user_agent
+        self.base_url = resolve_base_url(config)
+        self.client = httpx.AsyncClient(
+            headers={"User-Agent": user_agent},
+            timeout=httpx.Timeout(config.read_timeout, connect=config.connect_timeout),
+            limits=httpx.Limits(
+                max_connections=config.pool_connections * config.pool_maxsize,
+                max_keepalive_connections=config.pool_maxsize,
+            ),
+            follow_redirects=True,
+        )
+        # Identical GETs already in flight share one response
+        self.flights: SingleFlight[Any, httpx.Response] = SingleFlight()
+
+    async def _retry_wait(self, attempt: int, response: httpx.Response) -> None:
+        delay = _retry_delay(
+            self.config, attempt, response.status_code, response.headers
+        )
+        if delay:
+            await asyncio.sleep(delay)
+
+    async def get(
+        self,
+        url: str,
+        headers: Optional[Dict[str, str]] = None,
+        priority: Priority = Priority.FOREGROUND,
+    ) -> httpx.Response:
+        """
+        GET with retries on 429/5xx and connection errors, the final response is
+        returned as is. Every attempt waits for a slot from the scheduler at the given
+        priority. A GET for the same url and headers as one already in flight just waits
+        for that one's response.
+        """
+        key = (url, tuple(sorted(headers.items())) if headers else ())
+        return await self.flights.do(key, lambda: self._get(url, headers, priority))
+
+    async def _get(
+        self, url: str, headers: Optional[Dict[str, str]], priority: Priority
+    ) -> httpx.Response:
+        scheduler = get_scheduler()
+        attempt = 0
+        while True:
+            await scheduler.acquire(url, priority)
+            started = time.perf_counter()
+            try:
+                response = await self.client.get(
+                    rewrite_url(url, self.base_url), headers=headers
+                )
+            except httpx.TransportError:
+                if attempt >= self.config.retries:
+                    raise
+                await asyncio.sleep(_backoff(self.config, attempt))
+                attempt += 1
+                continue
+
+            scheduler.observe(url, response.status_code, response.headers)
+            _log_response(url, response.status_code, len(response.content), started)
+            if (
+                response.status_code not in RETRY_STATUSES
+                or attempt >= self.config.retries
+            ):
+                return response
+            await self._retry_wait(attempt, response)
+            attempt += 1
+
+    @asynccontextmanager
+    async def stream(
+        self,
+        url: str,
+        headers: Optional[Dict[str, str]] = None,
+        priority: Priority = Priority.FOREGROUND,
+    ) -> AsyncIterator[httpx.Response]:
+        """
+        Streamed GET for reading the body as it arrives. Retries like get() up until the
+        body starts being handed over, after that it's the caller's problem.
+        """
+        scheduler = get_scheduler()
+        attempt = 0
+        while True:
+            await scheduler.acquire(url, priority)
+            started = time.perf_counter()
+            request = self.client.build_request(
+                "GET", rewrite_url(url, self.base_url), headers=headers
+            )
+            try:
+                response = await self.client.send(request, stream=True)
+            except httpx.TransportError:
+                if attempt >= self.config.retries:
+                    raise
+                await asyncio.sleep(_backoff(self.config, attempt))
+                attempt += 1
+                continue
+
+            scheduler.observe(url, response.status_code, response.headers)
+            # Only the headers are in, so the size is whatever the server says it'll be
+            content_length = response.headers.get("Content-Length")
+            _log_response(
+                url,
+                response.status_code,
+                (
+                    int(content_length)
+                    if content_length and content_length.isdigit()
+                    else None
+                ),
+                started,
+                streamed=True,
+            )
+            if response.status_code in RETRY_STATUSES and attempt < self.config.retries:
+                await response.aclose()
+                await self._retry_wait(attempt, response)
+                attempt += 1
+                continue
+
+            try:
+                yield response
+            finally:
+                await response.aclose()
+            return
+
+    async def aclose(self) -> None:
+        await self.client.aclose()
+
+
+_transport: Optional[HttpTransport] = None
+_async_transport: Optional[AsyncHttpTransport] = None
+_transport_lock = threading.Lock()
+
+
+def get_transport() -> HttpTransport:
+    """Return the process-wide transport, creating it from config.yaml on first use"""
+    global _transport
+    # Handlers run in executor threads so guard the lazy init
+    with _transport_lock:
+        if _transport is None:
+            _transport = HttpTransport(read_http_config_from_yaml(get_config_path()))
+        return _transport
+
+
+def get_async_transport() -> AsyncHttpTransport:
+    """
+    Return the shared async transport, it reuses the sync transport's config and user
+    agent
+    """
+    global _async_transport
+    if _async_transport is None:
+        transport = get_transport()
+        _async_transport = AsyncHttpTransport(transport.config, transport.user_agent)
+    return _async_transport
+
+
+def requests_in_flight() -> int:
+    """Distinct GETs waiting on a response right now, coalesced duplicates count once"""
+    return _async_transport.flights.in_flight() if _async_transport is not None else 0
+
+
+async def close_async_transport() -> None:
+    global _async_transport
+    if _async_transport is not None:
+        await _async_transport.aclose()
+        _async_transport = None
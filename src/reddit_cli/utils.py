@@ -1,56 +1,134 @@
+import asyncio
+import logging
 import os
 import random
+import threading
+from dataclasses import fields
 from io import BytesIO
+from typing import Any
+from typing import Dict
 from typing import List
+from typing import Optional
+from typing import Tuple
+from typing import TypeVar
 
-import requests
 import yaml
 
+from reddit_cli.common import DEFAULT_FEED_TTL
+from reddit_cli.common import CacheConfig
+from reddit_cli.common import CommentsConfig
+from reddit_cli.common import DedupConfig
 from reddit_cli.common import Feed
+from reddit_cli.common import HttpConfig
+from reddit_cli.common import LogConfig
+from reddit_cli.common import PaginationConfig
+from reddit_cli.common import PerfConfig
+from reddit_cli.common import PrefetchConfig
+from reddit_cli.common import RateLimitConfig
+from reddit_cli.common import RSSConfig
+from reddit_cli.common import SearchConfig
+from reddit_cli.common import WarmupConfig
+from reddit_cli.singleflight import SingleFlight
+
+T = TypeVar("T")
+
+# path -> (mtime, parsed yaml), every config reader used to parse the whole file again
+_yaml_cache: Dict[str, Tuple[int, Dict[str, Any]]] = {}
+_yaml_cache_lock = threading.Lock()
+
+
+def _load_yaml(file_path: str) -> Dict[str, Any]:
+    """
+    Parsed config file, only re-read when it changes on disk. Treat the result as read
+    only
+    """
+    mtime = os.stat(file_path).st_mtime_ns
+    with _yaml_cache_lock:
+        cached = _yaml_cache.get(file_path)
+        if cached is not None and cached[0] == mtime:
+            return cached[1]
+
+    with open(file_path, "r") as f:
+        data = yaml.safe_load(f) or {}
+
+    with _yaml_cache_lock:
+        _yaml_cache[file_path] = (mtime, data)
+    return data
+
 
 def get_random_user_agent() -> str:
     user_agents = [
-        'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
-        'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/605.1.15 (KHTML, like Gecko) Version/14.1.1 Safari/605.1.15',
-        'Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
-        'Mozilla/5.0 (iPhone; CPU iPhone OS 14_6 like Mac OS X) AppleWebKit/605.1.15 (KHTML, like Gecko) Version/14.0 Mobile/15E148 Safari/604.1',
-        'Mozilla/5.0 (iPad; CPU OS 14_6 like Mac OS X) AppleWebKit/605.1.15 (KHTML, like Gecko) Version/14.0 Mobile/15E148 Safari/604.1'
+        "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 "
+        "(KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36",
+        "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/605.1.15 "
+        "(KHTML, like Gecko) Version/14.1.1 Safari/605.1.15",
+        "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 "
+        "(KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36",
+        "Mozilla/5.0 (iPhone; CPU iPhone OS 14_6 like Mac OS X) AppleWebKit/605.1.15 "
+        "(KHTML, like Gecko) Version/14.0 Mobile/15E148 Safari/604.1",
+        "Mozilla/5.0 (iPad; CPU OS 14_6 like Mac OS X) AppleWebKit/605.1.15 "
+        "(KHTML, like Gecko) Version/14.0 Mobile/15E148 Safari/604.1",
     ]
     return random.choice(user_agents)
-    
+
+
 def read_feeds_from_yaml(file_path: str) -> List[Feed]:
     if not os.path.exists(file_path):
-        raise FileNotFoundError(f"Could not find {file_path}. Please create it and add some Reddit RSS feed URLs in the specified format.")
+        raise FileNotFoundError(
+            f"Could not find {file_path}. Please create it and add some Reddit RSS "
+            "feed URLs in the specified format."
+        )
 
-    with open(file_path, 'r') as f:
-        data = yaml.safe_load(f)
+    data = _load_yaml(file_path)
+
+    # Per feed ttl falls back to the top level feed_ttl, then to the built in default
+    default_ttl = float(data.get("feed_ttl", DEFAULT_FEED_TTL))
 
     feeds = []
-    for feed_data in data.get('feeds', []):
-        url = feed_data.get('url')
+    for feed_data in data.get("feeds", []):
+        url = feed_data.get("url")
         if url is None:
             print(f"Feed skipped due to missing url key: {feed_data}")
             continue
         # Silently replace .rss with .json
-        url = url.replace('.rss', '.json')
+        url = url.replace(".rss", ".json")
         # Check to make sure is valid feed
         if ".json" not in url:
             print(f"Feed is not recognised as a valid rss/json feed: {url}")
             continue
-        feeds.append(Feed(name=feed_data.get('name', url), url=url))
+        feeds.append(
+            Feed(
+                name=feed_data.get("name", url),
+                url=url,
+                ttl=float(feed_data.get("ttl", default_ttl)),
+            )
+        )
 
     return feeds
 
+
+def get_cache_dir() -> str:
+    """Where we keep anything cached between runs, following the XDG spec"""
+    cache_home = os.environ.get("XDG_CACHE_HOME") or os.path.join(
+        os.path.expanduser("~"), ".cache"
+    )
+    return os.path.join(cache_home, "reddit-cli")
+
+
 def read_theme_from_yaml(file_path: str) -> str:
     if not os.path.exists(file_path):
-        raise FileNotFoundError(f"Could not find {file_path}. Please create it and add a theme name in the specified format.")
+        raise FileNotFoundError(
+            f"Could not find {file_path}. Please create it and add a theme name in "
+            "the specified format."
+        )
 
-    with open(file_path, 'r') as f:
-        data = yaml.safe_load(f)
+    data = _load_yaml(file_path)
 
-    theme_name = data.get('theme')
+    theme_name = data.get("theme")
     if not theme_name:
-        raise ValueError("Theme name not found in YAML file. Please ensure it has a 'theme' key.")
+        raise ValueError(
+            "Theme name not found in YAML file. Please ensure it has a 'theme' key."
+        )
 
     try:
         theme_name = str(theme_name).strip()
@@ -63,13 +141,195 @@ def read_theme_from_yaml(file_path: str) -> str:
     return theme_name
 
 
+def _read_config_section(file_path: str, section: str, config: T) -> T:
+    """
+    Fill a config dataclass from an optional yaml section, keeping defaults for anything
+    missing
+    """
+    if not os.path.exists(file_path):
+        raise FileNotFoundError(
+            f"Could not find {file_path}. Please create it in the specified format."
+        )
+
+    data = _load_yaml(file_path)
+
+    section_data = data.get(section) or {}
+    for config_field in fields(config):  # type: ignore[arg-type]
+        value = section_data.get(config_field.name)
+        if value is None:
+            continue
+        try:
+            # Coerce to the type of the default so "10" in the yaml doesn't upset
+            # anything
+            setattr(
+                config,
+                config_field.name,
+                type(getattr(config, config_field.name))(value),
+            )
+        except (TypeError, ValueError):
+            raise ValueError(
+                f"Invalid value for {section}.{config_field.name}: {value}"
+            )
+
+    return config
+
+
+def read_http_config_from_yaml(file_path: str) -> HttpConfig:
+    return _read_config_section(file_path, "http", HttpConfig())
+
+
+def read_cache_config_from_yaml(file_path: str) -> CacheConfig:
+    return _read_config_section(file_path, "cache", CacheConfig())
+
+
+def read_comments_config_from_yaml(file_path: str) -> CommentsConfig:
+    return _read_config_section(file_path, "comments", CommentsConfig())
+
+
+def read_rate_limit_config_from_yaml(file_path: str) -> RateLimitConfig:
+    return _read_config_section(file_path, "rate_limit", RateLimitConfig())
+
+
+def read_search_config_from_yaml(file_path: str) -> SearchConfig:
+    return _read_config_section(file_path, "search", SearchConfig())
+
+
+def read_dedup_config_from_yaml(file_path: str) -> DedupConfig:
+    return _read_config_section(file_path, "dedup", DedupConfig())
+
+
+def read_pagination_config_from_yaml(file_path: str) -> PaginationConfig:
+    return _read_config_section(file_path, "pagination", PaginationConfig())
+
+
+def read_log_config_from_yaml(file_path: str) -> LogConfig:
+    return _read_config_section(file_path, "logging", LogConfig())
+
+
+def read_perf_config_from_yaml(file_path: str) -> PerfConfig:
+    return _read_config_section(file_path, "perf", PerfConfig())
+
+
+def read_prefetch_config_from_yaml(file_path: str) -> PrefetchConfig:
+    return _read_config_section(file_path, "prefetch", PrefetchConfig())
+
+
+def read_rss_config_from_yaml(file_path: str) -> RSSConfig:
+    return _read_config_section(file_path, "rss", RSSConfig())
+
+
+def read_warmup_config_from_yaml(file_path: str) -> WarmupConfig:
+    return _read_config_section(file_path, "warmup", WarmupConfig())
+
+
 def fetch_image_bytes(url: str) -> BytesIO | None:
-    """Download an image from a URL into a BytesIO buffer."""
-    # TODO: Add image cachine to avoid repeat requests
+    """Download an image from a URL into a BytesIO buffer, going via the image cache."""
+    # Imported here as both modules need the yaml helpers above
+    from reddit_cli.image_cache import get_image_cache
+    from reddit_cli.transport import get_transport
+
+    image_cache = get_image_cache()
+    data = image_cache.get(url)
+    if data is not None:
+        # Fresh buffer each time, a shared one would be left at EOF after the first read
+        return BytesIO(data)
+
     try:
-        response = requests.get(url, timeout=5)
+        response = get_transport().get(url)
         response.raise_for_status()
-        return BytesIO(response.content)
     except Exception as e:
-        print(f"Failed to fetch image: {e}")
-        return None
\ No newline at end of file
+        logging.error(f"Failed to fetch image: {e}")
+        return None
+
+    image_cache.put(url, response.content)
+    return BytesIO(response.content)
+
+
+# url -> (image bytes, bytes downloaded). Opening a post joins a prefetch of its image
+# that's already going rather than downloading it again. The bytes are None when a
+# prefetch gave up on a big image
+_image_flights: SingleFlight[str, Tuple[Optional[bytes], int]] = SingleFlight()
+
+
+async def _download_image(url: str) -> Tuple[Optional[bytes], int]:
+    from reddit_cli.image_cache import aget_image_cache
+    from reddit_cli.transport import get_async_transport
+
+    response = await get_async_transport().get(url)
+    response.raise_for_status()
+    image_cache = await aget_image_cache()
+    await asyncio.to_thread(image_cache.put, url, response.content)
+    return response.content, len(response.content)
+
+
+async def afetch_image_bytes(url: str) -> BytesIO | None:
+    """
+    Async fetch_image_bytes for the TUI, disk cache reads go to a thread so the loop
+    never blocks.
+    """
+    from reddit_cli.image_cache import aget_image_cache
+
+    image_cache = await aget_image_cache()
+    data = image_cache.memory.get(url)
+    # Something is already downloading it, so it won't be on disk. Join before the
+    # prefetcher can drop it
+    if data is None and url not in _image_flights:
+        data = await asyncio.to_thread(image_cache.get, url)
+    if data is not None:
+        return BytesIO(data)
+
+    try:
+        data, _ = await _image_flights.do(url, lambda: _download_image(url))
+        if data is None:
+            # Joined a prefetch that decided the image was too big, so fetch it for real
+            data, _ = await _image_flights.do(url, lambda: _download_image(url))
+    except Exception as e:
+        logging.error(f"Failed to fetch image: {e}")
+        return None
+
+    return BytesIO(data) if data is not None else None
+
+
+async def _stream_image(url: str, max_bytes: int) -> Tuple[Optional[bytes], int]:
+    from reddit_cli.image_cache import aget_image_cache
+    from reddit_cli.scheduler import Priority
+    from reddit_cli.transport import get_async_transport
+
+    downloaded = 0
+    chunks = []
+    # Queues behind anything the user is actually waiting on
+    async with get_async_transport().stream(
+        url, priority=Priority.PREFETCH
+    ) as response:
+        response.raise_for_status()
+        content_length = response.headers.get("Content-Length")
+        if content_length is not None and int(content_length) > max_bytes:
+            return None, 0
+        async for chunk in response.aiter_bytes(chunk_size=64 * 1024):
+            downloaded += len(chunk)
+            if downloaded > max_bytes:
+                return None, downloaded
+            chunks.append(chunk)
+
+    data = b"".join(chunks)
+    image_cache = await aget_image_cache()
+    await asyncio.to_thread(image_cache.put, url, data)
+    return data, downloaded
+
+
+async def aprefetch_image_bytes(url: str, max_bytes: int) -> int:
+    """
+    Pull an image into the image cache ahead of time. Gives up on anything over
+    max_bytes, cancelling the task drops the download unless the post has been opened
+    and is waiting on it. Returns the bytes downloaded.
+    """
+    from reddit_cli.image_cache import aget_image_cache
+
+    image_cache = await aget_image_cache()
+    # A membership check rather than get, so prefetching doesn't read the file or
+    # count as a hit
+    if url in image_cache:
+        return 0
+
+    _, downloaded = await _image_flights.do(url, lambda: _stream_image(url, max_bytes))
+    return downloaded
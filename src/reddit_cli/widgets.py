@@ -0,0 +1,416 @@
+from typing import Any
+from typing import Callable
+from typing import Dict
+from typing import Hashable
+from typing import List
+from typing import Optional
+from typing import Tuple
+from typing import cast
+
+from rich.segment import Segment
+from rich.style import Style
+from rich.text import Text
+from textual.css.scalar import Unit
+from textual.geometry import Region
+from textual.geometry import Size
+from textual.reactive import reactive
+from textual.scroll_view import ScrollView
+from textual.strip import Strip
+from textual.timer import Timer
+from textual.widgets import Static
+from textual.widgets import Tree
+from textual.widgets.tree import TreeNode
+
+from reddit_cli.comments import Comment
+from reddit_cli.comments import CommentNode
+from reddit_cli.comments import MoreComments
+from reddit_cli.common import PostRowData
+from reddit_cli.perf import get_perf
+
+# Rows are either plain (markup) strings or post rows
+Row = Any
+
+
+def row_key(row: Row) -> Hashable:
+    """Identity of a row for diffing, posts go by their reddit fullname"""
+    if isinstance(row, PostRowData):
+        # Dataclasses aren't hashable, so an unnamed post goes by what's shown
+        return row.name or (row.subreddit, row.title)
+    return cast(Hashable, row)
+
+
+class VirtualListView(ScrollView, can_focus=False):
+    """
+    List that keeps its rows as plain data and only renders the lines in the viewport.
+    Scroll and keypress cost stays flat no matter how many posts have been loaded, since
+    there's no widget per row. Rendered rows just around the viewport are kept for
+    reuse.
+    """
+
+    COMPONENT_CLASSES = {
+        "virtual-list--cursor",
+        "virtual-list--emoji",
+        "virtual-list--subreddit",
+        "virtual-list--title",
+    }
+
+    DEFAULT_CSS = """
+    VirtualListView {
+        height: 1fr;
+        overflow-x: hidden;
+    }
+    VirtualListView > .virtual-list--cursor {
+        background: $block-cursor-background;
+        color: $block-cursor-foreground;
+        text-style: $block-cursor-text-style;
+    }
+    VirtualListView > .virtual-list--emoji {
+        width: 3;
+    }
+    VirtualListView > .virtual-list--subreddit {
+        width: 14;
+        color: cyan;
+    }
+    """
+
+    index: reactive[int] = reactive(0, always_update=True)
+
+    def __init__(
+        self, rows: Optional[List[Row]] = None, overscan: int = 10, **kwargs: Any
+    ) -> None:
+        super().__init__(**kwargs)
+        self.rows: List[Row] = list(rows) if rows else []
+        self.overscan = overscan
+        # (row index, highlighted) -> rendered line, only kept for rows near the
+        # viewport
+        self._line_cache: Dict[Tuple[int, bool], Strip] = {}
+        self._cache_width = 0
+        self._update_virtual_size()
+
+    def _update_virtual_size(self) -> None:
+        self.virtual_size = Size(self.size.width, len(self.rows))
+
+    def _invalidate(self) -> None:
+        self._line_cache.clear()
+        self._update_virtual_size()
+        self.refresh()
+
+    def set_rows(self, rows: List[Row]) -> None:
+        self.rows = list(rows)
+        self._invalidate()
+        self.index = min(self.index, max(len(self.rows) - 1, 0))
+
+    def update_rows(
+        self, rows: List[Row], key: Callable[[Row], Hashable] = row_key
+    ) -> None:
+        """
+        Swap in a new set of rows, matching them up by key so only inserted, moved or
+        edited rows get rendered again. The cursor follows the row it was on if that row
+        is still there.
+        """
+        old_rows = self.rows
+        selected_key = (
+            key(old_rows[self.index]) if 0 <= self.index < len(old_rows) else None
+        )
+        # Where each key ended up, the first one wins if a key turns up twice
+        new_index_of: Dict[Hashable, int] = {}
+        for index, row in enumerate(rows):
+            new_index_of.setdefault(key(row), index)
+
+        # Only rows around the viewport are cached, so this is cheap however long the
+        # list gets
+        line_cache: Dict[Tuple[int, bool], Strip] = {}
+        for (old_index, highlighted), strip in self._line_cache.items():
+            old_row = old_rows[old_index]
+            new_index = new_index_of.get(key(old_row))
+            # Same post but edited (title changed etc.) needs drawing again
+            if new_index is not None and rows[new_index] == old_row:
+                line_cache[(new_index, highlighted)] = strip
+
+        self.rows = list(rows)
+        self._line_cache = line_cache
+        self._update_virtual_size()
+        self.refresh()
+
+        if selected_key is not None and selected_key in new_index_of:
+            self.index = new_index_of[selected_key]
+        else:
+            self.index = min(self.index, max(len(self.rows) - 1, 0))
+
+    def extend(self, rows: List[Row]) -> None:
+        # Nothing already on screen changes so the cache can stay
+        self.rows.extend(rows)
+        self._update_virtual_size()
+        self.refresh()
+
+    def set_row(self, index: int, row: Row) -> None:
+        self.rows[index] = row
+        self._line_cache.pop((index, True), None)
+        self._line_cache.pop((index, False), None)
+        self.refresh_row(index)
+
+    def clear(self) -> None:
+        self.set_rows([])
+
+    def refresh_row(self, index: int) -> None:
+        self.refresh(Region(0, index - round(self.scroll_y), self.size.width, 1))
+
+    def validate_index(self, index: int) -> int:
+        return max(0, min(index, len(self.rows) - 1))
+
+    def watch_index(self, old_index: int, new_index: int) -> None:
+        self.refresh_row(old_index)
+        self.refresh_row(new_index)
+        self.scroll_to_region(Region(0, new_index, 1, 1), animate=False, force=True)
+
+    def on_resize(self) -> None:
+        self._update_virtual_size()
+
+    def _column_width(self, component: str, default: int) -> int:
+        # Themes can set a cell width on the column component classes
+        width = self.get_component_styles(component).width
+        if width is not None and width.unit == Unit.CELLS:
+            return int(width.value)
+        return default
+
+    def _render_row(self, row: Row, width: int) -> List[Segment]:
+        if isinstance(row, PostRowData):
+            emoji = Text(
+                row.emoji,
+                style=self.get_component_rich_style("virtual-list--emoji"),
+                no_wrap=True,
+            )
+            emoji.truncate(self._column_width("virtual-list--emoji", 3), pad=True)
+            subreddit = Text(
+                row.subreddit,
+                style=self.get_component_rich_style("virtual-list--subreddit"),
+                no_wrap=True,
+            )
+            subreddit.truncate(
+                self._column_width("virtual-list--subreddit", 14),
+                overflow="ellipsis",
+                pad=True,
+            )
+            text = Text.assemble(
+                emoji,
+                subreddit,
+                Text(
+                    row.title,
+                    style=self.get_component_rich_style("virtual-list--title"),
+                ),
+            )
+        else:
+            text = Text.from_markup(str(row))
+        text.truncate(width, overflow="ellipsis", pad=True)
+        return list(text.render(self.app.console, end=""))
+
+    def render_line(self, y: int) -> Strip:
+        width = self.size.width
+        if width != self._cache_width:
+            self._line_cache.clear()
+            self._cache_width = width
+
+        row_index = round(self.scroll_y) + y
+        if row_index >= len(self.rows):
+            return Strip.blank(width, self.rich_style)
+
+        highlighted = row_index == self.index
+        key = (row_index, highlighted)
+        strip = self._line_cache.get(key)
+        if strip is None:
+            base_style: Style = self.rich_style
+            if highlighted:
+                base_style += self.get_component_rich_style("virtual-list--cursor")
+            strip = Strip(
+                self._render_row(self.rows[row_index], width), width
+            ).apply_style(base_style)
+            self._line_cache[key] = strip
+            self._prune_cache()
+        return strip
+
+    def _prune_cache(self) -> None:
+        # Keep only the viewport plus overscan so memory stays flat too
+        top = round(self.scroll_y) - self.overscan
+        bottom = round(self.scroll_y) + self.size.height + self.overscan
+        if len(self._line_cache) <= (bottom - top) * 2:
+            return
+        for key in [key for key in self._line_cache if not top <= key[0] < bottom]:
+            del self._line_cache[key]
+
+
+def comment_label(node: CommentNode) -> Text:
+    """One line per comment, the full body goes in the pane under the tree"""
+    if isinstance(node, MoreComments):
+        if node.is_continue_thread:
+            return Text("continue this thread →", style="italic dim")
+        return Text(
+            f"load {node.count} more comment{'s' if node.count != 1 else ''}",
+            style="italic dim",
+        )
+    return Text.assemble(
+        (node.author, "bold"),
+        (f" {node.score} ", "dim"),
+        " ".join(node.body.split()),
+        no_wrap=True,
+    )
+
+
+class CommentTree(Tree[CommentNode], can_focus=False):
+    """
+    Comment thread that only builds tree nodes for branches that have been opened.
+    Replies under a collapsed comment stay as plain data, so a 5k comment thread costs
+    a node per top level comment until you go digging.
+    """
+
+    DEFAULT_CSS = """
+    CommentTree {
+        height: 1fr;
+        padding: 0 1;
+    }
+    """
+
+    def __init__(
+        self, comments: Optional[List[CommentNode]] = None, **kwargs: Any
+    ) -> None:
+        super().__init__("comments", **kwargs)
+        self.show_root = False
+        self.guide_depth = 2
+        if comments:
+            self.set_comments(comments)
+
+    def set_comments(self, comments: List[CommentNode]) -> None:
+        self.clear()
+        self._add_nodes(self.root, comments)
+        self.root.expand()
+
+    def _add_nodes(
+        self,
+        parent: TreeNode[CommentNode],
+        nodes: List[CommentNode],
+        before: Optional[TreeNode[CommentNode]] = None,
+    ) -> None:
+        for node in nodes:
+            if isinstance(node, Comment):
+                parent.add(
+                    comment_label(node),
+                    node,
+                    before=before,
+                    allow_expand=bool(node.replies),
+                )
+            else:
+                parent.add_leaf(comment_label(node), node, before=before)
+
+    def materialize(self, node: TreeNode[CommentNode]) -> None:
+        # Replies only become nodes the first time their comment is opened
+        if isinstance(node.data, Comment) and node.data.replies and not node.children:
+            self._add_nodes(node, node.data.replies)
+
+    def toggle(self, node: TreeNode[CommentNode]) -> None:
+        self.materialize(node)
+        node.toggle()
+
+    def replace_stub(
+        self, stub: TreeNode[CommentNode], nodes: List[CommentNode]
+    ) -> None:
+        """Swap a "more" stub for what it stood in for, in the same spot"""
+        parent = stub.parent
+        if parent is None:
+            return
+        # Keep the data in step so nothing goes missing if the branch is rebuilt
+        if isinstance(parent.data, Comment) and stub.data in parent.data.replies:
+            index = parent.data.replies.index(stub.data)
+            parent.data.replies[index : index + 1] = nodes
+        self._add_nodes(parent, nodes, before=stub)
+        stub.remove()
+
+
+class PerfOverlay(Static, can_focus=False):
+    """
+    Recent span timings, cache hit rates and requests in flight, redrawn while it's
+    showing
+    """
+
+    DEFAULT_CSS = """
+    PerfOverlay {
+        dock: right;
+        width: 66;
+        height: auto;
+        padding: 0 1;
+        background: $panel;
+        display: none;
+    }
+    """
+
+    REFRESH_INTERVAL = 0.5
+
+    def __init__(self) -> None:
+        super().__init__("", id="perf-overlay")
+        self.message = ""
+        self._timer: Optional[Timer] = None
+
+    def on_mount(self) -> None:
+        self._timer = self.set_interval(
+            self.REFRESH_INTERVAL, self.update_stats, pause=not self.display
+        )
+
+    def show(self, visible: bool) -> None:
+        self.display = visible
+        if self._timer is not None:
+            if visible:
+                self._timer.resume()
+            else:
+                self._timer.pause()
+        if visible:
+            self.update_stats()
+
+    def update_stats(self) -> None:
+        # Imported here, none of these are needed until something has been fetched
+        from reddit_cli.feed_handlers import feed_loads_in_flight
+        from reddit_cli.feed_handlers import get_feed_cache
+        from reddit_cli.image_cache import peek_image_cache
+        from reddit_cli.image_scale import get_image_scaler
+        from reddit_cli.scheduler import get_scheduler
+        from reddit_cli.transport import requests_in_flight
+
+        lines = [
+            f"[b]{'span':<15}{'n':>6}{'last':>9}{'p50':>9}{'p95':>9}{'max':>9}[/b]"
+        ]
+        for summary in get_perf().summaries():
+            lines.append(
+                f"{summary.name:<15}{summary.count:>6}{summary.last_ms:>9.1f}"
+                f"{summary.p50_ms:>9.1f}{summary.p95_ms:>9.1f}{summary.max_ms:>9.1f}"
+            )
+        if len(lines) == 1:
+            lines.append("[dim]nothing timed yet[/dim]")
+
+        feed_stats = get_feed_cache().stats
+        # Building the image cache walks the disk cache, leave that to the first image
+        # fetch
+        image_cache = peek_image_cache()
+        scaled_stats = get_image_scaler().cache.stats
+        lines.append("")
+        lines.append(
+            f"feed cache   {feed_stats.hit_rate:>4.0%} hits, {feed_stats.entries} feeds"
+        )
+        if image_cache is not None:
+            image_stats = image_cache.memory.stats
+            lines.append(
+                f"image cache  {image_stats.hit_rate:>4.0%} hits, "
+                f"{image_stats.entries} images, "
+                f"{image_stats.bytes / 1024 / 1024:.1f} MB"
+            )
+        else:
+            lines.append("image cache  nothing fetched yet")
+        lines.append(
+            f"scaled       {scaled_stats.hit_rate:>4.0%} hits, "
+            f"{scaled_stats.entries} images, "
+            f"{scaled_stats.bytes / 1024 / 1024:.1f} MB"
+        )
+        lines.append(
+            f"in flight    {feed_loads_in_flight()} feed loads, "
+            f"{requests_in_flight()} GETs, {get_scheduler().queued()} queued"
+        )
+        lines.append("[dim]f12 hides this, f11 exports the raw spans[/dim]")
+        if self.message:
+            lines.append(self.message)
+        self.update("\n".join(lines))
@@ -0,0 +1,44 @@
+from pathlib import Path
+from typing import Iterator
+
+import pytest
+
+from reddit_cli import dedup
+from reddit_cli import feed_handlers
+from reddit_cli import feed_store
+from reddit_cli import scheduler
+from reddit_cli import search_index
+from reddit_cli import transport
+from reddit_cli.devserver import RedditStandIn
+from reddit_cli.devserver import StandInOptions
+from reddit_cli.devserver import serve
+
+
+@pytest.fixture
+def standin(monkeypatch: pytest.MonkeyPatch) -> Iterator[RedditStandIn]:
+    """The local reddit stand-in, with fresh transports pointed at it"""
+    server = serve(options=StandInOptions(posts=60, comments=30, depth=3))
+    monkeypatch.setenv(transport.BASE_URL_ENV, server.base_url)
+    monkeypatch.setattr(transport, "_transport", None)
+    monkeypatch.setattr(transport, "_async_transport", None)
+    monkeypatch.setattr(scheduler, "_scheduler", None)
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def cache_dir(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Iterator[Path]:
+    """A fresh cache dir, with the store, search index and caches opened from it"""
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path))
+    monkeypatch.setattr(feed_store, "_store", None)
+    monkeypatch.setattr(feed_store, "_store_failed", False)
+    monkeypatch.setattr(search_index, "_index", None)
+    monkeypatch.setattr(search_index, "_index_failed", False)
+    monkeypatch.setattr(feed_handlers, "_feed_cache", None)
+    monkeypatch.setattr(dedup, "_seen_index", None)
+    yield tmp_path
+    for module, name in ((feed_store, "_store"), (search_index, "_index")):
+        opened = getattr(module, name)
+        if opened is not None:
+            opened.close()
@@ -0,0 +1,86 @@
+import pytest
+
+from reddit_cli import cache
+from reddit_cli.cache import LRUCache
+
+
+class Clock:
+    def __init__(self) -> None:
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch: pytest.MonkeyPatch) -> Clock:
+    clock = Clock()
+    monkeypatch.setattr(cache.time, "monotonic", clock)
+    return clock
+
+
+def test_evicts_least_recently_used() -> None:
+    lru: LRUCache[str, int] = LRUCache(max_entries=2)
+    lru.put("a", 1)
+    lru.put("b", 2)
+    assert lru.get("a") == 1
+    lru.put("c", 3)
+    assert "b" not in lru
+    assert lru.get("a") == 1 and lru.get("c") == 3
+    assert lru.stats.evictions == 1
+
+
+def test_byte_budget() -> None:
+    lru: LRUCache[str, bytes] = LRUCache(max_entries=10, max_bytes=10, sizeof=len)
+    lru.put("a", b"12345")
+    lru.put("b", b"12345")
+    lru.put("c", b"1")
+    assert "a" not in lru
+    assert lru.stats.bytes == 6
+    # Bigger than the whole budget isn't kept, and doesn't flush everything else
+    lru.put("huge", b"x" * 11)
+    assert "huge" not in lru and len(lru) == 2
+
+
+def test_replacing_an_entry_updates_its_size() -> None:
+    lru: LRUCache[str, bytes] = LRUCache(max_entries=10, max_bytes=100, sizeof=len)
+    lru.put("a", b"x" * 50)
+    lru.put("a", b"x" * 10)
+    assert lru.stats.bytes == 10 and len(lru) == 1
+
+
+def test_ttl(clock: Clock) -> None:
+    lru: LRUCache[str, int] = LRUCache(max_entries=10, ttl=60)
+    lru.put("default", 1)
+    lru.put("short", 2, ttl=5)
+    clock.now += 10
+    assert lru.get("short") is None
+    assert lru.get("default") == 1
+    clock.now += 60
+    assert "default" not in lru
+    # Only lookups through get() count
+    assert lru.stats.expirations == 1
+
+
+def test_expired_entries_go_before_live_ones(clock: Clock) -> None:
+    lru: LRUCache[str, int] = LRUCache(max_entries=2)
+    lru.put("old", 1, ttl=1)
+    lru.put("live", 2)
+    clock.now += 5
+    lru.put("new", 3)
+    assert lru.get("live") == 2 and lru.get("new") == 3
+    assert lru.stats.evictions == 0
+
+
+def test_hit_rate_and_pop() -> None:
+    lru: LRUCache[str, int] = LRUCache(max_entries=10)
+    lru.put("a", 1)
+    lru.get("a")
+    lru.get("missing")
+    assert lru.stats.hit_rate == 0.5
+    assert lru.pop("a") == 1 and lru.pop("a") is None
+
+
+def test_rejects_zero_entries() -> None:
+    with pytest.raises(ValueError):
+        LRUCache(max_entries=0)
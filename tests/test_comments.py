@@ -0,0 +1,182 @@
+import asyncio
+import json
+from typing import List
+
+import pytest
+from textual.app import App
+from textual.app import ComposeResult
+
+from reddit_cli import comments
+from reddit_cli.comments import Comment
+from reddit_cli.comments import CommentNode
+from reddit_cli.comments import CommentsHandler
+from reddit_cli.comments import MoreComments
+from reddit_cli.comments import count_comments
+from reddit_cli.comments import parse_comments_listing
+from reddit_cli.comments import parse_more_children
+from reddit_cli.devserver import RedditStandIn
+from reddit_cli.transport import close_async_transport
+from reddit_cli.widgets import CommentTree
+
+POST_ID = "abc"
+POST_URL = f"https://www.reddit.com/r/python/comments/{POST_ID}/a_post/"
+
+
+def walk(nodes: List[CommentNode]) -> List[CommentNode]:
+    found: List[CommentNode] = []
+    for node in nodes:
+        found.append(node)
+        if isinstance(node, Comment):
+            found += walk(node.replies)
+    return found
+
+
+def thread(standin: RedditStandIn, limit: int) -> List[CommentNode]:
+    return parse_comments_listing(json.dumps(standin.thread(POST_ID, None, limit)))
+
+
+def test_listing_keeps_reply_depths_and_stubs(standin: RedditStandIn) -> None:
+    nodes = thread(standin, limit=10)
+
+    assert [type(node) for node in nodes] == [Comment] * 10 + [MoreComments]
+    more = nodes[-1]
+    assert isinstance(more, MoreComments)
+    assert (more.count, len(more.children), more.is_continue_thread) == (20, 20, False)
+
+    for node in walk(nodes):
+        if isinstance(node, Comment):
+            assert all(reply.depth == node.depth + 1 for reply in node.replies)
+    # Past the stand-in's depth reddit stops nesting and sends continue this thread
+    continues = [node for node in walk(nodes) if isinstance(node, MoreComments)][:-1]
+    assert continues
+    assert all(stub.is_continue_thread and stub.depth == 3 for stub in continues)
+
+
+def test_listing_tolerates_missing_fields() -> None:
+    raw = json.dumps(
+        [
+            {"kind": "Listing", "data": {"children": []}},
+            {
+                "kind": "Listing",
+                "data": {
+                    "children": [
+                        {"kind": "t1", "data": {"name": "t1_a", "author": None}},
+                        {"kind": "t3", "data": {}},
+                    ]
+                },
+            },
+        ]
+    )
+    nodes = parse_comments_listing(raw)
+    assert len(nodes) == 1
+    comment = nodes[0]
+    assert isinstance(comment, Comment)
+    assert (comment.author, comment.body, comment.replies) == ("[deleted]", "", [])
+    assert parse_comments_listing('{"error": 404}') == []
+
+
+def test_more_children_rebuilds_the_tree(standin: RedditStandIn) -> None:
+    ids = [f"{POST_ID}c{n}" for n in range(3)]
+    raw = json.dumps(standin.more_children(f"t3_{POST_ID}", ids))
+    flat = json.loads(raw)["json"]["data"]["things"]
+
+    roots = parse_more_children(raw)
+
+    assert [node.name for node in roots if isinstance(node, Comment)] == [
+        f"t1_{comment_id}" for comment_id in ids
+    ]
+    # Every flattened comment is back under its parent, continue stubs count for nothing
+    assert count_comments(roots) == len(flat)
+    for node in walk(roots):
+        if isinstance(node, Comment):
+            assert all(reply.depth == node.depth + 1 for reply in node.replies)
+
+
+def test_load_more_batches_ids(
+    standin: RedditStandIn, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setattr(comments, "MORE_CHILDREN_BATCH", 8)
+    more = thread(standin, limit=10)[-1]
+    assert isinstance(more, MoreComments)
+
+    async def run() -> List[CommentNode]:
+        try:
+            return await CommentsHandler(POST_URL).aload_more(more)
+        finally:
+            await close_async_transport()
+
+    nodes = asyncio.run(run())
+
+    assert [node.name for node in nodes[:8] if isinstance(node, Comment)] == [
+        f"t1_{comment_id}" for comment_id in more.children[:8]
+    ]
+    rest = nodes[8]
+    assert isinstance(rest, MoreComments)
+    assert (rest.children, rest.count) == (more.children[8:], 12)
+    assert standin.hits["morechildren"] == 1
+
+
+def test_continue_thread_keeps_the_stub_depth(standin: RedditStandIn) -> None:
+    stub = next(
+        node
+        for node in walk(thread(standin, limit=10))
+        if isinstance(node, MoreComments) and node.is_continue_thread
+    )
+
+    async def run() -> List[CommentNode]:
+        try:
+            return await CommentsHandler(POST_URL).aload_more(stub)
+        finally:
+            await close_async_transport()
+
+    replies = asyncio.run(run())
+
+    assert replies
+    # The parent comment itself is already on screen, only its replies come back
+    assert all(isinstance(node, Comment) for node in replies)
+    assert {node.depth for node in replies} == {stub.depth}
+    for node in walk(replies):
+        if isinstance(node, Comment):
+            assert all(reply.depth == node.depth + 1 for reply in node.replies)
+
+
+class TreeApp(App[None]):
+    def __init__(self, nodes: List[CommentNode]) -> None:
+        super().__init__()
+        self.comment_tree = CommentTree(nodes)
+
+    def compose(self) -> ComposeResult:
+        yield self.comment_tree
+
+
+def comment(name: str, *replies: CommentNode) -> Comment:
+    return Comment(name, "someone", name, 1, 0, list(replies))
+
+
+def name_of(node: CommentNode | None) -> str:
+    assert isinstance(node, Comment)
+    return node.name
+
+
+def test_replace_stub_puts_comments_in_its_place() -> None:
+    stub = MoreComments("t1_a", ["c", "d"], 2, 1)
+    parent = comment("t1_a", comment("t1_b"), stub, comment("t1_e"))
+
+    async def run() -> None:
+        app = TreeApp([parent])
+        async with app.run_test():
+            tree = app.comment_tree
+            node = tree.root.children[0]
+            # Replies aren't nodes until their comment is opened
+            assert not node.children
+            tree.toggle(node)
+            stub_node = node.children[1]
+            assert stub_node.data is stub
+
+            tree.replace_stub(stub_node, [comment("t1_c"), comment("t1_d")])
+
+            names = [name_of(child.data) for child in node.children]
+            assert names == ["t1_b", "t1_c", "t1_d", "t1_e"]
+            assert [name_of(reply) for reply in parent.replies] == names
+
+    asyncio.run(run())
@@ -0,0 +1,64 @@
+import zlib
+
+from reddit_cli.common import _COMPRESS_MIN_LENGTH
+from reddit_cli.common import RedditPost
+from reddit_cli.common import _pack
+from reddit_cli.common import _unpack
+
+
+def post(content_raw: str | None, content_clean: str | None = None) -> RedditPost:
+    return RedditPost(
+        "a title",
+        "https://reddit.com/r/python/comments/abc/",
+        "python",
+        content_raw,
+        content_clean,
+        name="t3_abc",
+    )
+
+
+def test_only_long_text_is_compressed() -> None:
+    short = "x" * (_COMPRESS_MIN_LENGTH - 1)
+    long = "x" * _COMPRESS_MIN_LENGTH
+    assert _pack(short) == short
+    packed = _pack(long)
+    assert isinstance(packed, bytes)
+    assert zlib.decompress(packed).decode("utf-8") == long
+    assert _pack(None) is None
+
+
+def test_unpack_round_trips() -> None:
+    text = "ünïcode " * 100
+    assert _unpack(_pack(text)) == text
+    assert _unpack("short") == "short"
+    assert _unpack(None) == ""
+
+
+def test_post_bodies_read_back_the_same() -> None:
+    body = "<p>" + "a long body " * 50 + "</p>"
+    packed = post(body, "clean " * 60)
+    assert isinstance(packed._content_raw, bytes)
+    assert packed.content_raw == body
+    assert packed.content_clean == "clean " * 60
+
+    plain = post("short", None)
+    assert plain._content_raw == "short"
+    assert (plain.content_raw, plain.content_clean) == ("short", "")
+
+
+def test_equality_across_packed_and_unpacked_posts() -> None:
+    body = "b" * 1000
+    assert post(body) == post(body)
+    assert post("short") == post("short")
+    assert post(body) != post(body + "!")
+    assert post(None) == post(None) == post("")
+    assert post(body) != "not a post"
+
+
+def test_approx_size_counts_the_compressed_bodies() -> None:
+    body = "z" * 10_000
+    packed = post(body)
+    fields = len("a title") + len(packed.post_url) + len("python")
+    assert packed.approx_size() == fields + len(zlib.compress(body.encode(), 1))
+    assert packed.approx_size() < fields + 1000
+    assert post("short").approx_size() == fields + len("short")
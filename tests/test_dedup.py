@@ -0,0 +1,67 @@
+from typing import List
+
+from reddit_cli.common import RedditPost
+from reddit_cli.dedup import SeenIndex
+
+FRONT = "https://www.reddit.com/.json"
+PYTHON = "https://www.reddit.com/r/python/.json"
+
+
+def posts(*ids: int) -> List[RedditPost]:
+    return [
+        RedditPost(f"post {i}", f"https://reddit.com/{i}", "python", "", name=f"t3_{i}")
+        for i in ids
+    ]
+
+
+def names(kept: List[RedditPost]) -> List[str | None]:
+    return [post.name for post in kept]
+
+
+def test_filter_drops_repeats_within_a_feed() -> None:
+    index = SeenIndex()
+    assert names(index.filter(PYTHON, posts(1, 2, 3))) == ["t3_1", "t3_2", "t3_3"]
+    # The listing shifted, so the next page starts with the end of the last one
+    assert names(index.filter(PYTHON, posts(3, 4, 4, 5))) == ["t3_4", "t3_5"]
+
+    stats = index.stats(PYTHON)
+    assert (stats.dropped, stats.dropped_cross_feed, stats.indexed) == (2, 0, 5)
+
+
+def test_rss_entries_are_keyed_by_permalink() -> None:
+    index = SeenIndex()
+    entry = RedditPost("post", "https://reddit.com/r/python/comments/a", "python", "")
+    assert len(index.filter(PYTHON, [entry, entry])) == 1
+
+
+def test_feeds_are_separate_without_cross_feed() -> None:
+    index = SeenIndex()
+    index.filter(FRONT, posts(1, 2))
+    assert names(index.filter(PYTHON, posts(2, 3))) == ["t3_2", "t3_3"]
+    # Each feed still drops its own repeats
+    assert names(index.filter(FRONT, posts(2))) == []
+    assert names(index.filter(PYTHON, posts(2))) == []
+
+
+def test_cross_feed_drops_posts_another_feed_showed() -> None:
+    index = SeenIndex(cross_feed=True)
+    index.filter(FRONT, posts(1, 2))
+    assert names(index.filter(PYTHON, posts(2, 3))) == ["t3_3"]
+
+    stats = index.stats()
+    assert (stats.dropped, stats.dropped_cross_feed, stats.indexed) == (1, 1, 3)
+
+
+def test_reset_forgets_only_that_feed() -> None:
+    index = SeenIndex(cross_feed=True)
+    index.filter(FRONT, posts(1, 2))
+    index.filter(PYTHON, posts(3))
+
+    # A fresh first page of the front page starts it over
+    assert names(index.filter(FRONT, posts(1, 2), reset=True)) == ["t3_1", "t3_2"]
+    assert names(index.filter(PYTHON, posts(3))) == []
+
+    index.reset(FRONT)
+    assert index.stats(FRONT).indexed == 0
+    # Once the front page has forgotten them, its posts are free for other feeds
+    assert names(index.filter(PYTHON, posts(1))) == ["t3_1"]
@@ -0,0 +1,60 @@
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterator
+
+import httpx
+import pytest
+
+from reddit_cli.devserver import RedditStandIn
+
+
+@pytest.fixture
+def client(standin: RedditStandIn) -> Iterator[httpx.Client]:
+    with httpx.Client(base_url=standin.base_url) as client:
+        yield client
+
+
+def test_listing_pages_with_after(client: httpx.Client) -> None:
+    first = client.get("/r/python/.json", params={"limit": 50}).json()["data"]
+    assert first["dist"] == 50
+    rest = client.get(
+        "/r/python/.json", params={"limit": 500, "after": first["after"]}
+    ).json()["data"]
+    # The stand-in has 60 posts, and limits are clamped to 100
+    assert (rest["dist"], rest["after"]) == (10, None)
+    names = [child["data"]["name"] for child in first["children"] + rest["children"]]
+    assert len(set(names)) == 60
+
+
+def test_unchanged_bodies_get_a_304(client: httpx.Client) -> None:
+    response = client.get("/r/python/.json")
+    again = client.get(
+        "/r/python/.json", headers={"If-None-Match": response.headers["ETag"]}
+    )
+    assert (response.status_code, again.status_code) == (200, 304)
+
+
+@pytest.mark.parametrize(
+    "path", ["/r/python/.json", "/r/python/.rss", "/r/python/comments/abc/a_post.json"]
+)
+def test_a_bad_limit_is_a_400(
+    client: httpx.Client, standin: RedditStandIn, path: str
+) -> None:
+    response = client.get(path, params={"limit": "lots"})
+    assert response.status_code == 400
+    assert response.json() == {"message": "limit must be a number", "error": 400}
+    assert standin.stats() == {"400": 1}
+
+
+def test_unknown_paths_are_a_404(client: httpx.Client) -> None:
+    assert client.get("/nothing/here").status_code == 404
+
+
+def test_hits_from_many_threads_all_count(
+    client: httpx.Client, standin: RedditStandIn
+) -> None:
+    paths = ["/r/python/.json", "/r/linux/.rss", "/i/pic.png"] * 20
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        statuses = list(executor.map(lambda path: client.get(path).status_code, paths))
+    assert statuses == [200] * len(paths)
+    assert standin.stats() == {"listing": 20, "rss": 20, "image": 20}
+    assert client.get("/__stats").json() == standin.stats()
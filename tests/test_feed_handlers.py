@@ -0,0 +1,337 @@
+import asyncio
+import json
+import re
+import textwrap
+from contextlib import asynccontextmanager
+from typing import Any
+from typing import AsyncIterator
+from typing import Dict
+from typing import List
+from typing import Optional
+from typing import Tuple
+
+import httpx
+import pytest
+from bs4 import BeautifulSoup
+
+from reddit_cli import feed_handlers
+from reddit_cli.common import RSSConfig
+from reddit_cli.feed_handlers import JSONHandler
+from reddit_cli.feed_handlers import ListingStreamParser
+from reddit_cli.feed_handlers import RSSHandler
+from reddit_cli.feed_handlers import parse_entry_content
+
+FEED_URL = "https://www.reddit.com/r/python/.json"
+
+
+def listing(count: int, **extra: Any) -> bytes:
+    children = [
+        {"kind": "t3", "data": {"name": f"t3_{i}", "title": f"post {i}", **extra}}
+        for i in range(count)
+    ]
+    return json.dumps(
+        {
+            "kind": "Listing",
+            "data": {"after": None, "dist": count, "children": children},
+        }
+    ).encode()
+
+
+def feed_in_chunks(body: bytes, size: int) -> List[Dict[str, Any]]:
+    parser = ListingStreamParser()
+    children = []
+    for start in range(0, len(body), size):
+        children += parser.feed(body[start : start + size])
+    assert parser.done
+    return children
+
+
+def test_parser_whole_body() -> None:
+    assert [child["name"] for child in feed_in_chunks(listing(3), 1 << 20)] == [
+        "t3_0",
+        "t3_1",
+        "t3_2",
+    ]
+
+
+@pytest.mark.parametrize("size", [1, 2, 7, 64])
+def test_parser_chunk_boundaries(size: int) -> None:
+    # Splits land inside keys, strings, escapes and the "children": [ marker itself
+    body = listing(5, selftext='quote " backslash \\ brace } bracket ] emoji 🐍')
+    children = feed_in_chunks(body, size)
+    assert [child["name"] for child in children] == [f"t3_{i}" for i in range(5)]
+    assert children[0]["selftext"] == 'quote " backslash \\ brace } bracket ] emoji 🐍'
+
+
+def test_parser_children_marker_inside_a_string() -> None:
+    body = listing(2, title='"children": [ {"kind": "t3"} ]')
+    children = feed_in_chunks(body, 5)
+    assert [child["title"] for child in children] == [
+        '"children": [ {"kind": "t3"} ]'
+    ] * 2
+
+
+def test_parser_children_marker_in_an_earlier_field() -> None:
+    body = json.dumps(
+        {
+            "kind": "Listing",
+            "data": {
+                "modhash": '"children": [1, 2]',
+                "children": [{"data": {"name": "t3_a"}}],
+            },
+        }
+    ).encode()
+    assert [child["name"] for child in feed_in_chunks(body, 3)] == ["t3_a"]
+
+
+def test_parser_empty_listing() -> None:
+    assert feed_in_chunks(listing(0), 4) == []
+
+
+def test_parser_non_json_body() -> None:
+    parser = ListingStreamParser()
+    assert (
+        parser.feed(
+            b"<html><body>Our CDN was unable to reach our servers</body></html>"
+        )
+        == []
+    )
+    assert not parser.done
+
+
+def test_parser_truncated_body() -> None:
+    body = listing(4)
+    parser = ListingStreamParser()
+    children = parser.feed(body[: len(body) * 2 // 3])
+    assert 0 < len(children) < 4
+    assert not parser.done
+
+
+class FakeTransport:
+    """
+    Hands back one canned body for any GET, a chunk at a time with a pause between when
+    streamed
+    """
+
+    def __init__(self, body: bytes, chunk: int = 1 << 20, delay: float = 0.0) -> None:
+        self.body = body
+        self.chunk = chunk
+        self.delay = delay
+        self.streams = 0
+        self.gets = 0
+
+    async def _chunks(self) -> AsyncIterator[bytes]:
+        for start in range(0, len(self.body), self.chunk):
+            await asyncio.sleep(self.delay)
+            yield self.body[start : start + self.chunk]
+
+    @asynccontextmanager
+    async def stream(self, url: str, **kwargs: Any) -> AsyncIterator[httpx.Response]:
+        self.streams += 1
+        yield httpx.Response(
+            200, content=self._chunks(), request=httpx.Request("GET", url)
+        )
+
+    async def get(self, url: str, **kwargs: Any) -> httpx.Response:
+        self.gets += 1
+        await asyncio.sleep(self.delay * 4)
+        return httpx.Response(200, content=self.body, request=httpx.Request("GET", url))
+
+
+def stream_all(handler: JSONHandler) -> List[str]:
+    async def run() -> List[str]:
+        names = []
+        async for batch in handler.astream_feed():
+            names += [post.name or "" for post in batch]
+        return names
+
+    return asyncio.run(run())
+
+
+def make_handler(monkeypatch: pytest.MonkeyPatch) -> JSONHandler:
+    handler = JSONHandler(FEED_URL, force_reload=True)
+    handler.dedup = False
+    saved: List[str] = []
+    monkeypatch.setattr(handler, "_cache_feed", lambda: saved.append("cache"))
+    monkeypatch.setattr(handler, "_store_feed", lambda: saved.append("store"))
+    monkeypatch.setattr(handler, "_index_posts", lambda posts: None)
+    handler.saved = saved  # type: ignore[attr-defined]
+    return handler
+
+
+@pytest.fixture
+def handler(monkeypatch: pytest.MonkeyPatch) -> JSONHandler:
+    return make_handler(monkeypatch)
+
+
+def fields(**extra: Any) -> Dict[str, Any]:
+    return {
+        "permalink": "/r/python/comments/x/",
+        "selftext_html": None,
+        "selftext": "",
+        "subreddit": "python",
+        **extra,
+    }
+
+
+@pytest.mark.parametrize(
+    "body",
+    [
+        b"<html><body>upstream connect error</body></html>",
+        listing(4, **fields())[:300],
+    ],
+)
+def test_stream_bad_body_raises_and_keeps_the_old_copy(
+    handler: JSONHandler, monkeypatch: pytest.MonkeyPatch, body: bytes
+) -> None:
+    monkeypatch.setattr(
+        feed_handlers, "get_async_transport", lambda: FakeTransport(body)
+    )
+    with pytest.raises(ValueError):
+        stream_all(handler)
+    assert handler.saved == []  # type: ignore[attr-defined]
+    assert handler.feed is None
+
+
+def test_stream_good_body_is_cached_and_stored(
+    handler: JSONHandler, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setattr(
+        feed_handlers,
+        "get_async_transport",
+        lambda: FakeTransport(listing(3, **fields())),
+    )
+    assert stream_all(handler) == ["t3_0", "t3_1", "t3_2"]
+    assert handler.saved == ["cache", "store"]  # type: ignore[attr-defined]
+
+
+def load_more(cached: Any) -> JSONHandler:
+    handler = JSONHandler(FEED_URL, force_reload=True, after="t3_24")
+    handler.dedup = False
+    handler.feed_cache = feed_handlers.LRUCache(max_entries=4)
+    if cached is not None:
+        handler.feed_cache.put(handler.base_url, cached)
+    handler._index_posts = lambda posts: None  # type: ignore[method-assign]
+    handler.raw_feed = listing(2, **fields()).decode()
+    handler._finish_load_more()
+    return handler
+
+
+def test_load_more_extends_the_cached_feed() -> None:
+    first_page = JSONHandler(FEED_URL, force_reload=True)
+    first_page.raw_feed = listing(1, **fields(name="t3_first")).decode()
+    handler = load_more(first_page._parse_feed())
+    assert [post.name for post in handler.feed_cache.get(handler.base_url) or []] == [
+        "t3_first",
+        "t3_0",
+        "t3_1",
+    ]
+
+
+def test_load_more_without_a_cached_first_page_caches_nothing() -> None:
+    handler = load_more(None)
+    assert handler.feed_cache.get(handler.base_url) is None
+
+
+def test_get_during_a_stream_joins_it(monkeypatch: pytest.MonkeyPatch) -> None:
+    fake = FakeTransport(listing(6, **fields()), chunk=200, delay=0.01)
+    monkeypatch.setattr(feed_handlers, "get_async_transport", lambda: fake)
+    streamer, warmer = make_handler(monkeypatch), make_handler(monkeypatch)
+
+    async def run() -> List[List[str]]:
+        streamed: List[str] = []
+        got: List[str] = []
+        async for batch in streamer.astream_feed():
+            streamed += [post.name or "" for post in batch]
+            if len(streamed) == len(batch):
+                # Warm-up asks for the same page while it's still arriving
+                got = [post.name or "" for post in await warmer.aget_feed()]
+        return [streamed, got]
+
+    streamed, got = asyncio.run(run())
+    assert streamed == got == [f"t3_{i}" for i in range(6)]
+    assert (fake.streams, fake.gets) == (1, 0)
+
+
+def test_stream_during_a_get_joins_it(monkeypatch: pytest.MonkeyPatch) -> None:
+    fake = FakeTransport(listing(3, **fields()), delay=0.01)
+    monkeypatch.setattr(feed_handlers, "get_async_transport", lambda: fake)
+    warmer, streamer = make_handler(monkeypatch), make_handler(monkeypatch)
+
+    async def run() -> List[str]:
+        warming = asyncio.ensure_future(warmer.aget_feed())
+        await asyncio.sleep(0)
+        names = [
+            post.name or "" async for batch in streamer.astream_feed() for post in batch
+        ]
+        await warming
+        return names
+
+    assert asyncio.run(run()) == ["t3_0", "t3_1", "t3_2"]
+    assert (fake.streams, fake.gets) == (0, 1)
+
+
+def legacy_parse(content: str) -> Tuple[str, Optional[str], Optional[str]]:
+    """RSSHandler before the single pass, a separate html.parser tree per field"""
+    if not content:
+        return "", None, None
+    text = BeautifulSoup(content, "html.parser").get_text(separator="\n\n")
+    text = textwrap.dedent(text.split("submitted by")[0])
+    text = "\n".join(line.rstrip() for line in text.splitlines())
+    text = re.sub(r"\n{3,}", "\n\n", text).strip()
+
+    link_tag = BeautifulSoup(content, "html.parser").find("a", string="[link]")
+    external_url = str(link_tag["href"]) if link_tag else None
+    if external_url and "reddit.com" in external_url:
+        external_url = None
+
+    img = BeautifulSoup(content, "html.parser").find("img")
+    image_url = str(img["src"]) if img and img.get("src") else None
+    return text, external_url, image_url
+
+
+SUBMITTED = (
+    "&#32; submitted by &#32;"
+    ' <a href="https://www.reddit.com/user/someone"> /u/someone </a> <br/>'
+    ' <span><a href="https://example.com/story">[link]</a></span> &#32;'
+    ' <span><a href="https://www.reddit.com/r/python/comments/abc/">'
+    "[comments]</a></span>"
+)
+ENTRIES = [
+    "",
+    "<p>Just text</p>" + SUBMITTED,
+    '<table><tr><td><a href="https://www.reddit.com/r/pics/comments/abc/">'
+    '<img src="https://i.redd.it/abc.jpg" alt="a pic" title="a pic" /></a></td>'
+    "<td>" + SUBMITTED + "</td></tr></table>",
+    '<img alt="no src" /><p>Self post</p>'
+    '<span><a href="https://www.reddit.com/r/python/">[link]</a></span>',
+    "<div>\n\n\n    indented\n\n\n\n\n   lines   \n"
+    "\t<p>tabs\tand  spaces</p>\n</div>"
+    "<pre>  keep\n    this</pre><p>&amp; entities &lt;b&gt;</p>" + SUBMITTED,
+    "<p>Unclosed <b>tags <i>everywhere</p><p>second</p>",
+]
+
+
+@pytest.mark.parametrize("content", ENTRIES)
+def test_single_parse_matches_the_old_three_parses(content: str) -> None:
+    assert parse_entry_content(content) == legacy_parse(content)
+
+
+def test_rss_entries_default_to_html_parser(monkeypatch: pytest.MonkeyPatch) -> None:
+    parsers: List[str] = []
+    real = feed_handlers.parse_entry_content
+
+    def recording(content: str, parser: str) -> Tuple[str, Optional[str], Any]:
+        parsers.append(parser)
+        return real(content, parser)
+
+    monkeypatch.setattr(feed_handlers, "parse_entry_content", recording)
+    handler = RSSHandler("https://www.reddit.com/r/python/.rss")
+    config = RSSConfig()
+    monkeypatch.setattr(feed_handlers, "read_rss_config_from_yaml", lambda path: config)
+
+    handler._parse_contents(ENTRIES[1:3])
+    config.html_parser = "not_a_parser_module"
+    handler._parse_contents(ENTRIES[1:2])
+
+    assert parsers == ["html.parser"] * 3
@@ -0,0 +1,126 @@
+import asyncio
+from typing import Any
+from typing import Dict
+from typing import List
+from typing import Optional
+
+import httpx
+import pytest
+
+from reddit_cli import feed_handlers
+from reddit_cli.app import RedditCLIApp
+from reddit_cli.common import Feed
+from reddit_cli.common import RedditPost
+from reddit_cli.common import WarmupConfig
+from reddit_cli.feed_store import StoredFeed
+from reddit_cli.scheduler import Priority
+from reddit_cli.states import feed_list_state
+from reddit_cli.states.feed_list_state import FeedListState
+
+FEEDS = [
+    Feed("fetched", "https://www.reddit.com/r/a/.json"),
+    Feed("stored", "https://www.reddit.com/r/b/.json"),
+    Feed("in memory", "https://www.reddit.com/r/c/.json"),
+    Feed("broken", "https://www.reddit.com/r/d/.json"),
+    Feed("slow", "https://www.reddit.com/r/e/.rss"),
+]
+
+
+def posts(count: int) -> List[RedditPost]:
+    return [
+        RedditPost(f"post {i}", f"https://reddit.com/{i}", "a", "", name=f"t3_{i}")
+        for i in range(count)
+    ]
+
+
+class Warmer:
+    """Hands out fake handlers and keeps track of how many fetches overlap"""
+
+    def __init__(self) -> None:
+        self.in_flight = 0
+        self.most_in_flight = 0
+        self.fetched: List[str] = []
+        self.priorities: Dict[str, Any] = {}
+
+    def handler_for_feed(self, feed: Feed, **kwargs: Any) -> "FakeHandler":
+        self.priorities[feed.name] = kwargs.get("priority")
+        return FakeHandler(self, feed)
+
+
+class FakeHandler:
+    def __init__(self, warmer: Warmer, feed: Feed) -> None:
+        self.warmer = warmer
+        self.name = feed.name
+        self.feed: Optional[List[RedditPost]] = (
+            posts(7) if feed.name == "in memory" else None
+        )
+        self.cached: Optional[StoredFeed] = None
+
+    async def aget_stored_feed(self) -> Optional[StoredFeed]:
+        if self.name == "stored":
+            return StoredFeed(posts(3), etag=None, last_modified=None, fetched_at=1e12)
+        return None
+
+    def cache_stored_feed(self, stored: StoredFeed) -> None:
+        self.cached = stored
+
+    async def aget_feed(self) -> List[RedditPost]:
+        self.warmer.in_flight += 1
+        self.warmer.most_in_flight = max(
+            self.warmer.most_in_flight, self.warmer.in_flight
+        )
+        try:
+            await asyncio.sleep(0.05)
+            if self.name == "broken":
+                raise httpx.ConnectError("no route to reddit")
+            self.warmer.fetched.append(self.name)
+            return posts(25)
+        finally:
+            self.warmer.in_flight -= 1
+
+
+def run_warmup(
+    monkeypatch: pytest.MonkeyPatch, config: WarmupConfig, warmer: Warmer
+) -> List[str]:
+    monkeypatch.setattr(feed_list_state, "read_feeds_from_yaml", lambda path: FEEDS)
+    monkeypatch.setattr(
+        feed_list_state, "read_warmup_config_from_yaml", lambda path: config
+    )
+    monkeypatch.setattr(feed_handlers, "handler_for_feed", warmer.handler_for_feed)
+
+    async def main() -> List[str]:
+        app = RedditCLIApp()
+        async with app.run_test(size=(100, 40)) as pilot:
+            await pilot.pause(0.3)
+            state = app.stack.current
+            assert isinstance(state, FeedListState)
+            return state.iterable_items[: len(FEEDS)]
+
+    return asyncio.run(main())
+
+
+def test_warmup_fetches_every_feed_with_a_status(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    warmer = Warmer()
+    items = run_warmup(monkeypatch, WarmupConfig(enabled=True, concurrency=2), warmer)
+
+    assert items == [
+        "fetched [dim](25 posts)[/dim]",
+        "stored [dim](cached, 3 posts)[/dim]",
+        "in memory [dim](cached, 7 posts)[/dim]",
+        "broken [dim](error)[/dim]",
+        "slow [dim](25 posts)[/dim]",
+    ]
+    # Only the feeds without a usable copy go to reddit, two at a time
+    assert sorted(warmer.fetched) == ["fetched", "slow"]
+    assert warmer.most_in_flight == 2
+    assert set(warmer.priorities.values()) == {Priority.BACKGROUND}
+
+
+def test_warmup_is_off_by_default(monkeypatch: pytest.MonkeyPatch) -> None:
+    warmer = Warmer()
+    items = run_warmup(monkeypatch, WarmupConfig(), warmer)
+
+    assert items == [feed.name for feed in FEEDS]
+    assert warmer.priorities == {}
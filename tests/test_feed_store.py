@@ -0,0 +1,113 @@
+import sqlite3
+import time
+from pathlib import Path
+from typing import List
+
+import pytest
+
+from reddit_cli import feed_store
+from reddit_cli.common import RedditPost
+from reddit_cli.devserver import RedditStandIn
+from reddit_cli.feed_handlers import JSONHandler
+from reddit_cli.feed_store import FeedStore
+from reddit_cli.feed_store import get_feed_store
+
+FEED_URL = "https://www.reddit.com/r/python/.json"
+
+
+def posts(count: int, body: str = "") -> List[RedditPost]:
+    return [
+        RedditPost(
+            f"post {i}",
+            f"https://reddit.com/{i}",
+            "python",
+            f"<p>{body}{i}</p>",
+            f"{body}{i}",
+            external_url=f"https://example.com/{i}" if i % 2 else None,
+            image_url=None,
+            name=f"t3_{i}",
+        )
+        for i in range(count)
+    ]
+
+
+@pytest.fixture
+def store(tmp_path: Path) -> FeedStore:
+    return FeedStore(str(tmp_path / "nested" / "feeds.sqlite3"))
+
+
+def test_save_then_load_keeps_the_posts_in_order(store: FeedStore) -> None:
+    saved = posts(3) + posts(1, body="long " * 100)
+    store.save(FEED_URL, saved, etag='"abc"', last_modified="Sat, 17 Oct 2026")
+
+    loaded = store.load(FEED_URL)
+
+    assert loaded is not None
+    assert loaded.posts == saved
+    assert (loaded.etag, loaded.last_modified) == ('"abc"', "Sat, 17 Oct 2026")
+    assert loaded.is_fresh(60) and not loaded.is_fresh(0)
+    assert store.load("https://www.reddit.com/r/linux/.json") is None
+
+
+def test_saving_again_replaces_the_posts(store: FeedStore) -> None:
+    store.save(FEED_URL, posts(5), etag='"old"')
+    store.save(FEED_URL, posts(2))
+
+    loaded = store.load(FEED_URL)
+    assert loaded is not None
+    assert [post.name for post in loaded.posts] == ["t3_0", "t3_1"]
+    assert loaded.etag is None
+
+
+def test_touch_only_moves_the_fetch_time(
+    store: FeedStore, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setattr(time, "time", lambda: 1000.0)
+    store.save(FEED_URL, posts(2), etag='"abc"')
+    monkeypatch.setattr(time, "time", lambda: 2000.0)
+    store.touch(FEED_URL)
+
+    loaded = store.load(FEED_URL)
+    assert loaded is not None
+    assert (loaded.fetched_at, loaded.etag, len(loaded.posts)) == (2000.0, '"abc"', 2)
+
+
+def test_an_old_schema_is_dropped(tmp_path: Path) -> None:
+    path = tmp_path / "feeds.sqlite3"
+    with sqlite3.connect(path) as conn:
+        conn.execute("CREATE TABLE feeds (base_url TEXT PRIMARY KEY)")
+        conn.execute("PRAGMA user_version = 1")
+    conn.close()
+
+    store = FeedStore(str(path))
+    store.save(FEED_URL, posts(1))
+    assert store.load(FEED_URL) is not None
+    store.close()
+
+
+def test_an_unusable_cache_dir_means_no_store(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    # A file where the cache dir should be
+    (tmp_path / "cache").write_text("")
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path / "cache"))
+    monkeypatch.setattr(feed_store, "_store", None)
+    monkeypatch.setattr(feed_store, "_store_failed", False)
+
+    assert get_feed_store() is None
+    assert feed_store._store_failed
+
+
+def test_a_stored_feed_revalidates_to_a_304(
+    cache_dir: Path, standin: RedditStandIn
+) -> None:
+    fetched = JSONHandler(FEED_URL).get_feed()
+    stored = JSONHandler(FEED_URL).get_stored_feed()
+    assert stored is not None and stored.etag is not None
+    assert stored.posts == fetched
+
+    stored.fetched_at = 0
+    assert JSONHandler(FEED_URL).revalidate_feed(stored) is None
+    # Reddit said it's current, so the stored copy is fresh again
+    again = JSONHandler(FEED_URL).get_stored_feed()
+    assert again is not None and again.is_fresh(60)
@@ -0,0 +1,73 @@
+import os
+from pathlib import Path
+
+import pytest
+
+from reddit_cli.cache import LRUCache
+from reddit_cli.image_cache import DiskImageCache
+from reddit_cli.image_cache import ImageCache
+
+
+def url(n: int) -> str:
+    return f"https://i.redd.it/{n}.png"
+
+
+def test_evicts_least_recently_used_without_rescanning(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    cache = DiskImageCache(str(tmp_path), max_bytes=300)
+    monkeypatch.setattr(cache, "_scan", lambda: pytest.fail("rescanned the cache dir"))
+    for n in range(3):
+        cache.put(url(n), b"x" * 100)
+    assert cache.get(url(0)) is not None
+
+    cache.put(url(3), b"x" * 100)
+
+    assert cache.get(url(1)) is None
+    assert [cache.get(url(n)) is not None for n in (0, 2, 3)] == [True, True, True]
+    assert cache._bytes == 300
+
+
+def test_overwrite_counts_the_new_size(tmp_path: Path) -> None:
+    cache = DiskImageCache(str(tmp_path), max_bytes=1000)
+    cache.put(url(0), b"x" * 100)
+    cache.put(url(0), b"x" * 40)
+    assert cache._bytes == 40
+
+
+def test_reopening_keeps_the_order_from_mtimes(tmp_path: Path) -> None:
+    cache = DiskImageCache(str(tmp_path), max_bytes=300)
+    for n in range(3):
+        cache.put(url(n), b"x" * 100)
+    # Oldest first by mtime, url 0 was read last so it should outlive the others
+    for age, n in enumerate((1, 2, 0)):
+        path = cache._path(url(n))
+        os.utime(path, (1000 + age, 1000 + age))
+
+    reopened = DiskImageCache(str(tmp_path), max_bytes=300)
+    assert reopened._bytes == 300
+    reopened.put(url(3), b"x" * 100)
+    assert reopened.get(url(1)) is None
+    assert reopened.get(url(0)) is not None
+
+
+def test_missing_file_is_dropped_from_the_count(tmp_path: Path) -> None:
+    cache = DiskImageCache(str(tmp_path), max_bytes=200)
+    cache.put(url(0), b"x" * 100)
+    os.remove(cache._path(url(0)))
+    cache.put(url(1), b"x" * 100)
+    cache.put(url(2), b"x" * 100)
+    assert cache._bytes == 200
+    assert cache.get(url(2)) is not None
+
+
+def test_membership_doesnt_count_or_promote(tmp_path: Path) -> None:
+    disk = DiskImageCache(str(tmp_path), max_bytes=1000)
+    disk.put(url(0), b"x" * 100)
+    cache = ImageCache(LRUCache(max_entries=8), disk)
+
+    assert url(0) in cache
+    assert url(1) not in cache
+    assert url(0) not in cache.memory
+    stats = cache.memory.stats
+    assert (stats.hits, stats.misses) == (0, 0)
@@ -0,0 +1,124 @@
+import asyncio
+import logging
+from contextlib import asynccontextmanager
+from typing import Any
+from typing import AsyncIterator
+
+import httpx
+import pytest
+
+from reddit_cli import image_cache
+from reddit_cli import transport
+from reddit_cli.cache import LRUCache
+from reddit_cli.image_cache import ImageCache
+from reddit_cli.utils import afetch_image_bytes
+from reddit_cli.utils import aprefetch_image_bytes
+from reddit_cli.utils import fetch_image_bytes
+
+URL = "https://i.redd.it/abc.png"
+IMAGE = b"\x89PNG" + b"x" * 4096
+
+
+class FakeTransport:
+    def __init__(self) -> None:
+        self.streams = 0
+        self.gets = 0
+
+    async def _chunks(self) -> AsyncIterator[bytes]:
+        for start in range(0, len(IMAGE), 1024):
+            await asyncio.sleep(0.01)
+            yield IMAGE[start : start + 1024]
+
+    @asynccontextmanager
+    async def stream(self, url: str, **kwargs: Any) -> AsyncIterator[httpx.Response]:
+        self.streams += 1
+        yield httpx.Response(
+            200, content=self._chunks(), request=httpx.Request("GET", url)
+        )
+
+    async def get(self, url: str, **kwargs: Any) -> httpx.Response:
+        self.gets += 1
+        return httpx.Response(200, content=IMAGE, request=httpx.Request("GET", url))
+
+
+@pytest.fixture
+def cache() -> ImageCache:
+    return ImageCache(LRUCache(max_entries=8), disk=None)
+
+
+@pytest.fixture
+def fake(monkeypatch: pytest.MonkeyPatch, cache: ImageCache) -> FakeTransport:
+    fake = FakeTransport()
+    monkeypatch.setattr(transport, "get_async_transport", lambda: fake)
+    monkeypatch.setattr(image_cache, "_image_cache", cache)
+    return fake
+
+
+def test_open_joins_a_prefetch_in_flight(fake: FakeTransport) -> None:
+    async def run() -> bytes | None:
+        prefetch = asyncio.ensure_future(aprefetch_image_bytes(URL, max_bytes=1 << 20))
+        await asyncio.sleep(0.015)
+        opened = await afetch_image_bytes(URL)
+        await prefetch
+        return opened.getvalue() if opened is not None else None
+
+    assert asyncio.run(run()) == IMAGE
+    assert (fake.streams, fake.gets) == (1, 0)
+
+
+def test_open_keeps_a_prefetch_alive_when_the_cursor_moves_on(
+    fake: FakeTransport,
+) -> None:
+    async def run() -> bytes | None:
+        prefetch = asyncio.ensure_future(aprefetch_image_bytes(URL, max_bytes=1 << 20))
+        await asyncio.sleep(0.015)
+        opening = asyncio.ensure_future(afetch_image_bytes(URL))
+        await asyncio.sleep(0)
+        prefetch.cancel()
+        opened = await opening
+        return opened.getvalue() if opened is not None else None
+
+    assert asyncio.run(run()) == IMAGE
+    assert (fake.streams, fake.gets) == (1, 0)
+
+
+def test_open_fetches_an_image_the_prefetch_gave_up_on(fake: FakeTransport) -> None:
+    async def run() -> bytes | None:
+        prefetch = asyncio.ensure_future(aprefetch_image_bytes(URL, max_bytes=100))
+        await asyncio.sleep(0)
+        opened = await afetch_image_bytes(URL)
+        await prefetch
+        return opened.getvalue() if opened is not None else None
+
+    assert asyncio.run(run()) == IMAGE
+    assert (fake.streams, fake.gets) == (1, 1)
+
+
+def test_prefetching_a_cached_image_leaves_the_hit_rate_alone(
+    fake: FakeTransport, cache: ImageCache
+) -> None:
+    cache.put(URL, IMAGE)
+
+    assert asyncio.run(aprefetch_image_bytes(URL, max_bytes=1 << 20)) == 0
+    stats = cache.memory.stats
+    assert (stats.hits, stats.misses) == (0, 0)
+    assert (fake.streams, fake.gets) == (0, 0)
+
+
+def test_failed_fetch_is_logged(
+    monkeypatch: pytest.MonkeyPatch,
+    cache: ImageCache,
+    caplog: pytest.LogCaptureFixture,
+    capsys: pytest.CaptureFixture[str],
+) -> None:
+    class Broken:
+        def get(self, url: str) -> httpx.Response:
+            raise httpx.ConnectError("refused")
+
+    monkeypatch.setattr(image_cache, "_image_cache", cache)
+    monkeypatch.setattr(transport, "get_transport", lambda: Broken())
+
+    with caplog.at_level(logging.ERROR):
+        assert fetch_image_bytes(URL) is None
+    assert "Failed to fetch image: refused" in caplog.text
+    assert capsys.readouterr().out == ""
@@ -0,0 +1,102 @@
+import asyncio
+from io import BytesIO
+from typing import Any
+from typing import List
+from typing import Tuple
+
+import pytest
+from PIL import Image
+
+from reddit_cli import image_scale
+from reddit_cli.cache import LRUCache
+from reddit_cli.image_scale import FALLBACK_CELL_SIZE
+from reddit_cli.image_scale import ImageScaler
+from reddit_cli.image_scale import _image_bytes
+from reddit_cli.image_scale import cell_size
+from reddit_cli.image_scale import downscale
+from reddit_cli.image_scale import target_size
+
+
+def encode(image: Image.Image, format: str = "PNG", **params: Any) -> bytes:
+    buffer = BytesIO()
+    image.save(buffer, format=format, **params)
+    return buffer.getvalue()
+
+
+def test_target_size_is_cells_times_pixels_per_cell(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    monkeypatch.setattr(image_scale, "cell_size", lambda: (8, 16))
+    assert target_size(80, 20) == (640, 320)
+    assert target_size(0, -1) == (8, 16)
+
+
+def test_cell_size_falls_back_when_the_terminal_wont_say(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    from textual_image import _terminal
+
+    def no_terminal() -> None:
+        raise OSError("stdout is not a terminal")
+
+    monkeypatch.setattr(_terminal, "get_cell_size", no_terminal)
+    assert cell_size() == FALLBACK_CELL_SIZE
+
+
+def test_downscale_keeps_the_aspect_ratio_and_never_scales_up() -> None:
+    wide = encode(Image.new("RGB", (1000, 500), "red"))
+    assert downscale(wide, (200, 200)).size == (200, 100)
+
+    small = encode(Image.new("RGB", (50, 40), "red"))
+    assert downscale(small, (200, 200)).size == (50, 40)
+
+
+def test_downscale_decodes_jpegs_to_a_fraction() -> None:
+    photo = encode(Image.new("RGB", (2000, 1000), "blue"), "JPEG", quality=80)
+    image = downscale(photo, (100, 100))
+    assert (image.size, image.mode) == ((100, 50), "RGB")
+
+
+@pytest.mark.parametrize(
+    "mode, expected",
+    [("L", "RGB"), ("LA", "RGBA"), ("P", "RGB"), ("RGBA", "RGBA")],
+)
+def test_downscale_hands_back_rgb_or_rgba(mode: str, expected: str) -> None:
+    image = downscale(encode(Image.new(mode, (40, 40))), (20, 20))
+    assert image.mode == expected
+    assert _image_bytes(image) == 20 * 20 * len(expected)
+
+
+def test_palette_transparency_keeps_an_alpha_channel() -> None:
+    image = Image.new("P", (40, 40))
+    data = encode(image, transparency=0)
+    assert downscale(data, (20, 20)).mode == "RGBA"
+
+
+def test_scaled_images_are_kept_per_url_and_size(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    decoded: List[Tuple[int, int]] = []
+    real_downscale = image_scale.downscale
+
+    def counting(data: bytes, size: Tuple[int, int]) -> Image.Image:
+        decoded.append(size)
+        return real_downscale(data, size)
+
+    monkeypatch.setattr(image_scale, "downscale", counting)
+    monkeypatch.setattr(image_scale, "cell_size", lambda: (10, 20))
+    scaler = ImageScaler(LRUCache(max_entries=8))
+    data = encode(Image.new("RGB", (1000, 1000), "green"))
+
+    async def main() -> List[Tuple[int, int]]:
+        sizes = [
+            (await scaler.scale("https://i.redd.it/a.png", data, 20, 10)).size,
+            (await scaler.scale("https://i.redd.it/a.png", data, 20, 10)).size,
+            # The terminal was resized
+            (await scaler.scale("https://i.redd.it/a.png", data, 10, 10)).size,
+        ]
+        scaler.executor.shutdown()
+        return sizes
+
+    assert asyncio.run(main()) == [(200, 200), (200, 200), (100, 100)]
+    assert decoded == [(200, 200), (100, 200)]
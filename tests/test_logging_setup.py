@@ -0,0 +1,89 @@
+import json
+import logging
+from pathlib import Path
+from typing import Any
+from typing import Dict
+from typing import Iterator
+from typing import List
+
+import pytest
+
+from reddit_cli import logging_setup
+from reddit_cli.common import LogConfig
+from reddit_cli.logging_setup import setup_logging
+from reddit_cli.logging_setup import stop_logging
+
+
+@pytest.fixture
+def log_path(tmp_path: Path) -> Iterator[Path]:
+    root = logging.getLogger()
+    level = root.level
+    yield tmp_path / "app.log"
+    stop_logging()
+    root.setLevel(level)
+
+
+def json_lines(path: Path) -> List[Dict[str, Any]]:
+    return [json.loads(line) for line in path.read_text("utf-8").splitlines()]
+
+
+def test_json_lines_carry_request_fields_and_tracebacks(log_path: Path) -> None:
+    setup_logging(LogConfig(path=str(log_path), json=True, level="info"))
+    logger = logging.getLogger("reddit_cli.test")
+    logger.debug("below the level")
+    logger.info(
+        "GET %s", "/r/python", extra={"url": "/r/python", "status": 200, "bytes": 12}
+    )
+    try:
+        1 / 0
+    except ZeroDivisionError:
+        logger.exception("it broke")
+    stop_logging()
+
+    request, error = json_lines(log_path)
+    assert set(request) == {
+        "time",
+        "level",
+        "logger",
+        "message",
+        "url",
+        "status",
+        "bytes",
+    }
+    assert (request["level"], request["logger"]) == ("INFO", "reddit_cli.test")
+    assert (request["message"], request["status"]) == ("GET /r/python", 200)
+    # The traceback gets a key of its own rather than riding along in the message
+    assert error["message"] == "it broke"
+    assert error["exc"].startswith("Traceback")
+    assert "ZeroDivisionError" in error["exc"]
+
+
+def test_text_lines_keep_the_traceback_underneath(log_path: Path) -> None:
+    setup_logging(LogConfig(path=str(log_path)))
+    try:
+        raise KeyError("missing")
+    except KeyError:
+        logging.getLogger("reddit_cli.test").exception("it broke")
+    stop_logging()
+
+    first, *rest = log_path.read_text("utf-8").splitlines()
+    assert first.endswith("| ERROR    | reddit_cli.test | it broke")
+    assert rest[0] == "Traceback (most recent call last):"
+    assert rest[-1] == "KeyError: 'missing'"
+
+
+def test_stopping_flushes_the_queue(log_path: Path) -> None:
+    setup_logging(LogConfig(path=str(log_path), json=True))
+    for n in range(500):
+        logging.getLogger("reddit_cli.test").info("line %d", n)
+    stop_logging()
+
+    assert [entry["message"] for entry in json_lines(log_path)] == [
+        f"line {n}" for n in range(500)
+    ]
+    # Nothing is left listening or queueing, so logging can be set up again
+    assert logging_setup._listener is None
+    assert not any(
+        isinstance(handler, logging_setup._QueueHandler)
+        for handler in logging.getLogger().handlers
+    )
@@ -0,0 +1,83 @@
+import asyncio
+import json
+from pathlib import Path
+
+import pytest
+
+from reddit_cli import perf
+from reddit_cli.app import RedditCLIApp
+from reddit_cli.common import PerfConfig
+from reddit_cli.perf import PerfRecorder
+from reddit_cli.perf import RollingHistogram
+
+
+def test_histogram_percentiles_over_a_rolling_window() -> None:
+    histogram = RollingHistogram(window=100)
+    for ms in range(1, 101):
+        histogram.add(float(ms))
+    summary = histogram.summary("parse")
+    assert (summary.p50_ms, summary.p95_ms, summary.max_ms) == (51.0, 96.0, 100.0)
+
+    for _ in range(100):
+        histogram.add(1.0)
+    # The old timings have rolled out but still count
+    summary = histogram.summary("parse")
+    assert (summary.count, summary.last_ms, summary.max_ms) == (200, 1.0, 1.0)
+    assert RollingHistogram(window=5).summary("empty").p95_ms == 0.0
+
+
+def test_spans_keep_their_fields_and_time_failures_too() -> None:
+    recorder = PerfRecorder(PerfConfig(window=8))
+    with recorder.span("fetch", feed="python") as fields:
+        fields["posts"] = 25
+    with pytest.raises(ValueError):
+        with recorder.span("parse"):
+            raise ValueError("bad body")
+
+    assert [(s.name, s.count) for s in recorder.summaries()] == [
+        ("fetch", 1),
+        ("parse", 1),
+    ]
+    fetch = recorder._spans[0].to_dict()
+    assert (fetch["feed"], fetch["posts"]) == ("python", 25)
+    assert fetch["ms"] >= 0
+
+
+def test_disabled_records_nothing() -> None:
+    recorder = PerfRecorder(PerfConfig(enabled=False))
+    with recorder.span("fetch"):
+        pass
+    recorder.record("paint", recorder.now())
+    assert recorder.summaries() == []
+
+
+def test_export_writes_the_newest_spans_as_json_lines(tmp_path: Path) -> None:
+    recorder = PerfRecorder(PerfConfig(max_spans=3))
+    for n in range(5):
+        recorder.record("paint", recorder.now(), frame=n)
+
+    path = recorder.export(str(tmp_path / "out" / "spans.jsonl"))
+
+    lines = [json.loads(line) for line in Path(path).read_text().splitlines()]
+    assert [line["frame"] for line in lines] == [2, 3, 4]
+    assert set(lines[0]) == {"name", "start", "ms", "frame"}
+
+
+def test_overlay_shows_the_timed_spans(monkeypatch: pytest.MonkeyPatch) -> None:
+    recorder = PerfRecorder(PerfConfig())
+    recorder.record("render", recorder.now())
+    monkeypatch.setattr(perf, "_perf", recorder)
+
+    async def main() -> None:
+        app = RedditCLIApp()
+        async with app.run_test(size=(120, 40)) as pilot:
+            await pilot.pause()
+            await pilot.press("f12")
+            overlay = app.stack.overlay
+            assert overlay is not None and overlay.display
+            text = str(overlay.render())
+            assert "render" in text and "feed cache" in text
+            await pilot.press("f12")
+            assert not overlay.display
+
+    asyncio.run(main())
@@ -0,0 +1,215 @@
+import asyncio
+from typing import Any
+from typing import AsyncIterator
+from typing import Callable
+from typing import List
+from typing import Optional
+
+import httpx
+import pytest
+from textual.widgets import Static
+
+from reddit_cli.app import RedditCLIApp
+from reddit_cli.common import Feed
+from reddit_cli.common import PaginationConfig
+from reddit_cli.common import RedditPost
+from reddit_cli.feed_store import StoredFeed
+from reddit_cli.states import post_list_state
+from reddit_cli.states.post_list_state import PostListState
+
+FEED = Feed("python", "https://www.reddit.com/r/python/.json")
+
+
+def posts(start: int, count: int) -> List[RedditPost]:
+    return [
+        RedditPost(f"post {i}", f"https://reddit.com/{i}", "python", "", name=f"t3_{i}")
+        for i in range(start, start + count)
+    ]
+
+
+class FakeHandler:
+    """Serves whatever the harness says for the first page and each 'after'"""
+
+    def __init__(self, harness: "Harness", after: Optional[str]) -> None:
+        self.harness = harness
+        self.after = after
+        self.feed: Optional[List[RedditPost]] = None
+        self.next_after: Optional[str] = None
+        self.priority: Any = None
+
+    async def aget_stored_feed(self) -> Optional[StoredFeed]:
+        return self.harness.stored
+
+    def cache_stored_feed(self, stored: StoredFeed) -> None:
+        pass
+
+    async def arevalidate_feed(self, stored: StoredFeed) -> List[RedditPost]:
+        await asyncio.sleep(0)
+        return self.harness.revalidate()
+
+    async def astream_feed(self) -> AsyncIterator[List[RedditPost]]:
+        await asyncio.sleep(0)
+        page = self.harness.first_page()
+        self.next_after = page[-1].name
+        yield page
+
+    async def aload_more_posts(self) -> List[RedditPost]:
+        await asyncio.sleep(0)
+        new_posts = self.harness.load_more(self.after)
+        # Reddit's cursor moves on even when every post on the page was a repeat
+        self.next_after = f"{self.after}x"
+        return new_posts
+
+
+class Harness:
+    def __init__(self, monkeypatch: pytest.MonkeyPatch, auto: bool = False) -> None:
+        self.afters: List[Optional[str]] = []
+        self.stored: Optional[StoredFeed] = None
+        self.first_page: Callable[[], List[RedditPost]] = lambda: posts(0, 5)
+        self.revalidate: Callable[[], List[RedditPost]] = lambda: posts(0, 5)
+        self.load_more: Callable[[Optional[str]], List[RedditPost]] = lambda after: []
+
+        def handler_for_feed(
+            feed: Feed, after: Optional[str] = None, **kwargs: Any
+        ) -> FakeHandler:
+            if after is not None:
+                self.afters.append(after)
+            return FakeHandler(self, after)
+
+        monkeypatch.setattr(post_list_state, "handler_for_feed", handler_for_feed)
+        monkeypatch.setattr(
+            post_list_state,
+            "read_pagination_config_from_yaml",
+            lambda path: PaginationConfig(auto=auto, look_ahead=10, page_size=5),
+        )
+
+    def run(self, body: Callable[[RedditCLIApp, PostListState], Any]) -> None:
+        async def main() -> None:
+            app = RedditCLIApp()
+            async with app.run_test(size=(100, 20)) as pilot:
+                await pilot.pause()
+                state = PostListState(app.stack, FEED)
+                app.stack.push(state)
+                await pilot.pause(0.1)
+                await body(app, state)
+
+        asyncio.run(main())
+
+
+def error_text(state: PostListState) -> Optional[str]:
+    error = state.query(".error-message")
+    return str(error.first(Static).render()) if error else None
+
+
+def raise_timeout(*args: Any) -> List[RedditPost]:
+    raise httpx.ReadTimeout("timed out")
+
+
+def raise_bad_body(*args: Any) -> List[RedditPost]:
+    raise ValueError("not a listing")
+
+
+@pytest.mark.parametrize("failure", [raise_timeout, raise_bad_body])
+def test_load_more_failure_is_shown(
+    monkeypatch: pytest.MonkeyPatch, failure: Callable[[Optional[str]], Any]
+) -> None:
+    harness = Harness(monkeypatch)
+    harness.load_more = failure
+
+    async def body(app: RedditCLIApp, state: PostListState) -> None:
+        state.cursor = len(state.iterable_items) - 1
+        state.handle_input("ctrl+l")
+        assert state.loading
+        await asyncio.sleep(0.05)
+        assert not state.loading
+        assert error_text(state) is not None
+        assert len(state.posts) == 5
+
+    harness.run(body)
+
+
+def test_load_more_error_from_a_replaced_listing_is_dropped(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    harness = Harness(monkeypatch)
+    harness.load_more = raise_timeout
+
+    async def body(app: RedditCLIApp, state: PostListState) -> None:
+        task = state.spawn(state._load_more_posts())
+        await asyncio.sleep(0)
+        # A refresh lands while the page is in flight
+        state.generation += 1
+        await task
+        assert error_text(state) is None
+
+    harness.run(body)
+
+
+def test_load_more_pages_on_from_reddits_cursor(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    harness = Harness(monkeypatch)
+    harness.load_more = lambda after: posts(5, 5)
+
+    async def body(app: RedditCLIApp, state: PostListState) -> None:
+        await state.spawn(state._load_more_posts())
+        assert harness.afters == ["t3_4"]
+        assert len(state.posts) == 10
+        # From the cursor reddit sent back, not the last post kept
+        assert state.after == "t3_4x"
+
+    harness.run(body)
+
+
+def test_all_repeat_pages_stop_auto_paging(monkeypatch: pytest.MonkeyPatch) -> None:
+    harness = Harness(monkeypatch, auto=True)
+
+    async def body(app: RedditCLIApp, state: PostListState) -> None:
+        # The first page is short enough that the cursor is already within look_ahead
+        await asyncio.sleep(0.1)
+        assert len(harness.afters) == PostListState.MAX_EMPTY_PAGES
+        assert not state.auto_paging
+        assert not state.loading
+
+        # Asking for more still goes to reddit, a page with posts turns paging back on
+        harness.load_more = lambda after: posts(5, 5) if len(harness.afters) < 5 else []
+        state.cursor = len(state.iterable_items) - 1
+        state.handle_input("ctrl+l")
+        await asyncio.sleep(0.1)
+        assert len(state.posts) == 10
+        assert len(harness.afters) == 2 * PostListState.MAX_EMPTY_PAGES + 1
+        assert not state.auto_paging
+
+    harness.run(body)
+
+
+def test_first_page_transport_error_is_shown(monkeypatch: pytest.MonkeyPatch) -> None:
+    harness = Harness(monkeypatch)
+    harness.first_page = raise_timeout
+
+    async def body(app: RedditCLIApp, state: PostListState) -> None:
+        assert not state.loading
+        assert "Couldn't get through to reddit" in (error_text(state) or "")
+
+    harness.run(body)
+
+
+@pytest.mark.parametrize("failure", [raise_timeout, raise_bad_body])
+def test_failed_revalidation_keeps_the_stored_copy(
+    monkeypatch: pytest.MonkeyPatch,
+    caplog: pytest.LogCaptureFixture,
+    failure: Callable[[], Any],
+) -> None:
+    harness = Harness(monkeypatch)
+    harness.stored = StoredFeed(
+        posts(0, 3), etag='"a"', last_modified=None, fetched_at=0
+    )
+    harness.revalidate = failure
+
+    async def body(app: RedditCLIApp, state: PostListState) -> None:
+        assert [post.name for post in state.posts] == ["t3_0", "t3_1", "t3_2"]
+        assert error_text(state) is None
+        assert "Revalidating" in caplog.text
+        assert "Task in PostListState failed" not in caplog.text
+
+    harness.run(body)
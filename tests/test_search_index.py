@@ -0,0 +1,152 @@
+import sqlite3
+from pathlib import Path
+from typing import Iterator
+from typing import List
+
+import pytest
+
+from reddit_cli import search_index
+from reddit_cli.common import RedditPost
+from reddit_cli.search_index import SearchIndex
+
+PYTHON = "https://www.reddit.com/r/python/.json"
+LINUX = "https://www.reddit.com/r/linux/.json"
+
+
+def post(n: int, title: str, body: str = "", subreddit: str = "python") -> RedditPost:
+    return RedditPost(
+        title,
+        f"https://www.reddit.com/r/{subreddit}/comments/{n}/",
+        subreddit,
+        None,
+        content_clean=body,
+        name=f"t3_{n}",
+    )
+
+
+@pytest.fixture(params=["fts", "like"])
+def index(
+    request: pytest.FixtureRequest, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> Iterator[SearchIndex]:
+    if request.param == "like":
+        # As if sqlite was built without FTS5
+        monkeypatch.setattr(
+            search_index,
+            "FTS_SCHEMA",
+            "CREATE VIRTUAL TABLE posts_fts USING no_such_module(title);",
+        )
+    index = SearchIndex(str(tmp_path / "search.sqlite3"))
+    assert index.has_fts == (request.param == "fts")
+    yield index
+    index.close()
+
+
+def titles(index: SearchIndex, query: str, **kwargs: str) -> List[str]:
+    return sorted(result.post.title for result in index.search(query, **kwargs))
+
+
+def test_matches_title_subreddit_and_body(index: SearchIndex) -> None:
+    index.add(
+        PYTHON,
+        [
+            post(1, "Async parser", "streams json"),
+            post(2, "Terminal images", "sixel and kitty"),
+        ],
+    )
+    index.add(LINUX, [post(3, "Kernel release", subreddit="linux")])
+
+    assert titles(index, "parser") == ["Async parser"]
+    assert titles(index, "KITTY") == ["Terminal images"]
+    assert titles(index, "linux") == ["Kernel release"]
+    # Every word has to match
+    assert titles(index, "async images") == []
+    assert titles(index, "  ") == []
+
+
+def test_last_word_matches_as_a_prefix(index: SearchIndex) -> None:
+    index.add(PYTHON, [post(1, "Terminal images"), post(2, "Term limits")])
+    assert titles(index, "term") == ["Term limits", "Terminal images"]
+    assert titles(index, "termi") == ["Terminal images"]
+
+
+def test_feed_filter_and_cross_feed_repeats(index: SearchIndex) -> None:
+    shared = post(1, "Python release", "news")
+    index.add(PYTHON, [shared, post(2, "Python tips")])
+    index.add(LINUX, [shared])
+
+    assert titles(index, "python", feed=LINUX) == ["Python release"]
+    # Shown by two feeds but only listed once
+    assert titles(index, "python") == ["Python release", "Python tips"]
+
+
+def test_results_come_back_as_posts(index: SearchIndex) -> None:
+    original = post(1, "Async parser", "streams json")
+    index.add(PYTHON, [original])
+    (result,) = index.search("parser")
+    assert result.feed == PYTHON
+    assert (result.post.name, result.post.post_url) == (
+        original.name,
+        original.post_url,
+    )
+    assert result.post.content_clean == "streams json"
+
+
+def test_re_adding_updates_in_place(index: SearchIndex) -> None:
+    index.add(PYTHON, [post(1, "Old title")])
+    index.add(PYTHON, [post(1, "New title")])
+    assert len(index) == 1
+    assert titles(index, "title") == ["New title"]
+    assert titles(index, "old") == []
+
+
+def test_prunes_oldest_posts_past_the_budget(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    clock = iter(range(1000, 2000))
+    monkeypatch.setattr(search_index.time, "time", lambda: next(clock))
+    index = SearchIndex(str(tmp_path / "search.sqlite3"), max_posts=10)
+
+    for n in range(12):
+        index.add(PYTHON, [post(n, f"post {n}")])
+
+    # Going over took it a tenth under the budget, oldest first
+    assert len(index) == 10
+    assert titles(index, "post") == sorted(f"post {n}" for n in range(2, 12))
+
+    # Refreshing posts already in there doesn't prune anything
+    for n in range(5, 12):
+        index.add(PYTHON, [post(n, f"post {n}")])
+    assert len(index) == 10
+    index.close()
+
+
+def test_prune_only_counts_when_it_might_be_over(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    index = SearchIndex(str(tmp_path / "search.sqlite3"), max_posts=100)
+    counts = 0
+    row_count = index._row_count
+
+    def counting_row_count() -> int:
+        nonlocal counts
+        counts += 1
+        return row_count()
+
+    monkeypatch.setattr(index, "_row_count", counting_row_count)
+    for n in range(50):
+        index.add(PYTHON, [post(n, f"post {n}")])
+    assert counts == 0
+    index.close()
+
+
+def test_opening_an_old_schema_starts_over(tmp_path: Path) -> None:
+    path = str(tmp_path / "search.sqlite3")
+    conn = sqlite3.connect(path)
+    conn.execute("CREATE TABLE posts (id INTEGER PRIMARY KEY, junk TEXT)")
+    conn.commit()
+    conn.close()
+
+    index = SearchIndex(path)
+    index.add(PYTHON, [post(1, "Fresh start")])
+    assert titles(index, "fresh") == ["Fresh start"]
+    index.close()
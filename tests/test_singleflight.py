@@ -0,0 +1,91 @@
+import asyncio
+from typing import List
+
+import pytest
+
+from reddit_cli.singleflight import SingleFlight
+
+
+def test_concurrent_calls_share_one_result() -> None:
+    calls: List[str] = []
+
+    async def work() -> str:
+        calls.append("run")
+        await asyncio.sleep(0.01)
+        return "done"
+
+    async def run() -> List[str]:
+        flights: SingleFlight[str, str] = SingleFlight()
+        results = await asyncio.gather(*(flights.do("key", work) for _ in range(5)))
+        assert flights.coalesced == 4 and flights.in_flight() == 0
+        return list(results)
+
+    assert asyncio.run(run()) == ["done"] * 5
+    assert calls == ["run"]
+
+
+def test_later_calls_run_again() -> None:
+    async def run() -> List[int]:
+        flights: SingleFlight[str, int] = SingleFlight()
+        counter = iter(range(10))
+
+        async def work() -> int:
+            return next(counter)
+
+        return [await flights.do("key", work), await flights.do("key", work)]
+
+    assert asyncio.run(run()) == [0, 1]
+
+
+def test_errors_reach_every_caller() -> None:
+    async def work() -> int:
+        await asyncio.sleep(0.01)
+        raise ValueError("boom")
+
+    async def run() -> None:
+        flights: SingleFlight[str, int] = SingleFlight()
+        results = await asyncio.gather(
+            flights.do("key", work), flights.do("key", work), return_exceptions=True
+        )
+        assert all(isinstance(result, ValueError) for result in results)
+
+    asyncio.run(run())
+
+
+def test_cancelling_one_caller_leaves_the_call_for_the_rest() -> None:
+    async def run() -> None:
+        flights: SingleFlight[str, str] = SingleFlight()
+
+        async def work() -> str:
+            await asyncio.sleep(0.02)
+            return "done"
+
+        first = asyncio.ensure_future(flights.do("key", work))
+        second = asyncio.ensure_future(flights.do("key", work))
+        await asyncio.sleep(0)
+        assert "key" in flights
+        first.cancel()
+        assert await second == "done"
+        with pytest.raises(asyncio.CancelledError):
+            await first
+
+    asyncio.run(run())
+
+
+def test_call_is_cancelled_once_nobody_waits() -> None:
+    async def run() -> None:
+        flights: SingleFlight[str, str] = SingleFlight()
+        finished: List[bool] = []
+
+        async def work() -> str:
+            await asyncio.sleep(0.05)
+            finished.append(True)
+            return "done"
+
+        caller = asyncio.ensure_future(flights.do("key", work))
+        await asyncio.sleep(0)
+        caller.cancel()
+        await asyncio.sleep(0.1)
+        assert finished == [] and "key" not in flights
+
+    asyncio.run(run())
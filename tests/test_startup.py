@@ -0,0 +1,79 @@
+import os
+import subprocess
+import sys
+from pathlib import Path
+from typing import Any
+from typing import List
+
+import pytest
+import yaml
+
+from reddit_cli import common
+from reddit_cli import utils
+from reddit_cli.common import get_config_path
+from reddit_cli.utils import read_feeds_from_yaml
+from reddit_cli.utils import read_warmup_config_from_yaml
+
+SRC = Path(__file__).resolve().parent.parent / "src"
+HEAVY = ("feedparser", "bs4", "lxml", "requests", "textual_image", "httpx", "sqlite3")
+
+
+def test_importing_the_app_leaves_the_heavy_stacks_alone() -> None:
+    script = (
+        "import sys, reddit_cli.app; "
+        f"print(' '.join(name for name in {HEAVY!r} if name in sys.modules))"
+    )
+    env = {**os.environ, "PYTHONPATH": str(SRC)}
+    loaded = subprocess.run(
+        [sys.executable, "-c", script], env=env, capture_output=True, text=True
+    )
+    assert loaded.returncode == 0, loaded.stderr
+    assert loaded.stdout.split() == []
+
+
+def test_config_path_is_found_on_first_use(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setattr(common, "_root_dir", str(tmp_path))
+    monkeypatch.setattr(common, "_config_path", None)
+    with pytest.raises(FileNotFoundError):
+        get_config_path()
+
+    (tmp_path / "config.sample.yaml").write_text("feeds: []\n")
+    assert get_config_path() == str(tmp_path / "config.sample.yaml")
+    # Worked out once, a config.yaml turning up later doesn't move it
+    (tmp_path / "config.yaml").write_text("feeds: []\n")
+    assert common.CONFIG_YAML_PATH == str(tmp_path / "config.sample.yaml")
+
+    monkeypatch.setattr(common, "_config_path", None)
+    assert get_config_path() == str(tmp_path / "config.yaml")
+
+
+def test_config_is_parsed_once_until_it_changes(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    path = tmp_path / "config.yaml"
+    path.write_text(
+        "feeds:\n  - name: python\n    url: https://www.reddit.com/r/python/.json\n"
+        "warmup:\n  enabled: true\n"
+    )
+    parsed: List[Any] = []
+    safe_load = yaml.safe_load
+
+    def counting_load(stream: Any) -> Any:
+        parsed.append(stream)
+        return safe_load(stream)
+
+    monkeypatch.setattr(utils.yaml, "safe_load", counting_load)
+
+    assert read_warmup_config_from_yaml(str(path)).enabled
+    assert [feed.name for feed in read_feeds_from_yaml(str(path))] == ["python"]
+    assert read_warmup_config_from_yaml(str(path)).enabled
+    assert len(parsed) == 1
+
+    path.write_text("warmup:\n  enabled: false\n")
+    stat = path.stat()
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+    assert not read_warmup_config_from_yaml(str(path)).enabled
+    assert read_feeds_from_yaml(str(path)) == []
+    assert len(parsed) == 2
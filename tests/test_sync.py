@@ -0,0 +1,91 @@
+import sqlite3
+from pathlib import Path
+from typing import Any
+from typing import List
+
+import pytest
+
+from reddit_cli import feed_store
+from reddit_cli.common import Feed
+from reddit_cli.devserver import RedditStandIn
+from reddit_cli.feed_store import FeedStore
+from reddit_cli.search_index import get_search_index
+from reddit_cli.sync import SyncResult
+from reddit_cli.sync import main
+from reddit_cli.sync import sync_all
+
+PYTHON = Feed("python", "https://www.reddit.com/r/python/.json")
+LINUX = Feed("linux", "https://www.reddit.com/r/linux/.json")
+RSS = Feed("rust", "https://www.reddit.com/r/rust/.rss")
+
+
+def statuses(results: List[SyncResult]) -> List[tuple[str, str, int]]:
+    return [(result.feed.name, result.status, result.posts) for result in results]
+
+
+def test_sync_stores_then_revalidates(cache_dir: Path, standin: RedditStandIn) -> None:
+    assert statuses(sync_all([PYTHON, RSS])) == [
+        ("python", "updated", 25),
+        ("rust", "updated", 25),
+    ]
+    # Inside the ttl nothing is fetched
+    assert statuses(sync_all([PYTHON])) == [("python", "fresh", 25)]
+    listings = standin.hits["listing"]
+
+    stale = Feed(PYTHON.name, PYTHON.url, ttl=0)
+    assert statuses(sync_all([stale])) == [("python", "not modified", 25)]
+    assert standin.hits["listing"] == listings + 1
+    assert statuses(sync_all([stale], force=True)) == [("python", "updated", 25)]
+
+
+def test_extra_pages_only_go_in_the_search_index(
+    cache_dir: Path, standin: RedditStandIn
+) -> None:
+    assert statuses(sync_all([PYTHON], pages=2)) == [("python", "updated", 50)]
+    store = feed_store.get_feed_store()
+    assert store is not None
+    stored = store.load("https://www.reddit.com/r/python/.json")
+    assert stored is not None and len(stored.posts) == 25
+    index = get_search_index()
+    assert index is not None and len(index) == 50
+
+
+def lock_the_store_for_linux(monkeypatch: pytest.MonkeyPatch) -> None:
+    save = FeedStore.save
+
+    def locked_for_linux(
+        self: FeedStore, feed_url: str, *args: Any, **kwargs: Any
+    ) -> None:
+        if "linux" in feed_url:
+            raise sqlite3.OperationalError("database is locked")
+        save(self, feed_url, *args, **kwargs)
+
+    monkeypatch.setattr(FeedStore, "save", locked_for_linux)
+
+
+def test_a_store_failure_only_fails_that_feed(
+    cache_dir: Path, standin: RedditStandIn, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    lock_the_store_for_linux(monkeypatch)
+    results = sync_all([LINUX, PYTHON], jobs=1)
+
+    assert statuses(results) == [("linux", "failed", 0), ("python", "updated", 25)]
+    assert "database is locked" in (results[0].error or "")
+
+
+def test_main_exits_non_zero_when_a_feed_fails(
+    cache_dir: Path,
+    standin: RedditStandIn,
+    monkeypatch: pytest.MonkeyPatch,
+    capsys: pytest.CaptureFixture[str],
+) -> None:
+    lock_the_store_for_linux(monkeypatch)
+    monkeypatch.setattr(
+        "reddit_cli.sync.read_feeds_from_yaml", lambda path: [PYTHON, LINUX]
+    )
+    with pytest.raises(SystemExit) as exit:
+        main(["--once", "--jobs", "2"])
+    assert exit.value.code == 1
+    out = capsys.readouterr().out
+    assert "python: updated (25 posts)" in out
+    assert "linux: failed (couldn't store it: database is locked)" in out
@@ -0,0 +1,127 @@
+import asyncio
+from typing import Any
+from typing import List
+from typing import Mapping
+from typing import Tuple
+
+import httpx
+import pytest
+import requests
+from requests.adapters import BaseAdapter
+
+from reddit_cli import transport
+from reddit_cli.common import HttpConfig
+from reddit_cli.common import RateLimitConfig
+from reddit_cli.transport import AsyncHttpTransport
+from reddit_cli.transport import HttpTransport
+
+URL = "https://www.reddit.com/r/python/.json"
+
+
+class FakeScheduler:
+    """Records every attempt that was let through"""
+
+    def __init__(self, enabled: bool) -> None:
+        self.config = RateLimitConfig(enabled=enabled)
+        self.acquired = 0
+        self.observed: List[int] = []
+
+    async def acquire(self, url: str, priority: Any = None) -> None:
+        self.acquired += 1
+
+    def acquire_blocking(self, url: str) -> None:
+        self.acquired += 1
+
+    def observe(self, url: str, status: int, headers: Mapping[str, str]) -> None:
+        self.observed.append(status)
+
+
+def statuses(*codes: int) -> List[Tuple[int, dict[str, str]]]:
+    return [(code, {"Retry-After": "5"} if code == 429 else {}) for code in codes]
+
+
+@pytest.fixture
+def sleeps(monkeypatch: pytest.MonkeyPatch) -> List[float]:
+    slept: List[float] = []
+
+    async def fake_async_sleep(delay: float) -> None:
+        slept.append(delay)
+
+    monkeypatch.setattr(transport.asyncio, "sleep", fake_async_sleep)
+    monkeypatch.setattr(transport.time, "sleep", slept.append)
+    return slept
+
+
+def run_async(
+    scheduler: FakeScheduler,
+    responses: List[Tuple[int, dict[str, str]]],
+    monkeypatch: pytest.MonkeyPatch,
+) -> int:
+    monkeypatch.setattr(transport, "get_scheduler", lambda: scheduler)
+    queued = list(responses)
+    client = AsyncHttpTransport(HttpConfig(retries=3), "test")
+    client.client = httpx.AsyncClient(
+        transport=httpx.MockTransport(
+            lambda request: httpx.Response(queued[0][0], headers=queued.pop(0)[1])
+        )
+    )
+    return asyncio.run(client.get(URL)).status_code
+
+
+class FakeAdapter(BaseAdapter):
+    def __init__(self, responses: List[Tuple[int, dict[str, str]]]) -> None:
+        super().__init__()
+        self.responses = list(responses)
+
+    def send(
+        self, request: requests.PreparedRequest, **kwargs: Any
+    ) -> requests.Response:
+        status, headers = self.responses.pop(0)
+        response = requests.Response()
+        response.status_code = status
+        response.headers.update(headers)
+        response._content = b"{}"
+        response.request = request
+        return response
+
+    def close(self) -> None:
+        pass
+
+
+def run_sync(
+    scheduler: FakeScheduler,
+    responses: List[Tuple[int, dict[str, str]]],
+    monkeypatch: pytest.MonkeyPatch,
+) -> int:
+    monkeypatch.setattr(transport, "get_scheduler", lambda: scheduler)
+    client = HttpTransport(HttpConfig(retries=3))
+    client.session.mount("https://", FakeAdapter(responses))
+    return client.get(URL).status_code
+
+
+@pytest.mark.parametrize("run", [run_async, run_sync])
+def test_429_waits_on_retry_after_when_the_scheduler_is_off(
+    run: Any, sleeps: List[float], monkeypatch: pytest.MonkeyPatch
+) -> None:
+    assert (
+        run(FakeScheduler(enabled=False), statuses(429, 429, 200), monkeypatch) == 200
+    )
+    assert sleeps == [5.0, 5.0]
+
+
+@pytest.mark.parametrize("run", [run_async, run_sync])
+def test_429_leaves_the_wait_to_the_scheduler_when_it_is_on(
+    run: Any, sleeps: List[float], monkeypatch: pytest.MonkeyPatch
+) -> None:
+    assert run(FakeScheduler(enabled=True), statuses(429, 200), monkeypatch) == 200
+    assert sleeps == []
+
+
+@pytest.mark.parametrize("run", [run_async, run_sync])
+def test_every_attempt_goes_through_the_scheduler(
+    run: Any, sleeps: List[float], monkeypatch: pytest.MonkeyPatch
+) -> None:
+    scheduler = FakeScheduler(enabled=True)
+    assert run(scheduler, statuses(503, 502, 429, 503), monkeypatch) == 503
+    assert scheduler.acquired == 4
+    assert scheduler.observed == [503, 502, 429, 503]
@@ -0,0 +1,172 @@
+import asyncio
+from typing import Any
+from typing import Callable
+from typing import List
+
+from textual.app import App
+from textual.app import ComposeResult
+
+from reddit_cli.common import PostRowData
+from reddit_cli.widgets import VirtualListView
+
+
+def rows(*ids: int) -> List[PostRowData]:
+    return [PostRowData("📰", "python", f"post {i}", name=f"t3_{i}") for i in ids]
+
+
+class ListApp(App[None]):
+    def __init__(self, initial: List[PostRowData]) -> None:
+        super().__init__()
+        self.list_view = VirtualListView(initial)
+
+    def compose(self) -> ComposeResult:
+        yield self.list_view
+
+
+def run(initial: List[PostRowData], body: Callable[[VirtualListView], Any]) -> None:
+    async def main() -> None:
+        app = ListApp(initial)
+        async with app.run_test(size=(60, 10)) as pilot:
+            await pilot.pause()
+            await body(app.list_view)
+
+    asyncio.run(main())
+
+
+def cached_names(view: VirtualListView) -> List[str | None]:
+    indexes = sorted({index for index, _ in view._line_cache})
+    return [view.rows[index].name for index in indexes]
+
+
+def test_insert_at_the_top_keeps_rendered_rows() -> None:
+    async def body(view: VirtualListView) -> None:
+        view.index = 2
+        await asyncio.sleep(0.05)
+        strip = view._line_cache[(2, True)]
+
+        view.update_rows(rows(9, 0, 1, 2, 3, 4))
+
+        assert view.index == 3
+        assert view.rows[view.index].name == "t3_2"
+        # Moved down one, but the same post so the line drawn for it is reused
+        assert view._line_cache[(3, True)] is strip
+        assert cached_names(view) == ["t3_0", "t3_1", "t3_2", "t3_3", "t3_4"]
+
+    run(rows(0, 1, 2, 3, 4), body)
+
+
+def test_remove_drops_only_the_removed_row() -> None:
+    async def body(view: VirtualListView) -> None:
+        view.index = 3
+        view.update_rows(rows(0, 2, 3, 4))
+
+        assert view.rows[view.index].name == "t3_3"
+        assert cached_names(view) == ["t3_0", "t3_2", "t3_3", "t3_4"]
+
+    run(rows(0, 1, 2, 3, 4), body)
+
+
+def test_reorder_follows_the_selected_post() -> None:
+    async def body(view: VirtualListView) -> None:
+        view.index = 0
+        view.update_rows(rows(4, 3, 2, 1, 0))
+
+        assert view.index == 4
+        assert sorted(cached_names(view)) == ["t3_0", "t3_1", "t3_2", "t3_3", "t3_4"]
+
+    run(rows(0, 1, 2, 3, 4), body)
+
+
+def test_edited_row_is_drawn_again() -> None:
+    async def body(view: VirtualListView) -> None:
+        edited = rows(0, 1, 2)
+        edited[1].title = "post 1 (edited)"
+        view.update_rows(edited)
+
+        assert cached_names(view) == ["t3_0", "t3_2"]
+        await asyncio.sleep(0.05)
+        assert (1, False) in view._line_cache
+
+    run(rows(0, 1, 2), body)
+
+
+def test_cursor_stays_in_range_when_its_post_goes() -> None:
+    async def body(view: VirtualListView) -> None:
+        view.index = 4
+        view.update_rows(rows(0, 1))
+        assert view.index == 1
+
+        view.update_rows([])
+        assert view.index == 0
+        assert view._line_cache == {}
+
+    run(rows(0, 1, 2, 3, 4), body)
+
+
+def test_only_the_viewport_is_rendered() -> None:
+    async def body(view: VirtualListView) -> None:
+        assert view.virtual_size.height == 10_000
+        # Ten lines tall, so ten rows, each in the cache once
+        assert cached_names(view) == [f"t3_{i}" for i in range(10)]
+
+        window = 10 + 2 * view.overscan
+        for index in range(0, 10_000, 7):
+            view.index = index
+            await asyncio.sleep(0)
+        await asyncio.sleep(0.05)
+        # Rows scrolled past are dropped, so the cache never holds much past the window
+        assert len(view._line_cache) <= 2 * window
+        top = round(view.scroll_y)
+        assert any(index >= top for index, _ in view._line_cache)
+
+    run(rows(*range(10_000)), body)
+
+
+def test_rows_are_drawn_in_columns_and_truncated() -> None:
+    long_title = PostRowData("🖼", "a_very_long_subreddit", "x" * 100, name="t3_x")
+
+    async def body(view: VirtualListView) -> None:
+        view.set_rows([long_title, "[b]plain[/b] markup"])
+        await asyncio.sleep(0.05)
+        first = view.render_line(0).text
+        # The subreddit is cut down to its 14 cell column
+        assert first.startswith("🖼")
+        assert "a_very_long_s…x" in first
+        assert first.endswith("x…")
+        assert view.render_line(0).cell_length == 60
+        assert view.render_line(1).text.rstrip() == "plain markup"
+        assert view.render_line(2).text.strip() == ""
+
+    run([], body)
+
+
+def test_cursor_moves_and_is_clamped() -> None:
+    async def body(view: VirtualListView) -> None:
+        view.index = 3
+        await asyncio.sleep(0.05)
+        assert (3, True) in view._line_cache and (0, False) in view._line_cache
+        view.index = 99
+        assert view.index == 4
+        view.index = -1
+        assert view.index == 0
+        view.clear()
+        assert (view.index, view.virtual_size.height) == (0, 0)
+
+    run(rows(*range(5)), body)
+
+
+def test_extend_keeps_rendered_rows_and_set_row_redraws_one() -> None:
+    async def body(view: VirtualListView) -> None:
+        await asyncio.sleep(0.05)
+        before = dict(view._line_cache)
+
+        view.extend(rows(3, 4))
+        assert view._line_cache == before
+
+        view.set_row(1, PostRowData("📰", "python", "edited", name="t3_1"))
+        assert (1, False) not in view._line_cache
+        await asyncio.sleep(0.05)
+        assert "edited" in view.render_line(1).text
+        assert view._line_cache[(0, True)] is before[(0, True)]
+
+    run(rows(0, 1, 2), body)